@@ -5,11 +5,19 @@ from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_mail import Mail
 import os
+import sys
+
+# Shared infrastructure modules (cache backends, SMTP pool) live next to the Railway backend
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from cache import cache_from_env
+from smtp_pool import SMTPPool
+from table_versions import versions, RedisVersionStore
 
 # Initialize extensions
 db = SQLAlchemy()
 migrate = Migrate()
 mail = Mail()
+mail_pool = SMTPPool()
 
 
 def create_app(config_name='development'):
@@ -42,9 +50,18 @@ def create_app(config_name='development'):
     
     # Initialize extensions with app
     db.init_app(app)
-    migrate.init_app(app, db)
+    migrate.init_app(app, db, directory=os.path.join(os.path.dirname(__file__), 'migrations'))
     mail.init_app(app)
     
+    # Response cache - Redis when REDIS_URL is set, in-process otherwise
+    app.extensions['cache'] = cache_from_env()
+    if app.extensions['cache'].shared:
+        versions.store = RedisVersionStore(app.extensions['cache'].client)
+    
+    # Service catalog snapshot, reloaded only when a service changes
+    from api.catalog import ServiceCatalog
+    app.extensions['catalog'] = ServiceCatalog()
+    
     # CORS configuration
     CORS(app, resources={
         r"/api/*": {
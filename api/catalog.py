@@ -0,0 +1,92 @@
+"""Service catalog - the active EventService rows as an immutable, versioned snapshot.
+
+The catalog changes a few times a year but is read by every services
+listing and booking. Each process keeps one snapshot (services, a
+name -> service index and the encoded /api/services body) and only
+reloads it when the catalog version moves.
+
+Creating, updating or deleting an EventService through the ORM bumps the
+'event_services' version on commit. With REDIS_URL the version is shared,
+so one Redis GET per read keeps every worker current; without it the
+version is per process and snapshots are also reloaded after `max_age`
+seconds to pick up changes made elsewhere (e.g. by init_db.py).
+"""
+from collections import namedtuple
+from types import MappingProxyType
+import threading
+import time
+
+from flask import jsonify
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from api.models.event_service import EventService
+from table_versions import versions
+
+TABLE = 'event_services'
+
+Snapshot = namedtuple('Snapshot', ['version', 'loaded_at', 'services', 'by_name', 'body'])
+
+
+class ServiceCatalog:
+    """Per-process snapshot of the active services"""
+
+    def __init__(self, max_age=60):
+        self.max_age = max_age
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def snapshot(self):
+        """Current snapshot - no database query unless the catalog changed"""
+        version = versions.get(TABLE)
+        snapshot = self._snapshot
+        if snapshot is None or not self._fresh(snapshot, version):
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or not self._fresh(snapshot, version):
+                    snapshot = self._snapshot = self._load(version)
+        return snapshot
+
+    def _fresh(self, snapshot, version):
+        if snapshot.version != version:
+            return False
+        shared = versions.store.epoch == 'shared'
+        return shared or time.monotonic() - snapshot.loaded_at < self.max_age
+
+    def _load(self, version):
+        services = tuple(
+            MappingProxyType(service.to_dict())
+            for service in EventService.query.filter_by(is_active=True).order_by(EventService.id)
+        )
+        self.loads += 1
+        return Snapshot(
+            version=version,
+            loaded_at=time.monotonic(),
+            services=services,
+            by_name=MappingProxyType({service['name']: service for service in services}),
+            body=jsonify({'success': True, 'services': [dict(s) for s in services]}).get_data()
+        )
+
+    def invalidate(self):
+        """For catalog changes made outside the ORM (bulk UPDATEs, raw SQL)"""
+        versions.bump(TABLE)
+
+
+# Bump the catalog version whenever a committed transaction touched a service
+@event.listens_for(EventService, 'after_insert')
+@event.listens_for(EventService, 'after_update')
+@event.listens_for(EventService, 'after_delete')
+def _service_changed(mapper, connection, target):
+    object_session(target).info['catalog_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_catalog_version(session):
+    if session.info.pop('catalog_changed', False):
+        versions.bump(TABLE)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_catalog_change(session):
+    session.info.pop('catalog_changed', None)
@@ -3,7 +3,7 @@ import os
 from datetime import datetime
 from flask import current_app
 from flask_mail import Message
-from api import mail
+from api import mail_pool
 from typing import Dict, Any
 import logging
 
@@ -356,11 +356,9 @@ def send_booking_confirmation(booking_data: Dict[str, Any]) -> bool:
     """
     
     try:
-        # Send both emails
-        mail.send(customer_msg)
+        # Send both emails through one pooled SMTP session
+        mail_pool.send(customer_msg, admin_msg)
         logger.info(f"✅ Booking confirmation sent to customer: {booking_data['email']}")
-        
-        mail.send(admin_msg)
         logger.info(f"✅ Booking notification sent to admin: {booking_email}")
         
         return True
@@ -408,7 +406,7 @@ def send_contact_email(name: str, email: str, phone: str, message: str) -> bool:
     """
     
     try:
-        mail.send(msg)
+        mail_pool.send(msg)
         logger.info(f"✅ Contact email sent from {email}")
         return True
     except Exception as e:
@@ -1,11 +1,20 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_mail import Mail, Message
-import sqlite3
-from datetime import datetime
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
 import os
+import sys
 from jinja2 import Template
 
+# Tables and queries are shared with the other entry points (backend/repository.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from db_engine import database_url, engine_options
+from repository import (
+    Repository, define_tables, event_dict, booking_dict, event_values, booking_values, format_time,
+    search_args, search_results, artist_dict,
+)
+
 app = Flask(__name__)
 CORS(app)
 
@@ -19,64 +28,19 @@ app.config['MAIL_DEFAULT_SENDER'] = ('ARCH1TECT', os.environ.get('MAIL_USERNAME'
 
 mail = Mail(app)
 
-# Database Configuration
-DATABASE = 'arch1tect.db'
+# Database Configuration - SQLite file unless DATABASE_URL is set
+engine = create_engine(database_url(default='sqlite:///arch1tect.db'), **engine_options())
+Session = scoped_session(sessionmaker(bind=engine))
+metadata = MetaData()
+tables = define_tables(metadata)
+repo = Repository(Session, tables)
 
-def get_db():
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    return conn
+@app.teardown_appcontext
+def remove_session(exception=None):
+    Session.remove()
 
 def init_db():
-    with app.app_context():
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        # Events table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                date TEXT NOT NULL,
-                time TEXT,
-                venue TEXT NOT NULL,
-                city TEXT,
-                type TEXT DEFAULT 'club',
-                description TEXT,
-                artists TEXT,
-                price REAL,
-                capacity INTEGER,
-                image_url TEXT,
-                status TEXT DEFAULT 'upcoming',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Bookings table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS bookings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                event_id INTEGER,
-                name TEXT NOT NULL,
-                email TEXT NOT NULL,
-                phone TEXT,
-                event_date TEXT,
-                event_type TEXT,
-                start_time TEXT,
-                duration INTEGER,
-                venue TEXT,
-                city TEXT,
-                guests INTEGER,
-                message TEXT,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (event_id) REFERENCES events (id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+    metadata.create_all(engine)
 
 # Email Templates
 BOOKING_CONFIRMATION_TEMPLATE = '''
@@ -190,7 +154,7 @@ BOOKING_CONFIRMATION_TEMPLATE = '''
                 {% if start_time %}
                 <div class="detail-row">
                     <div class="detail-label">⏰ Godzina:</div>
-                    <div class="detail-value">{{ start_time }}{% if duration %} ({{ duration }}h){% endif %}</div>
+                    <div class="detail-value">{{ start_time }}{% if duration %} ({{ '%g'|format(duration / 60) }}h){% endif %}</div>
                 </div>
                 {% endif %}
                 {% if event_type %}
@@ -229,78 +193,66 @@ BOOKING_CONFIRMATION_TEMPLATE = '''
 
 @app.route('/api/events', methods=['GET'])
 def get_events():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM events ORDER BY date DESC')
-    events = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(events)
+    events, _ = repo.events_page()
+    return jsonify([event_dict(event) for event in events])
+
+@app.route('/api/events/search', methods=['GET'])
+def search_events():
+    try:
+        args = search_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(search_results(repo.search_events(**args), args['terms']))
 
 @app.route('/api/events/<int:event_id>', methods=['GET'])
 def get_event(event_id):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM events WHERE id = ?', (event_id,))
-    event = cursor.fetchone()
-    conn.close()
+    event = repo.get_event(event_id)
     if event:
-        return jsonify(dict(event))
+        return jsonify(event_dict(event))
     return jsonify({'error': 'Event not found'}), 404
 
+@app.route('/api/artists', methods=['GET'])
+def get_artists():
+    return jsonify([artist_dict(artist) for artist in repo.list_artists()])
+
+@app.route('/api/artists/<slug>/events', methods=['GET'])
+def get_artist_events(slug):
+    artist, events = repo.artist_events(slug)
+    if artist is None:
+        return jsonify({'error': 'Artist not found'}), 404
+    return jsonify({'artist': {'name': artist.name, 'slug': artist.slug},
+                    'events': [event_dict(event) for event in events]})
+
 @app.route('/api/events', methods=['POST'])
 def create_event():
-    data = request.json
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO events (name, date, time, venue, city, type, description, 
-                          artists, price, capacity, image_url, status)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        data['name'], data['date'], data.get('time'), data['venue'], 
-        data.get('city'), data.get('type', 'club'), data.get('description'),
-        data.get('artists'), data.get('price'), data.get('capacity'),
-        data.get('image_url'), data.get('status', 'upcoming')
-    ))
-    
-    event_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    try:
+        event = repo.create_event(event_values(request.json))
+    except ValueError as e:
+        Session.rollback()
+        return jsonify({'error': str(e)}), 400
+    Session.commit()
     
-    return jsonify({'id': event_id, 'message': 'Event created successfully'}), 201
+    return jsonify(event_dict(event)), 201
 
 @app.route('/api/events/<int:event_id>', methods=['PUT'])
 def update_event(event_id):
-    data = request.json
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        UPDATE events 
-        SET name=?, date=?, time=?, venue=?, city=?, type=?, description=?,
-            artists=?, price=?, capacity=?, image_url=?, status=?, 
-            updated_at=CURRENT_TIMESTAMP
-        WHERE id=?
-    ''', (
-        data['name'], data['date'], data.get('time'), data['venue'],
-        data.get('city'), data.get('type'), data.get('description'),
-        data.get('artists'), data.get('price'), data.get('capacity'),
-        data.get('image_url'), data.get('status'), event_id
-    ))
-    
-    conn.commit()
-    conn.close()
+    try:
+        event = repo.update_event(event_id, event_values(request.json, partial=True))
+    except ValueError as e:
+        Session.rollback()
+        return jsonify({'error': str(e)}), 400
+    if event is None:
+        Session.rollback()
+        return jsonify({'error': 'Event not found'}), 404
+    Session.commit()
     
-    return jsonify({'message': 'Event updated successfully'})
+    return jsonify(event_dict(event))
 
 @app.route('/api/events/<int:event_id>', methods=['DELETE'])
 def delete_event(event_id):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM events WHERE id = ?', (event_id,))
-    conn.commit()
-    conn.close()
+    if not repo.delete_event(event_id):
+        return jsonify({'error': 'Event not found'}), 404
+    Session.commit()
     
     return jsonify({'message': 'Event deleted successfully'})
 
@@ -308,58 +260,32 @@ def delete_event(event_id):
 
 @app.route('/api/bookings', methods=['GET'])
 def get_bookings():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT b.*, e.name as event_name 
-        FROM bookings b
-        LEFT JOIN events e ON b.event_id = e.id
-        ORDER BY b.created_at DESC
-    ''')
-    bookings = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(bookings)
+    bookings = repo.list_bookings(with_event_name=True)
+    return jsonify([dict(booking_dict(booking), event_name=booking.event_name) for booking in bookings])
 
 @app.route('/api/bookings', methods=['POST'])
 def create_booking():
-    data = request.json
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO bookings (event_id, name, email, phone, event_date, event_type,
-                            start_time, duration, venue, city, guests, message, status)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending')
-    ''', (
-        data.get('event_id'), data['name'], data['email'], data.get('phone'),
-        data.get('event_date'), data.get('event_type'), data.get('start_time'),
-        data.get('duration'), data.get('venue'), data.get('city'),
-        data.get('guests'), data.get('message')
-    ))
-    
-    booking_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    try:
+        booking = repo.create_booking(booking_values(request.json))
+    except ValueError as e:
+        Session.rollback()
+        return jsonify({'error': str(e)}), 400
+    Session.commit()
     
     # Send confirmation email
     try:
-        send_booking_confirmation(booking_id)
+        send_booking_confirmation(booking.id)
     except Exception as e:
         print(f"Error sending email: {e}")
     
-    return jsonify({'id': booking_id, 'message': 'Booking created successfully'}), 201
+    return jsonify(booking_dict(booking)), 201
 
 @app.route('/api/bookings/<int:booking_id>/approve', methods=['POST'])
 def approve_booking(booking_id):
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        UPDATE bookings SET status='approved' WHERE id=?
-    ''', (booking_id,))
-    
-    conn.commit()
-    conn.close()
+    booking = repo.set_booking_status(booking_id, 'approved')
+    if booking is None:
+        return jsonify({'error': 'Booking not found'}), 404
+    Session.commit()
     
     # Send approval email
     try:
@@ -367,35 +293,21 @@ def approve_booking(booking_id):
     except Exception as e:
         print(f"Error sending email: {e}")
     
-    return jsonify({'message': 'Booking approved and email sent'})
+    return jsonify(booking_dict(booking))
 
 @app.route('/api/bookings/<int:booking_id>/reject', methods=['POST'])
 def reject_booking(booking_id):
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        UPDATE bookings SET status='rejected' WHERE id=?
-    ''', (booking_id,))
-    
-    conn.commit()
-    conn.close()
+    booking = repo.set_booking_status(booking_id, 'rejected')
+    if booking is None:
+        return jsonify({'error': 'Booking not found'}), 404
+    Session.commit()
     
-    return jsonify({'message': 'Booking rejected'})
+    return jsonify(booking_dict(booking))
 
 # Email Functions
 
 def send_booking_confirmation(booking_id):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT b.*, e.name as event_name 
-        FROM bookings b
-        LEFT JOIN events e ON b.event_id = e.id
-        WHERE b.id = ?
-    ''', (booking_id,))
-    booking = dict(cursor.fetchone())
-    conn.close()
+    booking = repo.get_booking(booking_id, with_event_name=True)._asdict()
     
     template = Template(BOOKING_CONFIRMATION_TEMPLATE)
     html_content = template.render(
@@ -404,7 +316,7 @@ def send_booking_confirmation(booking_id):
         event_date=booking.get('event_date'),
         venue=booking.get('venue'),
         city=booking.get('city'),
-        start_time=booking.get('start_time'),
+        start_time=format_time(booking.get('start_time')),
         duration=booking.get('duration'),
         event_type=booking.get('event_type'),
         message=booking.get('message')
@@ -419,16 +331,7 @@ def send_booking_confirmation(booking_id):
     mail.send(msg)
 
 def send_booking_approval(booking_id):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT b.*, e.name as event_name 
-        FROM bookings b
-        LEFT JOIN events e ON b.event_id = e.id
-        WHERE b.id = ?
-    ''', (booking_id,))
-    booking = dict(cursor.fetchone())
-    conn.close()
+    booking = repo.get_booking(booking_id, with_event_name=True)._asdict()
     
     # Similar email template but with approval message
     template = Template(BOOKING_CONFIRMATION_TEMPLATE.replace(
@@ -442,7 +345,7 @@ def send_booking_approval(booking_id):
         event_date=booking.get('event_date'),
         venue=booking.get('venue'),
         city=booking.get('city'),
-        start_time=booking.get('start_time'),
+        start_time=format_time(booking.get('start_time')),
         duration=booking.get('duration'),
         event_type=booking.get('event_type'),
         message=booking.get('message')
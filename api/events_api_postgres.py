@@ -1,37 +1,44 @@
 """
 Events API with PostgreSQL/SQLAlchemy - Serverless Vercel Deployment
 Complete backend with email, SMS, and calendar integration
+
+Cold starts are kept short: Flask-Mail and Twilio are imported when the
+first email/SMS goes out, and the schema is not created at runtime on
+Vercel - run `flask --app api/events_api_postgres.py init-db` (or the
+migrations) at deploy time instead. Measure with `python benchmarks/cold_start.py`.
 """
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from flask_mail import Mail, Message
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, timedelta
 import os
-from jinja2 import Template
-from urllib.parse import quote
-from twilio.rest import Client
+import sys
+from urllib.parse import quote, urlencode
+
+# Shared modules (data access, SMTP pool, email templates) live next to the Railway backend
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from smtp_pool import SMTPPool
+from email_templates import render as render_email
+from db_engine import database_url, engine_options, checkout_stats
+from fast_json import encode_rows
+from sql_profiler import profile_app
+from repository import (
+    Repository, define_tables, event_dict, booking_dict, event_values, booking_values, events_page_args,
+    format_time, query_stats, search_args, search_results, artist_dict,
+    EVENT_FIELDS, BOOKING_FIELDS, EVENT_FORMATTERS, BOOKING_FORMATTERS,
+)
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor', 'Link'])
 
 # Database Configuration
 # Use PostgreSQL connection string from environment, fallback to SQLite for local dev
-DATABASE_URL = os.environ.get('DATABASE_URL') or os.environ.get('POSTGRES_URL')
-if DATABASE_URL and DATABASE_URL.startswith('postgres://'):
-    # Fix for SQLAlchemy 1.4+ (postgres:// -> postgresql://)
-    DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql://', 1)
-
-app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL or 'sqlite:///arch1tect.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = database_url(default='sqlite:///arch1tect.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-# Connection pool settings for Neon PostgreSQL
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_pre_ping': True,
-    'pool_recycle': 300,
-    'pool_size': 10,
-    'max_overflow': 20
-}
+# Connection pool for Neon PostgreSQL - one reused connection per instance on
+# Vercel, DATABASE_POOLER_URL preferred (see db_engine.py, DB_ENGINE_PROFILE)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options()
 
 # SMTP Configuration - flexible for different email providers
 # Supports: Resend, Gmail, SendGrid, Mailgun, custom SMTP
@@ -45,116 +52,61 @@ app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD', '')  # Resend API
 sender_email = os.environ.get('MAIL_SENDER', os.environ.get('MAIL_FROM', 'arch1tect@haos.fm'))
 app.config['MAIL_DEFAULT_SENDER'] = ('ARCH1TECT | HAOS.fm', sender_email)
 
+# Schema creation on startup - on for local runs, off on Vercel (DB_CREATE_ALL overrides)
+CREATE_SCHEMA_ON_STARTUP = os.environ.get(
+    'DB_CREATE_ALL', 'off' if os.environ.get('VERCEL') else 'on'
+).lower() not in ('off', '0', 'false')
+
 db = SQLAlchemy(app)
-mail = Mail(app)
+
+# Per-request statement counts / DB time in a Server-Timing header, N+1 warnings (see sql_profiler.py)
+if os.environ.get('SQL_PROFILE', 'off').lower() in ('on', '1', 'true'):
+    with app.app_context():
+        profile_app(app, db.engine)
+
+# Reused across invocations while the function instance stays warm
+mail_pool = SMTPPool(size=1)
+
+def mail_message(**kwargs):
+    """Build a flask_mail Message, setting up Flask-Mail on first use"""
+    from flask_mail import Mail, Message
+    if 'mail' not in app.extensions:
+        Mail(app)
+    return Message(**kwargs)
 
 # Twilio SMS Configuration
 TWILIO_ACCOUNT_SID = os.environ.get('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.environ.get('TWILIO_AUTH_TOKEN')
 TWILIO_PHONE_NUMBER = os.environ.get('TWILIO_PHONE_NUMBER')
 
-# Initialize Twilio client if credentials are provided
-twilio_client = None
-if TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN and TWILIO_PHONE_NUMBER:
-    try:
-        twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-        print("✅ [SMS] Twilio client initialized successfully")
-    except Exception as e:
-        print(f"⚠️ [SMS] Twilio initialization failed: {e}")
-else:
-    print("⚠️ [SMS] Twilio credentials not configured - SMS notifications disabled")
+# Twilio client - created with the first SMS (the twilio package alone takes ~100 ms to import)
+_twilio_client = None
+
+def get_twilio_client():
+    """Twilio client, or None when SMS is not configured"""
+    global _twilio_client
+    if _twilio_client is None and TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN and TWILIO_PHONE_NUMBER:
+        try:
+            from twilio.rest import Client
+            _twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+            print("✅ [SMS] Twilio client initialized successfully")
+        except Exception as e:
+            print(f"⚠️ [SMS] Twilio initialization failed: {e}")
+    return _twilio_client
+
+# Models - the tables are shared with the other entry points (repository.py)
+tables = define_tables(db.metadata)
 
-# Models
 class Event(db.Model):
-    __tablename__ = 'events'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(255), nullable=False)
-    date = db.Column(db.String(50), nullable=False)
-    time = db.Column(db.String(50))
-    venue = db.Column(db.String(255), nullable=False)
-    city = db.Column(db.String(100))
-    type = db.Column(db.String(50), default='club')
-    description = db.Column(db.Text)
-    artists = db.Column(db.Text)
-    price = db.Column(db.Float)
-    capacity = db.Column(db.Integer)
-    image_url = db.Column(db.Text)
-    status = db.Column(db.String(50), default='upcoming')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'date': self.date,
-            'time': self.time,
-            'venue': self.venue,
-            'city': self.city,
-            'type': self.type,
-            'description': self.description,
-            'artists': self.artists,
-            'price': self.price,
-            'capacity': self.capacity,
-            'image_url': self.image_url,
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    __table__ = tables.events
+    to_dict = event_dict
 
 class Booking(db.Model):
-    __tablename__ = 'bookings'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    event_id = db.Column(db.Integer, db.ForeignKey('events.id'))
-    name = db.Column(db.String(255), nullable=False)
-    email = db.Column(db.String(255), nullable=False)
-    phone = db.Column(db.String(50))
-    event_date = db.Column(db.String(50))
-    event_type = db.Column(db.String(50))
-    start_time = db.Column(db.String(50))
-    duration = db.Column(db.Integer)
-    venue = db.Column(db.String(255))
-    city = db.Column(db.String(100))
-    guests = db.Column(db.Integer)
-    message = db.Column(db.Text)
-    status = db.Column(db.String(50), default='pending')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    # Calendar integration fields (like san-bud)
-    calendar_event_sent = db.Column(db.Boolean, default=False)
-    calendar_platforms = db.Column(db.String(255))
-    event_title = db.Column(db.String(255))
-    event_location = db.Column(db.String(255))
-    calendar_platforms = db.Column(db.String(255))  # "Google,Apple,Outlook,Office365"
-    event_title = db.Column(db.String(255))
-    event_location = db.Column(db.String(500))
-    
+    __table__ = tables.bookings
     event = db.relationship('Event', backref='bookings')
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'event_id': self.event_id,
-            'name': self.name,
-            'email': self.email,
-            'phone': self.phone,
-            'event_date': self.event_date,
-            'event_type': self.event_type,
-            'start_time': self.start_time,
-            'duration': self.duration,
-            'venue': self.venue,
-            'city': self.city,
-            'guests': self.guests,
-            'message': self.message,
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'calendar_event_sent': self.calendar_event_sent,
-            'calendar_platforms': self.calendar_platforms,
-            'event_title': self.event_title,
-            'event_location': self.event_location
-        }
+    to_dict = booking_dict
+
+repo = Repository(db.session, tables)
 
 # Initialize database
 def init_db():
@@ -162,20 +114,21 @@ def init_db():
         db.create_all()
         print("✅ Database tables created successfully!")
 
+@app.cli.command('init-db')
+def init_db_command():
+    """Create missing tables - the deploy-time step for serverless"""
+    init_db()
+
 # Calendar URL Generation (like san-bud)
 def generate_calendar_urls(booking):
     """Generate calendar URLs for Google, Outlook, and Office365"""
     try:
-        # Parse date and time
-        date_str = booking.event_date  # Format: "YYYY-MM-DD"
-        time_str = booking.start_time  # Format: "HH:MM"
-        
         # Create datetime object
-        start_datetime = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
+        start_datetime = datetime.combine(booking.event_date, booking.start_time)
         
-        # Calculate end time (default 4 hours for club events)
-        duration_hours = booking.duration or 4
-        end_datetime = start_datetime + timedelta(hours=duration_hours)
+        # Calculate end time (duration in minutes, default 4 hours for club events)
+        duration_minutes = booking.duration or 240
+        end_datetime = start_datetime + timedelta(minutes=duration_minutes)
         
         # Format for calendar links
         start_formatted = start_datetime.strftime("%Y%m%dT%H%M%S")
@@ -232,6 +185,7 @@ def generate_calendar_urls(booking):
 
 def send_sms_confirmation(booking):
     """Send SMS confirmation using Twilio"""
+    twilio_client = get_twilio_client()
     if not twilio_client:
         print("⚠️ [SMS] Twilio not configured, skipping SMS notification")
         return
@@ -250,7 +204,7 @@ Dzień dobry {booking.name}!
 
 Potwierdzamy Twoją rezerwację:
 📅 Data: {booking.event_date}
-🕐 Godzina: {booking.start_time}
+🕐 Godzina: {format_time(booking.start_time)}
 📍 Miejsce: {booking.venue}, {booking.city}
 👥 Gości: {booking.guests}
 
@@ -277,10 +231,39 @@ Szczegóły otrzymasz na email: {booking.email}
 # Routes - Events
 @app.route('/api/events', methods=['GET'])
 def get_events():
-    """Get all events"""
+    """Get one page of events (keyset pagination, filtered in SQL)
+
+    Query params: limit, after (cursor from X-Next-Cursor), order (desc|asc),
+    city, type, status, from, to (YYYY-MM-DD, inclusive).
+    """
     try:
-        events = Event.query.order_by(Event.date.desc()).all()
-        return jsonify([event.to_dict() for event in events])
+        page_args = events_page_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        rows, next_cursor = repo.events_page(**page_args)
+        response = app.response_class(encode_rows(EVENT_FIELDS, rows, EVENT_FORMATTERS),
+                                      mimetype='application/json')
+        if next_cursor:
+            args = request.args.to_dict()
+            args['after'] = next_cursor
+            response.headers['X-Next-Cursor'] = next_cursor
+            response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/events/search', methods=['GET'])
+def search_events():
+    """Full-text search over event name, artists, venue, city and description (q, limit)"""
+    try:
+        args = search_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        return jsonify(search_results(repo.search_events(**args), args['terms']))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -288,36 +271,44 @@ def get_events():
 def get_event(event_id):
     """Get single event"""
     try:
-        event = Event.query.get_or_404(event_id)
-        return jsonify(event.to_dict())
+        event = repo.get_event(event_id)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    if event is None:
+        return jsonify({'error': 'Event not found'}), 404
+    return jsonify(event_dict(event))
+
+@app.route('/api/artists', methods=['GET'])
+def get_artists():
+    """Artists with their number of events, busiest first"""
+    try:
+        return jsonify([artist_dict(artist) for artist in repo.list_artists()])
     except Exception as e:
-        return jsonify({'error': str(e)}), 404
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/artists/<slug>/events', methods=['GET'])
+def get_artist_events(slug):
+    """An artist and their events, newest first"""
+    try:
+        artist, events = repo.artist_events(slug)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    if artist is None:
+        return jsonify({'error': 'Artist not found'}), 404
+    return jsonify({'artist': {'name': artist.name, 'slug': artist.slug},
+                    'events': [event_dict(event) for event in events]})
 
 @app.route('/api/events', methods=['POST'])
 def create_event():
     """Create new event"""
     try:
-        data = request.get_json()
-        
-        event = Event(
-            name=data.get('name'),
-            date=data.get('date'),
-            time=data.get('time'),
-            venue=data.get('venue'),
-            city=data.get('city'),
-            type=data.get('type', 'club'),
-            description=data.get('description'),
-            artists=data.get('artists'),
-            price=data.get('price'),
-            capacity=data.get('capacity'),
-            image_url=data.get('image_url'),
-            status=data.get('status', 'upcoming')
-        )
-        
-        db.session.add(event)
+        event = repo.create_event(event_values(request.get_json()))
         db.session.commit()
         
-        return jsonify(event.to_dict()), 201
+        return jsonify(event_dict(event)), 201
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -326,19 +317,16 @@ def create_event():
 def update_event(event_id):
     """Update event"""
     try:
-        event = Event.query.get_or_404(event_id)
-        data = request.get_json()
-        
-        # Update fields
-        for key in ['name', 'date', 'time', 'venue', 'city', 'type', 'description', 
-                    'artists', 'price', 'capacity', 'image_url', 'status']:
-            if key in data:
-                setattr(event, key, data[key])
-        
-        event.updated_at = datetime.utcnow()
+        event = repo.update_event(event_id, event_values(request.get_json(), partial=True))
+        if event is None:
+            db.session.rollback()
+            return jsonify({'error': 'Event not found'}), 404
         db.session.commit()
         
-        return jsonify(event.to_dict())
+        return jsonify(event_dict(event))
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -347,8 +335,8 @@ def update_event(event_id):
 def delete_event(event_id):
     """Delete event"""
     try:
-        event = Event.query.get_or_404(event_id)
-        db.session.delete(event)
+        if not repo.delete_event(event_id):
+            return jsonify({'error': 'Event not found'}), 404
         db.session.commit()
         
         return jsonify({'message': 'Event deleted successfully'})
@@ -361,8 +349,8 @@ def delete_event(event_id):
 def get_bookings():
     """Get all bookings"""
     try:
-        bookings = Booking.query.order_by(Booking.created_at.desc()).all()
-        return jsonify([booking.to_dict() for booking in bookings])
+        body = encode_rows(BOOKING_FIELDS, repo.list_bookings(), BOOKING_FORMATTERS)
+        return app.response_class(body, mimetype='application/json')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -370,34 +358,7 @@ def get_bookings():
 def create_booking():
     """Create new booking"""
     try:
-        data = request.get_json()
-        
-        # Generate calendar event data
-        event_title = f"ARCH1TECT @ {data.get('venue', 'Club HAOS')}"
-        event_location = f"{data.get('venue', 'Club HAOS')}, {data.get('city', 'Gdańsk')}"
-        calendar_platforms = "Google Calendar,Apple Calendar,Outlook,Office 365"
-        
-        booking = Booking(
-            event_id=data.get('event_id'),
-            name=data.get('name'),
-            email=data.get('email'),
-            phone=data.get('phone'),
-            event_date=data.get('event_date'),
-            event_type=data.get('event_type'),
-            start_time=data.get('start_time'),
-            duration=data.get('duration', 240),  # Default 4 hours for club events
-            venue=data.get('venue'),
-            city=data.get('city'),
-            guests=data.get('guests'),
-            message=data.get('message'),
-            status='pending',
-            calendar_event_sent=True,  # We provide calendar integration
-            calendar_platforms=calendar_platforms,
-            event_title=event_title,
-            event_location=event_location
-        )
-        
-        db.session.add(booking)
+        booking = repo.create_booking(booking_values(request.get_json()))
         db.session.commit()
         
         # Send confirmation email
@@ -406,7 +367,10 @@ def create_booking():
         except Exception as email_error:
             print(f"Email error: {email_error}")
         
-        return jsonify(booking.to_dict()), 201
+        return jsonify(booking_dict(booking)), 201
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -415,8 +379,9 @@ def create_booking():
 def approve_booking(booking_id):
     """Approve booking"""
     try:
-        booking = Booking.query.get_or_404(booking_id)
-        booking.status = 'approved'
+        booking = repo.set_booking_status(booking_id, 'approved')
+        if booking is None:
+            return jsonify({'error': 'Booking not found'}), 404
         db.session.commit()
         
         # Send approval email
@@ -425,7 +390,7 @@ def approve_booking(booking_id):
         except Exception as email_error:
             print(f"Email error: {email_error}")
         
-        return jsonify(booking.to_dict())
+        return jsonify(booking_dict(booking))
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -434,11 +399,12 @@ def approve_booking(booking_id):
 def reject_booking(booking_id):
     """Reject booking"""
     try:
-        booking = Booking.query.get_or_404(booking_id)
-        booking.status = 'rejected'
+        booking = repo.set_booking_status(booking_id, 'rejected')
+        if booking is None:
+            return jsonify({'error': 'Booking not found'}), 404
         db.session.commit()
         
-        return jsonify(booking.to_dict())
+        return jsonify(booking_dict(booking))
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -446,126 +412,18 @@ def reject_booking(booking_id):
 # Email functions
 def send_booking_confirmation(booking_id):
     """Send booking confirmation email with calendar integration"""
-    booking = Booking.query.get(booking_id)
+    booking = repo.get_booking(booking_id)
     if not booking:
         return
     
     # Generate calendar URLs
     calendar_urls = generate_calendar_urls(booking)
     
-    html_template = '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    </head>
-    <body style="margin: 0; padding: 0; font-family: Arial, sans-serif; background: #0a0a0a;">
-        <div style="max-width: 600px; margin: 0 auto; background: linear-gradient(135deg, #1a0a1a 0%, #0a0a0a 100%);">
-            <div style="background: linear-gradient(135deg, #ff0080 0%, #ff0080 100%); padding: 30px; text-align: center;">
-                <h1 style="color: white; margin: 0; font-size: 32px; text-shadow: 0 0 20px rgba(255,0,255,0.5);">
-                    🎧 ARCH1TECT
-                </h1>
-            </div>
-            
-            <div style="padding: 40px 30px; color: #fff;">
-                <h2 style="color: #ff0080; margin-top: 0;">Potwierdzenie rezerwacji</h2>
-                
-                <p style="color: #ccc; line-height: 1.6;">Cześć <strong>{{ name }}</strong>!</p>
-                
-                <p style="color: #ccc; line-height: 1.6;">
-                    Dziękujemy za rezerwację. Twoje zgłoszenie zostało przyjęte i oczekuje na potwierdzenie.
-                </p>
-                
-                <div style="background: rgba(255,0,128,0.1); border-left: 4px solid #ff0080; padding: 20px; margin: 30px 0;">
-                    <h3 style="color: #ff0080; margin-top: 0;">Szczegóły rezerwacji:</h3>
-                    <table style="width: 100%; color: #ccc;">
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Data:</strong></td>
-                            <td>{{ event_date }}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Godzina:</strong></td>
-                            <td>{{ start_time }}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Miejsce:</strong></td>
-                            <td>{{ venue }}, {{ city }}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Typ:</strong></td>
-                            <td>{{ event_type }}</td>
-                        </tr>
-                        {% if duration %}
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Czas trwania:</strong></td>
-                            <td>{{ duration }} godzin</td>
-                        </tr>
-                        {% endif %}
-                    </table>
-                </div>
-                
-                <p style="color: #ccc; line-height: 1.6;">
-                    Skontaktujemy się z Tobą wkrótce, aby potwierdzić szczegóły.
-                </p>
-                
-                {% if calendar_urls %}
-                <div style="background: rgba(0,255,255,0.05); border: 2px solid rgba(0,255,255,0.3); border-radius: 10px; padding: 25px; margin: 30px 0;">
-                    <h3 style="color: #00ffff; margin-top: 0; text-align: center;">📅 Dodaj do kalendarza</h3>
-                    <p style="color: #ccc; text-align: center; font-size: 14px; margin-bottom: 20px;">
-                        Kliknij, aby dodać wydarzenie do swojego kalendarza:
-                    </p>
-                    
-                    <table style="width: 100%; border-collapse: collapse;">
-                        <tr>
-                            <td style="padding: 8px; text-align: center;">
-                                <a href="{{ calendar_urls.google }}" 
-                                   style="display: inline-block; background: linear-gradient(135deg, #4285f4, #34a853); color: white; padding: 12px 20px; text-decoration: none; border-radius: 8px; font-weight: bold; min-width: 150px;">
-                                    📱 Google Calendar
-                                </a>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px; text-align: center;">
-                                <a href="{{ calendar_urls.outlook }}" 
-                                   style="display: inline-block; background: linear-gradient(135deg, #0078d4, #106ebe); color: white; padding: 12px 20px; text-decoration: none; border-radius: 8px; font-weight: bold; min-width: 150px;">
-                                    📧 Outlook
-                                </a>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px; text-align: center;">
-                                <a href="{{ calendar_urls.office365 }}" 
-                                   style="display: inline-block; background: linear-gradient(135deg, #d83b01, #c239b3); color: white; padding: 12px 20px; text-decoration: none; border-radius: 8px; font-weight: bold; min-width: 150px;">
-                                    💼 Office 365
-                                </a>
-                            </td>
-                        </tr>
-                    </table>
-                    
-                    <p style="color: #888; text-align: center; font-size: 12px; margin-top: 15px; margin-bottom: 0;">
-                        🍎 <strong>iPhone/Mac?</strong> Otwórz link w Safari, a następnie wybierz "Dodaj do Kalendarza"
-                    </p>
-                </div>
-                {% endif %}
-                
-                <div style="margin-top: 40px; padding-top: 30px; border-top: 1px solid rgba(255,0,128,0.3); text-align: center;">
-                    <p style="color: #888; font-size: 14px;">
-                        ARCH1TECT | HAOS.fm<br>
-                        Email: arch1tect@haos.fm
-                    </p>
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>
-    '''
-    
-    template = Template(html_template)
-    html_content = template.render(
+    html_content = render_email(
+        'booking_confirmation.html',
         name=booking.name,
         event_date=booking.event_date,
-        start_time=booking.start_time,
+        start_time=format_time(booking.start_time),
         venue=booking.venue,
         city=booking.city,
         event_type=booking.event_type,
@@ -573,14 +431,14 @@ def send_booking_confirmation(booking_id):
         calendar_urls=calendar_urls
     )
     
-    msg = Message(
+    msg = mail_message(
         subject='🎉 Potwierdzenie rezerwacji - ARCH1TECT',
         recipients=[booking.email],
         html=html_content
     )
     
     try:
-        mail.send(msg)
+        mail_pool.send(msg)
         print(f"✅ [EMAIL] Email sent successfully to {booking.email}!")
         
         # Send SMS notification if Twilio is configured
@@ -593,92 +451,35 @@ def send_booking_confirmation(booking_id):
 
 def send_booking_approval(booking_id):
     """Send booking approval email"""
-    booking = Booking.query.get(booking_id)
+    booking = repo.get_booking(booking_id)
     if not booking:
         return
     
-    html_template = '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    </head>
-    <body style="margin: 0; padding: 0; font-family: Arial, sans-serif; background: #0a0a0a;">
-        <div style="max-width: 600px; margin: 0 auto; background: linear-gradient(135deg, #1a0a1a 0%, #0a0a0a 100%);">
-            <div style="background: linear-gradient(135deg, #00ff88 0%, #00ccff 100%); padding: 30px; text-align: center;">
-                <h1 style="color: white; margin: 0; font-size: 32px;">
-                    ✅ ARCH1TECT
-                </h1>
-            </div>
-            
-            <div style="padding: 40px 30px; color: #fff;">
-                <h2 style="color: #00ff88; margin-top: 0;">Rezerwacja zatwierdzona!</h2>
-                
-                <p style="color: #ccc; line-height: 1.6;">Cześć <strong>{{ name }}</strong>!</p>
-                
-                <p style="color: #ccc; line-height: 1.6;">
-                    Świetne wiadomości! Twoja rezerwacja została <strong style="color: #00ff88;">zatwierdzona</strong>.
-                </p>
-                
-                <div style="background: rgba(0,255,136,0.1); border-left: 4px solid #00ff88; padding: 20px; margin: 30px 0;">
-                    <h3 style="color: #00ff88; margin-top: 0;">Potwierdzone szczegóły:</h3>
-                    <table style="width: 100%; color: #ccc;">
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Data:</strong></td>
-                            <td>{{ event_date }}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Godzina:</strong></td>
-                            <td>{{ start_time }}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Miejsce:</strong></td>
-                            <td>{{ venue }}, {{ city }}</td>
-                        </tr>
-                    </table>
-                </div>
-                
-                <p style="color: #ccc; line-height: 1.6;">
-                    Do zobaczenia na evencie! 🎵
-                </p>
-                
-                <div style="margin-top: 40px; padding-top: 30px; border-top: 1px solid rgba(0,255,136,0.3); text-align: center;">
-                    <p style="color: #888; font-size: 14px;">
-                        ARCH1TECT<br>
-                        Email: booking@arch1tect.pl
-                    </p>
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>
-    '''
-    
-    template = Template(html_template)
-    html_content = template.render(
+    html_content = render_email(
+        'booking_approval.html',
         name=booking.name,
         event_date=booking.event_date,
-        start_time=booking.start_time,
+        start_time=format_time(booking.start_time),
         venue=booking.venue,
         city=booking.city
     )
     
-    msg = Message(
+    msg = mail_message(
         subject='🎉 Twoja rezerwacja została zatwierdzona - ARCH1TECT',
         recipients=[booking.email],
         html=html_content
     )
     
-    mail.send(msg)
+    mail_pool.send(msg)
 
 # Health check
 @app.route('/api/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'ok', 'message': 'ARCH1TECT API is running', 'database': 'PostgreSQL'})
+    return jsonify({'status': 'ok', 'message': 'ARCH1TECT API is running', 'database': 'PostgreSQL',
+                    'db_pool': checkout_stats.stats(), 'queries': query_stats.stats()})
 
-# Initialize database on startup
-with app.app_context():
+# Initialize database on startup (skipped on serverless cold starts, see CREATE_SCHEMA_ON_STARTUP)
+if CREATE_SCHEMA_ON_STARTUP:
     try:
         init_db()
     except Exception as e:
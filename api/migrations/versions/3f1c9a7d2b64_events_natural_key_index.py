@@ -0,0 +1,43 @@
+"""Index events on (name, date, venue) for the bulk import
+
+backend/event_import.py matches every imported row against stored events
+on this natural key, one batch of keys per SELECT. The index is not
+unique - existing duplicates are left alone and only matched once.
+
+Revision ID: 3f1c9a7d2b64
+Revises: aefc6ce15562
+Create Date: 2026-10-18 15:02:37.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7d2b64'
+down_revision = 'aefc6ce15562'
+branch_labels = None
+depends_on = None
+
+INDEX = 'ix_events_name_date_venue'
+
+
+def _has_table():
+    return 'events' in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if not _has_table():
+        return  # created with the index by create_all()
+
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(INDEX, 'events', ['name', 'date', 'venue'],
+                            postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index(INDEX, 'events', ['name', 'date', 'venue'], if_not_exists=True)
+
+
+def downgrade():
+    if _has_table():
+        op.drop_index(INDEX, table_name='events', if_exists=True)
@@ -0,0 +1,267 @@
+"""Typed, indexed date/time columns for events and bookings
+
+Converts events.date/time and bookings.event_date/start_time from
+VARCHAR(50) to DATE/TIME and adds the composite indexes used by the
+events listing and the bookings calendar.
+
+The conversion is done online: typed shadow columns are added together
+with a trigger that clears a shadow value whenever its source column is
+written, existing rows are backfilled in small committed batches (so the
+tables are never locked for the whole copy) and a catch-up pass re-parses
+the rows cleared meanwhile. Only the final catch-up and the column swap
+run with the table locked against writes, so no write can slip in
+between. On PostgreSQL the indexes are built with CREATE INDEX
+CONCURRENTLY.
+
+Values that can't be parsed (or a missing events.date) stop the upgrade
+with the list of offending rows; fix them by hand and run it again - it
+resumes from the shadow columns already in place.
+
+Revision ID: 69bfddbb5a8b
+Revises:
+Create Date: 2026-10-18 11:02:14.204831
+
+"""
+from contextlib import nullcontext
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '69bfddbb5a8b'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+MAX_REPORTED = 20
+
+DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%Y/%m/%d')
+TIME_FORMATS = ('%H:%M', '%H:%M:%S', '%H.%M')
+
+# table -> [(column, typed column type, parser, nullable)]
+COLUMNS = {
+    'events': [('date', sa.Date(), 'date', False), ('time', sa.Time(), 'time', True)],
+    'bookings': [('event_date', sa.Date(), 'date', True), ('start_time', sa.Time(), 'time', True)],
+}
+
+# table -> [(index name, columns)]
+INDEXES = {
+    'events': [
+        ('ix_events_date_id', ['date', 'id']),
+        ('ix_events_status_date_id', ['status', 'date', 'id']),
+    ],
+    'bookings': [
+        ('ix_bookings_event_date_status', ['event_date', 'status']),
+        ('ix_bookings_created_at', ['created_at']),
+    ],
+}
+
+
+def _parse(value, kind):
+    """Parse a legacy string value, returning None when it can't be read"""
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        return value  # already typed
+    value = value.strip()
+    formats = DATE_FORMATS if kind == 'date' else TIME_FORMATS
+    for fmt in formats:
+        try:
+            parsed = datetime.strptime(value[:10] if kind == 'date' else value, fmt)
+        except ValueError:
+            continue
+        return parsed.date() if kind == 'date' else parsed.time()
+    return None
+
+
+def _existing_tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _column_names(table):
+    return {col['name'] for col in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _is_typed(table, column):
+    for col in sa.inspect(op.get_bind()).get_columns(table):
+        if col['name'] == column:
+            return not isinstance(col['type'], sa.String)
+    return False
+
+
+def _trigger_name(table, column):
+    return f'{table}_{column}_typed_stale'
+
+
+def _create_trigger(table, column):
+    """Clear <column>_typed on every write of <column>, so the catch-up re-parses it"""
+    name = _trigger_name(table, column)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f'''
+            CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$
+            BEGIN
+                NEW.{column}_typed := NULL;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql''')
+        op.execute(f'DROP TRIGGER IF EXISTS {name} ON {table}')
+        op.execute(f'CREATE TRIGGER {name} BEFORE INSERT OR UPDATE OF {column} ON {table} '
+                   f'FOR EACH ROW EXECUTE FUNCTION {name}()')
+    else:
+        op.execute(f'CREATE TRIGGER IF NOT EXISTS {name} AFTER UPDATE OF {column} ON {table} '
+                   f'BEGIN UPDATE {table} SET {column}_typed = NULL WHERE id = new.id; END')
+
+
+def _drop_trigger(table, column):
+    name = _trigger_name(table, column)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f'DROP TRIGGER IF EXISTS {name} ON {table}')
+        op.execute(f'DROP FUNCTION IF EXISTS {name}()')
+    else:
+        op.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+
+def _lock(table):
+    """Block writes to `table` until the end of the current transaction"""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f'LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE')
+    else:
+        op.execute(f'UPDATE {table} SET id = id WHERE 0')  # takes the database write lock
+
+
+def _backfill(table, column, type_, kind, nullable, stale_only, autocommit=True):
+    """Copy `column` into `<column>_typed` in batches of BATCH_SIZE
+
+    With autocommit every batch is committed on its own; without it the
+    copy joins the current transaction (and its locks). stale_only
+    limits it to rows whose typed value is still or again NULL. Raises
+    RuntimeError listing the values that can't be parsed.
+    """
+    unreadable = []
+    last_id = 0
+    with op.get_context().autocommit_block() if autocommit else nullcontext():
+        bind = op.get_bind()
+        source = sa.table(table, sa.column('id'), sa.column(column), sa.column(f'{column}_typed', type_))
+        while True:
+            query = sa.select(source.c.id, source.c[column]).where(source.c.id > last_id)
+            if stale_only:
+                query = query.where(source.c[f'{column}_typed'].is_(None))
+                if nullable:
+                    query = query.where(source.c[column].isnot(None), source.c[column] != '')
+            rows = bind.execute(query.order_by(source.c.id).limit(BATCH_SIZE)).fetchall()
+            if not rows:
+                break
+
+            updates = []
+            for row_id, value in rows:
+                typed = _parse(value, kind)
+                if typed is None and (value not in (None, '') or not nullable):
+                    unreadable.append((row_id, value))
+                updates.append({'row_id': row_id, 'source': value, 'value': typed})
+
+            # Rows rewritten since they were read keep the NULL set by the
+            # trigger and are picked up by the next catch-up
+            bind.execute(
+                source.update()
+                .where(source.c.id == sa.bindparam('row_id'), source.c[column] == sa.bindparam('source'))
+                .values({f'{column}_typed': sa.bindparam('value')}),
+                updates
+            )
+            last_id = rows[-1][0]
+
+    if unreadable:
+        listed = ', '.join(f'id={row_id} {value!r}' for row_id, value in unreadable[:MAX_REPORTED])
+        more = f' and {len(unreadable) - MAX_REPORTED} more' if len(unreadable) > MAX_REPORTED else ''
+        raise RuntimeError(f'{table}.{column}: {len(unreadable)} value(s) are not a valid {kind}: '
+                           f'{listed}{more}. Fix them and run the upgrade again.')
+
+
+def _drop_indexes(table):
+    existing = {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+    for name, _ in INDEXES[table]:
+        if name in existing:
+            op.drop_index(name, table_name=table)
+
+
+def _create_indexes(table):
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, columns in INDEXES[table]:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, columns in INDEXES[table]:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def upgrade():
+    tables = _existing_tables()
+
+    for table, columns in COLUMNS.items():
+        if table not in tables:
+            continue  # created with typed columns by the Events API on first start
+
+        pending = [c for c in columns if not _is_typed(table, c[0])]
+        if pending:
+            # 1. Typed shadow columns (kept if a previous run was interrupted),
+            #    cleared by a trigger whenever the source is written
+            existing = _column_names(table)
+            with op.batch_alter_table(table) as batch:
+                for column, type_, _, _ in pending:
+                    if f'{column}_typed' not in existing:
+                        batch.add_column(sa.Column(f'{column}_typed', type_, nullable=True))
+            for column, _, _, _ in pending:
+                _create_trigger(table, column)
+
+            # 2. Backfill in batches, then catch up on rows written meanwhile
+            for column, type_, kind, nullable in pending:
+                _backfill(table, column, type_, kind, nullable, stale_only=False)
+                _backfill(table, column, type_, kind, nullable, stale_only=True)
+
+            # 3. Final catch-up and swap with writes blocked
+            _lock(table)
+            for column, type_, kind, nullable in pending:
+                _backfill(table, column, type_, kind, nullable, stale_only=True, autocommit=False)
+                _drop_trigger(table, column)
+            _drop_indexes(table)
+            with op.batch_alter_table(table) as batch:
+                for column, type_, _, nullable in pending:
+                    batch.drop_column(column)
+                    batch.alter_column(f'{column}_typed', new_column_name=column,
+                                       existing_type=type_, nullable=nullable)
+
+        # 4. Indexes for the hot sort/filter paths
+        _create_indexes(table)
+
+
+def downgrade():
+    tables = _existing_tables()
+
+    for table, columns in COLUMNS.items():
+        if table not in tables:
+            continue
+
+        _drop_indexes(table)
+        bind = op.get_bind()
+        for column, type_, kind, nullable in columns:
+            if not _is_typed(table, column):
+                continue
+            with op.batch_alter_table(table) as batch:
+                batch.add_column(sa.Column(f'{column}_text', sa.String(50), nullable=True))
+
+            source = sa.table(table, sa.column(column, type_), sa.column(f'{column}_text'))
+            rows = bind.execute(sa.select(sa.distinct(source.c[column]))).scalars().all()
+            for value in rows:
+                if value is None:
+                    continue
+                text = value.isoformat() if kind == 'date' else value.strftime('%H:%M')
+                bind.execute(source.update().where(source.c[column] == value)
+                             .values({f'{column}_text': text}))
+
+            with op.batch_alter_table(table) as batch:
+                batch.drop_column(column)
+                batch.alter_column(f'{column}_text', new_column_name=column,
+                                   existing_type=sa.String(50), nullable=nullable)
@@ -0,0 +1,59 @@
+"""One active DJ booking per date, enforced by a partial unique index
+
+book_event() used to check for a pending/confirmed booking and then
+insert, so two concurrent requests could both pass the check. The
+partial unique index makes the database the arbiter; the route maps the
+violation to the "Ten termin jest już zarezerwowany" response.
+
+Existing duplicates are not resolved automatically - the upgrade stops
+and lists the dates so they can be cancelled by hand first.
+
+Revision ID: aefc6ce15562
+Revises: 69bfddbb5a8b
+Create Date: 2026-10-18 13:41:07.512309
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'aefc6ce15562'
+down_revision = '69bfddbb5a8b'
+branch_labels = None
+depends_on = None
+
+INDEX = 'uq_dj_bookings_active_date'
+ACTIVE_STATUS_SQL = "status IN ('pending', 'confirmed')"
+
+
+def _has_table():
+    return 'dj_bookings' in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if not _has_table():
+        return  # created with the index by create_all()
+
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(
+        f'SELECT event_date, COUNT(*) FROM dj_bookings WHERE {ACTIVE_STATUS_SQL} '
+        'GROUP BY event_date HAVING COUNT(*) > 1 ORDER BY event_date'
+    )).fetchall()
+    if duplicates:
+        dates = ', '.join(f'{day} ({count})' for day, count in duplicates)
+        raise RuntimeError(f'Several active bookings share a date: {dates}. '
+                           'Cancel the extra bookings, then run the upgrade again.')
+
+    where = {'postgresql_where': sa.text(ACTIVE_STATUS_SQL), 'sqlite_where': sa.text(ACTIVE_STATUS_SQL)}
+    if bind.dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(INDEX, 'dj_bookings', ['event_date'], unique=True,
+                            postgresql_concurrently=True, if_not_exists=True, **where)
+    else:
+        op.create_index(INDEX, 'dj_bookings', ['event_date'], unique=True, if_not_exists=True, **where)
+
+
+def downgrade():
+    if _has_table():
+        op.drop_index(INDEX, table_name='dj_bookings', if_exists=True)
@@ -0,0 +1,92 @@
+"""Full-text search index for events
+
+Adds the index behind GET /api/events/search (backend/event_search.py)
+to an existing events table - new databases get it from create_all():
+
+- SQLite: contentless FTS5 table events_fts, filled from the existing
+  rows and kept in sync by insert/update/delete triggers.
+- PostgreSQL: generated tsvector column events.search_vector plus a GIN
+  index built CONCURRENTLY. Adding a stored generated column rewrites
+  the table under an exclusive lock - quick for the events table, but
+  run it outside peak hours.
+
+Both fold Polish diacritics, with 'ł' mapped to 'l' by hand.
+
+Revision ID: b7e2d4c9a1f3
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-18 17:24:51.630127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d4c9a1f3'
+down_revision = '3f1c9a7d2b64'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('name', 'artists', 'venue', 'city', 'description')
+WEIGHTS = 'ABCCD'
+
+_FOLD_FROM = 'ąćęłńóśźżáàâäãåéèêëíìîïòôöõúùûüýÿçčďěňřšťůž'
+_FOLD_TO = 'acelnoszzaaaaaaeeeeiiiioooouuuuyyccdenrstuz'
+FOLD_FROM, FOLD_TO = _FOLD_FROM + _FOLD_FROM.upper(), _FOLD_TO + _FOLD_TO.upper()
+
+
+def _sqlite_folded(prefix):
+    return ', '.join(f"replace(replace({prefix}.{name}, 'ł', 'l'), 'Ł', 'L')" for name in COLUMNS)
+
+
+_NAMES = ', '.join(COLUMNS)
+_INSERT = f'INSERT INTO events_fts(rowid, {_NAMES}) VALUES (new.id, {_sqlite_folded("new")});'
+_DELETE = f"INSERT INTO events_fts(events_fts, rowid, {_NAMES}) VALUES ('delete', old.id, {_sqlite_folded('old')});"
+
+SQLITE_UPGRADE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5({_NAMES}, content='', "
+    f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "INSERT INTO events_fts(events_fts) VALUES ('delete-all')",
+    f'INSERT INTO events_fts(rowid, {_NAMES}) SELECT id, {_sqlite_folded("events")} FROM events',
+    f'CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN {_INSERT} END',
+    f'CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN {_DELETE} END',
+    f'CREATE TRIGGER IF NOT EXISTS events_fts_update AFTER UPDATE OF {_NAMES} ON events BEGIN {_DELETE} {_INSERT} END',
+)
+SQLITE_DOWNGRADE = ('DROP TRIGGER IF EXISTS events_fts_update', 'DROP TRIGGER IF EXISTS events_fts_delete',
+                    'DROP TRIGGER IF EXISTS events_fts_insert', 'DROP TABLE IF EXISTS events_fts')
+
+_VECTOR = ' || '.join(
+    f"setweight(to_tsvector('simple'::regconfig, translate(coalesce({name}, ''), '{FOLD_FROM}', '{FOLD_TO}')), "
+    f"'{weight}')"
+    for name, weight in zip(COLUMNS, WEIGHTS)
+)
+
+
+def _has_table():
+    return 'events' in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if not _has_table():
+        return  # created with the index by create_all()
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f'ALTER TABLE events ADD COLUMN IF NOT EXISTS search_vector tsvector '
+                   f'GENERATED ALWAYS AS ({_VECTOR}) STORED')
+        with op.get_context().autocommit_block():
+            op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_events_search ON events USING gin (search_vector)')
+    else:
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade():
+    if not _has_table():
+        return
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_events_search')
+        op.execute('ALTER TABLE events DROP COLUMN IF EXISTS search_vector')
+    else:
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
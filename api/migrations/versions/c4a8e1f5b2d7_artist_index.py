@@ -0,0 +1,117 @@
+"""Normalized artist index: artists and event_artists
+
+Creates the tables behind GET /api/artists and /api/artists/<slug>/events
+(backend/artist_index.py) and backfills them by parsing events.artists
+of the existing rows, BATCH_SIZE events at a time. From then on the
+application keeps the links current on every event write.
+
+The line-up parsing and slugs are frozen here as they were when the
+migration was written; later changes to artist_index.py only affect
+new writes.
+
+Revision ID: c4a8e1f5b2d7
+Revises: b7e2d4c9a1f3
+Create Date: 2026-10-18 19:08:33.415962
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a8e1f5b2d7'
+down_revision = 'b7e2d4c9a1f3'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+_SEPARATORS = re.compile(r'\s*(?:[,;/+&|\n]|\bb2b\b|\bvs\b\.?|\bfeat\b\.?|\bft\b\.?)\s*', re.IGNORECASE)
+_WORD = re.compile(r'[^\W_]+')
+
+
+def _slugify(name):
+    name = name.replace('ł', 'l').replace('Ł', 'L')
+    folded = ''.join(c for c in unicodedata.normalize('NFKD', name) if not unicodedata.combining(c)).lower()
+    return '-'.join(_WORD.findall(folded))[:255]
+
+
+def _parse_artists(text):
+    artists = {}
+    for name in _SEPARATORS.split(text or ''):
+        name = ' '.join(name.split())[:255]
+        slug = _slugify(name)
+        if slug and slug not in artists:
+            artists[slug] = name
+    return list(artists.items())
+
+
+def _existing_tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _backfill(artists, event_artists):
+    bind = op.get_bind()
+    events = sa.table('events', sa.column('id'), sa.column('artists'))
+    ids = {}
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(events.c.id, events.c.artists)
+            .where(events.c.id > last_id, events.c.artists.isnot(None))
+            .order_by(events.c.id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        lineups = {row.id: _parse_artists(row.artists) for row in rows}
+        new = {}
+        for lineup in lineups.values():
+            for slug, name in lineup:
+                if slug not in ids:
+                    new.setdefault(slug, name)
+        if new:
+            bind.execute(artists.insert(), [{'slug': slug, 'name': name} for slug, name in new.items()])
+            ids.update(bind.execute(
+                sa.select(artists.c.slug, artists.c.id).where(artists.c.slug.in_(list(new)))
+            ).fetchall())
+        links = [{'event_id': event_id, 'artist_id': ids[slug], 'position': position}
+                 for event_id, lineup in lineups.items() for position, (slug, _) in enumerate(lineup)]
+        if links:
+            bind.execute(event_artists.insert(), links)
+
+
+def upgrade():
+    tables = _existing_tables()
+    if 'events' not in tables or 'artists' in tables:
+        return  # created by create_all()
+
+    artists = op.create_table(
+        'artists',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('slug', sa.String(length=255), nullable=False),
+    )
+    op.create_index('ux_artists_slug', 'artists', ['slug'], unique=True)
+    event_artists = op.create_table(
+        'event_artists',
+        sa.Column('event_id', sa.Integer(), sa.ForeignKey('events.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('artist_id', sa.Integer(), sa.ForeignKey('artists.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('position', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_event_artists_artist_event', 'event_artists', ['artist_id', 'event_id'])
+    _backfill(artists, event_artists)
+
+
+def downgrade():
+    tables = _existing_tables()
+    if 'event_artists' in tables:
+        op.drop_index('ix_event_artists_artist_event', table_name='event_artists')
+        op.drop_table('event_artists')
+    if 'artists' in tables:
+        op.drop_index('ux_artists_slug', table_name='artists')
+        op.drop_table('artists')
@@ -2,11 +2,23 @@
 from datetime import datetime
 from api import db
 
+# Statuses that hold a date - at most one such booking per date
+ACTIVE_STATUSES = ('pending', 'confirmed')
+ACTIVE_STATUS_SQL = f"status IN ({', '.join(repr(s) for s in ACTIVE_STATUSES)})"
+
 
 class DJBooking(db.Model):
     """DJ Booking model for event scheduling."""
     
     __tablename__ = 'dj_bookings'
+    __table_args__ = (
+        # Enforced by the database, so concurrent bookings cannot both win
+        db.Index(
+            'uq_dj_bookings_active_date', 'event_date', unique=True,
+            postgresql_where=db.text(ACTIVE_STATUS_SQL),
+            sqlite_where=db.text(ACTIVE_STATUS_SQL)
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
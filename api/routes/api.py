@@ -1,17 +1,144 @@
 """Main API routes for DJ booking system."""
-from flask import Blueprint, request, jsonify, current_app
-from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app, has_app_context
+from datetime import date, datetime
+from functools import partial
+from sqlalchemy import event, func, inspect, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
 from api import db
 from api.models.customer import Customer
-from api.models.dj_booking import DJBooking
+from api.models.dj_booking import DJBooking, ACTIVE_STATUSES
 from api.models.event_service import EventService
 from api.models.notification import Notification
 from api.config.email import send_contact_email, send_booking_confirmation
+import base64
+import calendar
+import json
 import re
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 
 
+# Fields refreshed when a returning customer books again
+CUSTOMER_UPDATE_FIELDS = ('first_name', 'last_name', 'phone', 'company', 'updated_at')
+
+
+def upsert_customer(data):
+    """
+    Insert the customer or update the existing one (matched by email) and
+    return its id - a single INSERT ... ON CONFLICT ... RETURNING round trip.
+    """
+    name_parts = data['name'].split(' ', 1)
+    values = {
+        'first_name': name_parts[0] if name_parts else 'Klient',
+        'last_name': name_parts[1] if len(name_parts) > 1 else '',
+        'email': data['email'],
+        'phone': data['phone'],
+        'company': data.get('company'),
+        'address': data.get('venue_address'),
+        'city': data.get('venue_city'),
+        'updated_at': datetime.utcnow()
+    }
+    
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(Customer).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Customer.email],
+            set_={field: stmt.excluded[field] for field in CUSTOMER_UPDATE_FIELDS}
+        ).returning(Customer.id)
+        return db.session.execute(stmt).scalar_one()
+    
+    # Other databases: look up, then update or insert
+    customer = Customer.query.filter_by(email=data['email']).first()
+    if customer:
+        for field in CUSTOMER_UPDATE_FIELDS:
+            setattr(customer, field, values[field])
+    else:
+        customer = Customer(**values)
+        db.session.add(customer)
+        db.session.flush()
+    return customer.id
+
+
+def mark_confirmation_sent(app, booking_id):
+    """Record a sent confirmation - runs after the response has gone out"""
+    with app.app_context():
+        try:
+            db.session.execute(
+                update(DJBooking).where(DJBooking.id == booking_id).values(confirmation_sent=True)
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f'Could not record confirmation for booking {booking_id}: {str(e)}')
+
+
+def booked_days(key, start, end=None):
+    """
+    {date: number of active bookings} for start..end (inclusive), from one
+    grouped query, cached until a committed booking insert, delete or
+    status/date change (see the hooks below).
+    """
+    cache = current_app.extensions['cache']
+    hit = cache.get('availability', key)
+    if hit:
+        counts = json.loads(hit[0])
+    else:
+        query = db.session.query(DJBooking.event_date, func.count(DJBooking.id)).filter(
+            DJBooking.status.in_(ACTIVE_STATUSES),
+            DJBooking.event_date >= start
+        )
+        if end:
+            query = query.filter(DJBooking.event_date <= end)
+        counts = {day.isoformat(): count for day, count in query.group_by(DJBooking.event_date)}
+        cache.set('availability', key, json.dumps(counts).encode())
+    return {date.fromisoformat(day): count for day, count in counts.items()}
+
+
+# Drop the cached availability whenever a committed transaction added or
+# removed a booking or changed its status/date (book, cancel, confirm,
+# reject, admin edits). Bulk UPDATEs and raw SQL have to call
+# current_app.extensions['cache'].invalidate('availability') themselves.
+@event.listens_for(DJBooking, 'after_insert')
+@event.listens_for(DJBooking, 'after_delete')
+def _booking_added_or_removed(mapper, connection, target):
+    object_session(target).info['availability_changed'] = True
+
+
+@event.listens_for(DJBooking, 'after_update')
+def _booking_changed(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.status.history.has_changes() or state.attrs.event_date.history.has_changes():
+        object_session(target).info['availability_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_availability(session):
+    if session.info.pop('availability_changed', False) and has_app_context():
+        current_app.extensions['cache'].invalidate('availability')
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_availability_change(session):
+    session.info.pop('availability_changed', None)
+
+
+def booked_days_in_year(year):
+    return booked_days(str(year), date(year, 1, 1), date(year, 12, 31))
+
+
+def year_bitmap(year, days):
+    """Bit n (LSB first) is set when day n of the year (0 = 1 January) is booked"""
+    bits = bytearray(((366 if calendar.isleap(year) else 365) + 7) // 8)
+    for day in days:
+        n = day.timetuple().tm_yday - 1
+        bits[n // 8] |= 1 << (n % 8)
+    return base64.b64encode(bytes(bits)).decode()
+
+
 @bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -28,11 +155,8 @@ def list_services():
     Get list of available DJ services.
     """
     try:
-        services = EventService.query.filter_by(is_active=True).all()
-        return jsonify({
-            'success': True,
-            'services': [service.to_dict() for service in services]
-        }), 200
+        body = current_app.extensions['catalog'].snapshot().body
+        return current_app.response_class(body, mimetype='application/json'), 200
     except Exception as e:
         current_app.logger.error(f'Error fetching services: {str(e)}')
         return jsonify({
@@ -66,13 +190,7 @@ def check_availability():
             }), 400
         
         # Check for existing bookings on this date
-        existing_bookings = DJBooking.query.filter_by(
-            event_date=booking_date
-        ).filter(
-            DJBooking.status.in_(['pending', 'confirmed'])
-        ).all()
-        
-        is_available = len(existing_bookings) == 0
+        is_available = booking_date not in booked_days_in_year(booking_date.year)
         
         return jsonify({
             'success': True,
@@ -89,6 +207,74 @@ def check_availability():
         }), 500
 
 
+@bp.route('/availability', methods=['GET'])
+def availability():
+    """
+    Booked dates for a month (?year=&month=) or, without month, the whole
+    year as a compact bitmap.
+    """
+    try:
+        year = int(request.args.get('year', date.today().year))
+        month = int(request.args['month']) if request.args.get('month') else None
+        if not 1 <= year <= 9999 or (month is not None and not 1 <= month <= 12):
+            raise ValueError
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Nieprawidłowy miesiąc lub rok'
+        }), 400
+    
+    try:
+        days = booked_days_in_year(year)
+        if month is None:
+            return jsonify({
+                'success': True,
+                'year': year,
+                'days': 366 if calendar.isleap(year) else 365,
+                'bitmap': year_bitmap(year, days)
+            }), 200
+        
+        return jsonify({
+            'success': True,
+            'year': year,
+            'month': month,
+            'dates': sorted(day.isoformat() for day in days if day.month == month)
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f'Error fetching availability: {str(e)}')
+        return jsonify({
+            'success': False,
+            'error': 'Błąd podczas sprawdzania dostępności'
+        }), 500
+
+
+@bp.route('/bookings', methods=['GET'])
+def booked_dates():
+    """
+    Upcoming booked dates for the public calendar (?datesOnly=true).
+    Booking details are never exposed here.
+    """
+    if request.args.get('datesOnly', '').lower() != 'true':
+        return jsonify({
+            'success': False,
+            'error': 'Dostępny jest tylko widok dat (datesOnly=true)'
+        }), 400
+    
+    try:
+        today = date.today()
+        days = booked_days(f'upcoming:{today.isoformat()}', today)
+        return jsonify({
+            'success': True,
+            'dates': sorted(day.isoformat() for day in days)
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f'Error fetching booked dates: {str(e)}')
+        return jsonify({
+            'success': False,
+            'error': 'Błąd podczas sprawdzania dostępności'
+        }), 500
+
+
 @bp.route('/contact', methods=['POST'])
 def contact_form():
     """
@@ -180,72 +366,39 @@ def book_event():
                 'error': 'Nie można zarezerwować terminu w przeszłości'
             }), 400
         
-        # Check availability
-        existing_booking = DJBooking.query.filter_by(
-            event_date=event_date
-        ).filter(
-            DJBooking.status.in_(['pending', 'confirmed'])
-        ).first()
-        
-        if existing_booking:
-            return jsonify({
-                'success': False,
-                'error': 'Ten termin jest już zarezerwowany. Proszę wybrać inną datę.'
-            }), 400
-        
         # Find or create customer
-        customer = Customer.query.filter_by(email=data['email']).first()
+        customer_id = upsert_customer(data)
         
-        if customer:
-            # Update existing customer
-            name_parts = data['name'].split(' ', 1)
-            customer.first_name = name_parts[0] if name_parts else 'Klient'
-            customer.last_name = name_parts[1] if len(name_parts) > 1 else ''
-            customer.phone = data['phone']
-            customer.company = data.get('company')
-            customer.updated_at = datetime.utcnow()
-        else:
-            # Create new customer
-            name_parts = data['name'].split(' ', 1)
-            customer = Customer(
-                first_name=name_parts[0] if name_parts else 'Klient',
-                last_name=name_parts[1] if len(name_parts) > 1 else '',
-                email=data['email'],
-                phone=data['phone'],
-                company=data.get('company'),
-                address=data.get('venue_address'),
-                city=data.get('venue_city')
-            )
-            db.session.add(customer)
-            db.session.flush()  # Get customer ID
-        
-        # Find or create service
-        service_name = data.get('service', 'DJ Set - Club')
-        service = EventService.query.filter_by(name=service_name).first()
+        # Find service in the catalog snapshot
+        catalog = current_app.extensions['catalog'].snapshot()
+        service = catalog.by_name.get(data.get('service', 'DJ Set - Club'))
         
-        if not service:
+        if service is None and catalog.services:
             # Use first available service as fallback
-            service = EventService.query.first()
-            if not service:
-                # Create a basic service
-                service = EventService(
-                    name='DJ Set - Club',
-                    description='Professional DJ set for club events',
-                    service_type='dj_set_club',
-                    base_price=1500.00,
-                    min_hours=2,
-                    max_hours=8,
-                    is_active=True
-                )
-                db.session.add(service)
-                db.session.flush()
+            service = catalog.services[0]
+        if service is not None:
+            service_name, service_id = service['name'], service['id']
+        else:
+            # Create a basic service
+            service = EventService(
+                name='DJ Set - Club',
+                description='Professional DJ set for club events',
+                service_type='dj_set_club',
+                base_price=1500.00,
+                min_hours=2,
+                max_hours=8,
+                is_active=True
+            )
+            db.session.add(service)
+            db.session.flush()
+            service_name, service_id = service.name, service.id
         
         # Create booking
         event_title = f"{data['event_type'].title()} - {data['venue_name']}"
         
         booking = DJBooking(
-            customer_id=customer.id,
-            service_id=service.id,
+            customer_id=customer_id,
+            service_id=service_id,
             event_date=event_date,
             event_time=event_time,
             event_duration_hours=data.get('duration', 4),
@@ -263,11 +416,23 @@ def book_event():
         )
         
         db.session.add(booking)
-        db.session.commit()
+        try:
+            # Availability is enforced by the uq_dj_bookings_active_date index
+            db.session.flush()
+            booking_id = booking.id  # read before commit expires the object
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            if 'uq_dj_bookings_active_date' not in str(e.orig) and 'dj_bookings.event_date' not in str(e.orig):
+                raise
+            return jsonify({
+                'success': False,
+                'error': 'Ten termin jest już zarezerwowany. Proszę wybrać inną datę.'
+            }), 400
         
         # Prepare booking data for email
         booking_data = {
-            'id': booking.id,
+            'id': booking_id,
             'name': data['name'],
             'email': data['email'],
             'phone': data['phone'],
@@ -277,22 +442,17 @@ def book_event():
             'venue_name': data['venue_name'],
             'venue_address': data.get('venue_address', ''),
             'duration': data.get('duration', 4),
-            'service': service.name,
+            'service': service_name,
             'special_requests': data.get('special_requests', '')
         }
         
         # Send booking confirmation emails
         email_sent = send_booking_confirmation(booking_data)
         
-        # Update booking confirmation status
-        if email_sent:
-            booking.confirmation_sent = True
-            db.session.commit()
-        
-        return jsonify({
+        response = jsonify({
             'success': True,
             'message': 'Rezerwacja została przyjęta! Skontaktuję się wkrótce.',
-            'booking_id': booking.id,
+            'booking_id': booking_id,
             'booking_data': {
                 'event_date': booking_data['event_date'],
                 'event_time': booking_data['event_time'],
@@ -301,7 +461,12 @@ def book_event():
                 'duration': booking_data['duration']
             },
             'email_sent': email_sent
-        }), 201
+        })
+        response.status_code = 201
+        if email_sent:
+            # One commit on the request path; the flag is written once the client has its answer
+            response.call_on_close(partial(mark_confirmation_sent, current_app._get_current_object(), booking_id))
+        return response
         
     except Exception as e:
         db.session.rollback()
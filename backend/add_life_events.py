@@ -4,7 +4,6 @@ Add life events to the database
 """
 import os
 import sys
-from datetime import datetime
 from dotenv import load_dotenv
 
 # Add parent directory to path
@@ -14,6 +13,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 load_dotenv()
 
 from app import app, db, Event
+from event_import import EventImporter
 
 # Life events data
 LIFE_EVENTS = [
@@ -90,40 +90,19 @@ LIFE_EVENTS = [
 ]
 
 def add_life_events():
-    """Add life events to database"""
+    """Add life events to database (existing ones are updated in place)"""
     with app.app_context():
         print("🔍 Checking existing events...")
         
-        added_count = 0
-        updated_count = 0
-        
-        for event_data in LIFE_EVENTS:
-            # Check if event already exists (by name and date)
-            existing_event = Event.query.filter_by(
-                name=event_data['name'],
-                date=event_data['date']
-            ).first()
-            
-            if existing_event:
-                print(f"⚠️  Event already exists: {event_data['name']} ({event_data['date']})")
-                # Update existing event
-                for key, value in event_data.items():
-                    setattr(existing_event, key, value)
-                updated_count += 1
-            else:
-                # Create new event
-                event = Event(**event_data)
-                db.session.add(event)
-                print(f"✅ Adding: {event_data['name']} ({event_data['date']}) - {event_data['type']}")
-                added_count += 1
-        
-        # Commit all changes
-        db.session.commit()
+        report = EventImporter(db.session, Event).run(enumerate(LIFE_EVENTS, 1))
+        for change in report['changes']:
+            action = '✅ Adding' if change['action'] == 'insert' else '⚠️  Updating'
+            print(f"{action}: {change['key'][0]} ({change['key'][1]})")
         
         print(f"\n{'='*60}")
         print(f"✅ Successfully processed life events!")
-        print(f"   📊 Added: {added_count} events")
-        print(f"   🔄 Updated: {updated_count} events")
+        print(f"   📊 Added: {report['inserted']} events")
+        print(f"   🔄 Updated: {report['updated']} events")
         print(f"   📅 Total life events: {len(LIFE_EVENTS)}")
         print(f"{'='*60}\n")
         
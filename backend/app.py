@@ -2,37 +2,53 @@
 Events API with PostgreSQL/SQLAlchemy
 Supports both local development and Vercel deployment
 """
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, stream_with_context
 from flask_cors import CORS
 from flask_mail import Mail, Message
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import insert, select, update
 from datetime import datetime
+from urllib.parse import urlencode
+import csv
+import io
+import logging
 import os
-from jinja2 import Template
 from dotenv import load_dotenv
 from twilio.rest import Client
+from table_versions import versions, LocalVersionStore, RedisVersionStore
+from cache import cache_from_env
+from fast_json import encode_rows, encode_ndjson, rows_to_dicts
+from outbox import NotificationOutbox
+from smtp_pool import SMTPPool
+from email_templates import render as render_email
+from event_import import EventImporter, read_rows, FORMATS as IMPORT_FORMATS
+from db_engine import database_url, engine_options, checkout_stats
+from metrics import instrument_app, instrument_engine, external_call
+from sql_profiler import profile_app
+from structured_logging import configure_logging
+from repository import (
+    Repository, define_tables, event_dict, booking_dict, event_values, booking_values, events_page_args,
+    search_args, search_results, artist_dict,
+    format_time, parse_date_param, query_stats,
+    EVENT_FIELDS, BOOKING_FIELDS, EVENT_FORMATTERS, BOOKING_FORMATTERS,
+)
 
 # Load environment variables from .env file
 load_dotenv()
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor', 'Link', 'ETag', 'X-Request-ID'])
+
+# JSON log lines written by a background thread, tagged with the request ID (see structured_logging.py)
+configure_logging(app)
+log = logging.getLogger('arch1tect.bookings')
 
 # Database Configuration
 # Use PostgreSQL connection string from environment, fallback to SQLite for local dev
-DATABASE_URL = os.environ.get('DATABASE_URL') or os.environ.get('POSTGRES_URL')
-if DATABASE_URL and DATABASE_URL.startswith('postgres://'):
-    # Fix for SQLAlchemy 1.4+ (postgres:// -> postgresql://)
-    DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql://', 1)
-
-app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL or 'sqlite:///arch1tect.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = database_url(default='sqlite:///arch1tect.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_pre_ping': True,
-    'pool_recycle': 300,
-    'pool_size': 10,
-    'max_overflow': 20
-}
+# Pool per gunicorn worker ('server' profile, see db_engine.py)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options()
 
 # SMTP Configuration - flexible for different email providers
 # Supports: Resend, Gmail, SendGrid, Mailgun, custom SMTP
@@ -48,162 +64,249 @@ app.config['MAIL_DEFAULT_SENDER'] = ('ARCH1TECT | HAOS.fm', sender_email)
 
 db = SQLAlchemy(app)
 mail = Mail(app)
+# Prometheus metrics on GET /metrics, summed over gunicorn workers (see metrics.py)
+instrument_app(app)
+# Per-request statement counts / DB time in a Server-Timing header, N+1 warnings (see sql_profiler.py)
+SQL_PROFILE = os.environ.get('SQL_PROFILE', 'off').lower() in ('on', '1', 'true')
+# Authenticated SMTP sessions kept open and reused by the outbox worker
+mail_pool = SMTPPool()
+
+# Response cache - shared through Redis when REDIS_URL is set, otherwise per process
+cache = cache_from_env()
+if cache.shared:
+    versions.store = RedisVersionStore(cache.client)
 
 # Twilio SMS Configuration
 TWILIO_ACCOUNT_SID = os.environ.get('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.environ.get('TWILIO_AUTH_TOKEN')
 TWILIO_PHONE_NUMBER = os.environ.get('TWILIO_PHONE_NUMBER')
+# Only for load tests - points the client at a local stand-in instead of api.twilio.com
+TWILIO_API_URL = os.environ.get('TWILIO_API_URL')
 
 # Initialize Twilio client if credentials are provided
 twilio_client = None
 if TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN and TWILIO_PHONE_NUMBER:
     try:
         twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-        print("✅ [SMS] Twilio client initialized successfully")
+        if TWILIO_API_URL:
+            twilio_client.api.base_url = TWILIO_API_URL.rstrip('/')
+        log.info('twilio client initialized')
     except Exception as e:
-        print(f"⚠️ [SMS] Twilio initialization failed: {e}")
+        log.warning('twilio initialization failed', extra={'error': str(e)})
 else:
-    print("⚠️ [SMS] Twilio credentials not configured - SMS notifications disabled")
+    log.warning('twilio credentials not configured - SMS notifications disabled')
+
+# Models - the tables are shared with the other entry points (repository.py)
+tables = define_tables(db.metadata)
 
-# Models
 class Event(db.Model):
-    __tablename__ = 'events'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(255), nullable=False)
-    date = db.Column(db.String(50), nullable=False)
-    time = db.Column(db.String(50))
-    venue = db.Column(db.String(255), nullable=False)
-    city = db.Column(db.String(100))
-    type = db.Column(db.String(50), default='club')
-    description = db.Column(db.Text)
-    artists = db.Column(db.Text)
-    price = db.Column(db.Float)
-    capacity = db.Column(db.Integer)
-    image_url = db.Column(db.Text)
-    status = db.Column(db.String(50), default='upcoming')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'date': self.date,
-            'time': self.time,
-            'venue': self.venue,
-            'city': self.city,
-            'type': self.type,
-            'description': self.description,
-            'artists': self.artists,
-            'price': self.price,
-            'capacity': self.capacity,
-            'image_url': self.image_url,
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    __table__ = tables.events
+    to_dict = event_dict
 
 class Booking(db.Model):
-    __tablename__ = 'bookings'
-    
+    __table__ = tables.bookings
+    event = db.relationship('Event', backref='bookings')
+    to_dict = booking_dict
+
+class Notification(db.Model):
+    """Outbox row for an email/SMS - written with the booking, sent by the outbox worker"""
+    __tablename__ = 'notification_outbox'
+    __table_args__ = (
+        db.Index('ix_notification_outbox_due', 'status', 'next_attempt_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    event_id = db.Column(db.Integer, db.ForeignKey('events.id'))
-    name = db.Column(db.String(255), nullable=False)
-    email = db.Column(db.String(255), nullable=False)
-    phone = db.Column(db.String(50))
-    event_date = db.Column(db.String(50))
-    event_type = db.Column(db.String(50))
-    start_time = db.Column(db.String(50))
-    duration = db.Column(db.Integer)
-    venue = db.Column(db.String(255))
-    city = db.Column(db.String(100))
-    guests = db.Column(db.Integer)
-    message = db.Column(db.Text)
-    status = db.Column(db.String(50), default='pending')
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'))
+
+    # Notification details
+    notification_type = db.Column(db.String(50), nullable=False)  # booking_confirmation, booking_approval
+    channel = db.Column(db.String(20), nullable=False)  # email, sms
+    recipient_email = db.Column(db.String(255))
+    recipient_phone = db.Column(db.String(50))
+
+    # Delivery
+    status = db.Column(db.String(20), default='pending')  # pending, sending, sent, failed, cancelled
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = db.Column(db.DateTime)
+    error_message = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    # Calendar integration fields (like san-bud)
-    calendar_event_sent = db.Column(db.Boolean, default=False)
-    calendar_platforms = db.Column(db.String(255))  # "Google,Apple,Outlook,Office365"
-    event_title = db.Column(db.String(255))
-    event_location = db.Column(db.String(500))
-    
-    event = db.relationship('Event', backref='bookings')
-    
+
+    booking = db.relationship('Booking', backref='notifications')
+
     def to_dict(self):
         return {
             'id': self.id,
-            'event_id': self.event_id,
-            'name': self.name,
-            'email': self.email,
-            'phone': self.phone,
-            'event_date': self.event_date,
-            'event_type': self.event_type,
-            'start_time': self.start_time,
-            'duration': self.duration,
-            'venue': self.venue,
-            'city': self.city,
-            'guests': self.guests,
-            'message': self.message,
+            'booking_id': self.booking_id,
+            'notification_type': self.notification_type,
+            'channel': self.channel,
+            'recipient_email': self.recipient_email,
+            'recipient_phone': self.recipient_phone,
             'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'calendar_event_sent': self.calendar_event_sent,
-            'calendar_platforms': self.calendar_platforms,
-            'event_title': self.event_title,
-            'event_location': self.event_location
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+repo = Repository(db.session, tables)
+
+def columns(model, fields):
+    return [getattr(model, field) for field in fields]
+
+# Conditional GET - ETags derived from table versions, checked before any query
+def not_modified(etag):
+    """304 response if the client already holds `etag`, otherwise None"""
+    if etag is not None and request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        return with_etag(response, etag)
+    return None
+
+def with_etag(response, etag):
+    if etag is not None:  # None without shared table versions
+        response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 # Initialize database
 def init_db():
     with app.app_context():
         db.create_all()
-        print("✅ Database tables created successfully!")
+        log.info('database tables created')
 
 # Routes - Events
 @app.route('/api/events', methods=['GET'])
 def get_events():
-    """Get all events"""
+    """Get one page of events (keyset pagination, filtered in SQL)
+
+    Query params: limit, after (cursor from X-Next-Cursor), order (desc|asc),
+    city, type, status, from, to (YYYY-MM-DD, inclusive).
+    """
+    etag = versions.etag(['events'], request.query_string.decode())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    # Keyed on the table version too, so a page read before a concurrent
+    # write can never be served after it
+    cache_key = f"{versions.get('events')}:{urlencode(sorted(request.args.items(multi=True)))}"
+    hit = cache.get('events', cache_key)
+    if hit:
+        body, next_cursor = hit
+        return with_etag(events_page_response(body, next_cursor), etag)
+
+    try:
+        page_args = events_page_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
-        events = Event.query.order_by(Event.date.desc()).all()
-        return jsonify([event.to_dict() for event in events])
+        rows, next_cursor = repo.events_page(**page_args)
+        body = encode_rows(EVENT_FIELDS, rows, EVENT_FORMATTERS)
+        cache.set('events', cache_key, body, next_cursor)
+        return with_etag(events_page_response(body, next_cursor), etag)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def events_page_response(body, next_cursor):
+    """Wrap an encoded events page, advertising the next page if there is one"""
+    response = app.response_class(body, mimetype='application/json')
+    if next_cursor:
+        args = request.args.to_dict()
+        args['after'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
+
+@app.route('/api/events/search', methods=['GET'])
+def search_events():
+    """Full-text search over event name, artists, venue, city and description
+
+    Query params: q, limit (default 20, max 50). Best match first; every
+    result carries `rank` and an HTML `snippet` with matches in <mark>.
+    """
+    etag = versions.etag(['events'], request.query_string.decode())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    try:
+        args = search_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        rows = repo.search_events(**args)
+        return with_etag(jsonify(search_results(rows, args['terms'])), etag)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/events/<int:event_id>', methods=['GET'])
 def get_event(event_id):
     """Get single event"""
+    etag = versions.etag(['events'], event_id)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    cache_key = f"{versions.get('events')}:{event_id}"
+    hit = cache.get('event', cache_key)
+    if hit:
+        return with_etag(app.response_class(hit[0], mimetype='application/json'), etag)
+
     try:
-        event = Event.query.get_or_404(event_id)
-        return jsonify(event.to_dict())
+        event = repo.get_event(event_id)
     except Exception as e:
-        return jsonify({'error': str(e)}), 404
+        return jsonify({'error': str(e)}), 500
+    if event is None:
+        return jsonify({'error': 'Event not found'}), 404
+
+    body = jsonify(event_dict(event)).get_data()
+    cache.set('event', cache_key, body)
+    return with_etag(app.response_class(body, mimetype='application/json'), etag)
+
+@app.route('/api/artists', methods=['GET'])
+def get_artists():
+    """Artists with their number of events, busiest first"""
+    etag = versions.etag(['events'], 'artists')
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    try:
+        return with_etag(jsonify([artist_dict(artist) for artist in repo.list_artists()]), etag)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/artists/<slug>/events', methods=['GET'])
+def get_artist_events(slug):
+    """An artist and their events, newest first (index lookup on event_artists)"""
+    etag = versions.etag(['events'], f'artist:{slug}')
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    try:
+        artist, events = repo.artist_events(slug)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    if artist is None:
+        return jsonify({'error': 'Artist not found'}), 404
+    return with_etag(jsonify({'artist': {'name': artist.name, 'slug': artist.slug},
+                              'events': [event_dict(event) for event in events]}), etag)
 
 @app.route('/api/events', methods=['POST'])
 def create_event():
     """Create new event"""
     try:
-        data = request.get_json()
-        
-        event = Event(
-            name=data.get('name'),
-            date=data.get('date'),
-            time=data.get('time'),
-            venue=data.get('venue'),
-            city=data.get('city'),
-            type=data.get('type', 'club'),
-            description=data.get('description'),
-            artists=data.get('artists'),
-            price=data.get('price'),
-            capacity=data.get('capacity'),
-            image_url=data.get('image_url'),
-            status=data.get('status', 'upcoming')
-        )
-        
-        db.session.add(event)
+        event = repo.create_event(event_values(request.get_json()))
         db.session.commit()
+        versions.bump('events')
+        cache.invalidate('events', 'event')
         
-        return jsonify(event.to_dict()), 201
+        return jsonify(event_dict(event)), 201
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -212,19 +315,18 @@ def create_event():
 def update_event(event_id):
     """Update event"""
     try:
-        event = Event.query.get_or_404(event_id)
-        data = request.get_json()
-        
-        # Update fields
-        for key in ['name', 'date', 'time', 'venue', 'city', 'type', 'description', 
-                    'artists', 'price', 'capacity', 'image_url', 'status']:
-            if key in data:
-                setattr(event, key, data[key])
-        
-        event.updated_at = datetime.utcnow()
+        event = repo.update_event(event_id, event_values(request.get_json(), partial=True))
+        if event is None:
+            db.session.rollback()
+            return jsonify({'error': 'Event not found'}), 404
         db.session.commit()
+        versions.bump('events')
+        cache.invalidate('events', 'event')
         
-        return jsonify(event.to_dict())
+        return jsonify(event_dict(event))
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -233,72 +335,145 @@ def update_event(event_id):
 def delete_event(event_id):
     """Delete event"""
     try:
-        event = Event.query.get_or_404(event_id)
-        db.session.delete(event)
+        if not repo.delete_event(event_id):
+            return jsonify({'error': 'Event not found'}), 404
         db.session.commit()
+        versions.bump('events')
+        cache.invalidate('events', 'event')
         
         return jsonify({'message': 'Event deleted successfully'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+# Bulk import - the request body is streamed straight into the importer
+IMPORT_CONTENT_TYPES = {'text/csv': 'csv', 'application/json': 'json', 'application/x-ndjson': 'ndjson'}
+
+def import_source():
+    """(stream, format) from a multipart 'file' upload or the raw request body"""
+    upload = request.files.get('file')
+    if upload:
+        stream = upload.stream
+        guess = upload.filename.rsplit('.', 1)[-1].lower() if '.' in (upload.filename or '') else None
+    else:
+        stream = request.stream
+        guess = IMPORT_CONTENT_TYPES.get(request.mimetype)
+    return stream, request.args.get('format') or guess
+
+@app.route('/api/events/import', methods=['POST'])
+def import_events():
+    """Bulk insert/update events from CSV, JSON or NDJSON
+
+    Rows are matched on (name, date, venue). Query params: format (csv|json|ndjson,
+    otherwise taken from the file name or Content-Type), dry_run (true = only
+    report the diff).
+    """
+    stream, import_format = import_source()
+    if import_format not in IMPORT_FORMATS:
+        return jsonify({'error': "Invalid 'format', expected 'csv', 'json' or 'ndjson'"}), 400
+    dry_run = request.args.get('dry_run', 'false').lower() in ('1', 'true', 'yes')
+
+    try:
+        report = EventImporter(db.session, Event).run(read_rows(stream, import_format), dry_run=dry_run)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    if not dry_run and (report['inserted'] or report['updated']):
+        versions.bump('events')
+        cache.invalidate('events', 'event')
+    return jsonify(report), 200
+
 # Routes - Bookings
 @app.route('/api/bookings', methods=['GET'])
 def get_bookings():
     """Get all bookings"""
+    etag = versions.etag(['bookings'])
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     try:
-        bookings = Booking.query.order_by(Booking.created_at.desc()).all()
-        return jsonify([booking.to_dict() for booking in bookings])
+        rows = repo.list_bookings()
+        body = encode_rows(BOOKING_FIELDS, rows, BOOKING_FORMATTERS)
+        return with_etag(app.response_class(body, mimetype='application/json'), etag)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Bookings export - streamed in batches through a server-side cursor, so
+# memory stays flat and the first bytes go out immediately
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv; charset=utf-8'}
+
+def build_bookings_export_query(args):
+    """Column select for the export, filtered by status and event date range"""
+    query = select(*columns(Booking, BOOKING_FIELDS))
+    if args.get('status'):
+        query = query.where(Booking.status == args['status'])
+    if args.get('from'):
+        query = query.where(Booking.event_date >= parse_date_param(args['from'], 'from'))
+    if args.get('to'):
+        query = query.where(Booking.event_date <= parse_date_param(args['to'], 'to'))
+    return query.order_by(Booking.id)
+
+def encode_csv(rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=BOOKING_FIELDS)
+    if header:
+        writer.writeheader()
+    writer.writerows(rows_to_dicts(BOOKING_FIELDS, rows, BOOKING_FORMATTERS))
+    return buffer.getvalue().encode()
+
+@app.route('/api/bookings/export', methods=['GET'])
+def export_bookings():
+    """Stream bookings as NDJSON (default) or CSV
+
+    Query params: format (ndjson|csv), status, from, to (event date, YYYY-MM-DD, inclusive).
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': "Invalid 'format', expected 'ndjson' or 'csv'"}), 400
+    try:
+        query = build_bookings_export_query(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def generate():
+        if export_format == 'csv':
+            yield encode_csv([], header=True)
+        # yield_per streams the result (named cursor on PostgreSQL) instead of buffering it
+        result = db.session.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for rows in result.partitions():
+            if export_format == 'csv':
+                yield encode_csv(rows)
+            else:
+                yield encode_ndjson(BOOKING_FIELDS, rows, BOOKING_FORMATTERS)
+
+    filename = f"bookings-{datetime.utcnow():%Y%m%d}.{export_format}"
+    return app.response_class(
+        stream_with_context(generate()),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
 @app.route('/api/bookings', methods=['POST'])
 def create_booking():
     """Create new booking"""
     try:
-        data = request.get_json()
-        
-        # Generate calendar event data
-        event_title = f"ARCH1TECT @ {data.get('venue', 'Club HAOS')}"
-        event_location = f"{data.get('venue', 'Club HAOS')}, {data.get('city', 'Gdańsk')}"
-        calendar_platforms = "Google Calendar,Apple Calendar,Outlook,Office 365"
-        
-        booking = Booking(
-            event_id=data.get('event_id'),
-            name=data.get('name'),
-            email=data.get('email'),
-            phone=data.get('phone'),
-            event_date=data.get('event_date'),
-            event_type=data.get('event_type'),
-            start_time=data.get('start_time'),
-            duration=data.get('duration', 240),  # Default 4 hours for club events
-            venue=data.get('venue'),
-            city=data.get('city'),
-            guests=data.get('guests'),
-            message=data.get('message'),
-            status='pending',
-            calendar_event_sent=True,  # We provide calendar integration
-            calendar_platforms=calendar_platforms,
-            event_title=event_title,
-            event_location=event_location
-        )
-        
-        db.session.add(booking)
+        booking = repo.create_booking(booking_values(request.get_json()))
+        # Confirmation email/SMS are queued in the same transaction and sent by the outbox worker
+        queue_notifications(booking, 'booking_confirmation', sms=True)
         db.session.commit()
+        versions.bump('bookings')
+        outbox.wake()
         
-        print(f"🚀 [BOOKING] Booking created with ID: {booking.id}")
-        print(f"🚀 [BOOKING] About to call send_booking_confirmation({booking.id})")
-        
-        # Send confirmation email
-        try:
-            send_booking_confirmation(booking.id)
-            print(f"✅ [BOOKING] send_booking_confirmation completed without exception")
-        except Exception as email_error:
-            print(f"❌ [BOOKING] Email error: {email_error}")
-            import traceback
-            traceback.print_exc()
+        log.info('booking created', extra={'booking_id': booking.id})
         
-        return jsonify(booking.to_dict()), 201
+        return jsonify(booking_dict(booking)), 201
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -307,17 +482,15 @@ def create_booking():
 def approve_booking(booking_id):
     """Approve booking"""
     try:
-        booking = Booking.query.get_or_404(booking_id)
-        booking.status = 'approved'
+        booking = repo.set_booking_status(booking_id, 'approved')
+        if booking is None:
+            return jsonify({'error': 'Booking not found'}), 404
+        queue_notifications(booking, 'booking_approval')
         db.session.commit()
+        versions.bump('bookings')
+        outbox.wake()
         
-        # Send approval email
-        try:
-            send_booking_approval(booking.id)
-        except Exception as email_error:
-            print(f"Email error: {email_error}")
-        
-        return jsonify(booking.to_dict())
+        return jsonify(booking_dict(booking))
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -326,32 +499,76 @@ def approve_booking(booking_id):
 def reject_booking(booking_id):
     """Reject booking"""
     try:
-        booking = Booking.query.get_or_404(booking_id)
-        booking.status = 'rejected'
+        booking = repo.set_booking_status(booking_id, 'rejected')
+        if booking is None:
+            return jsonify({'error': 'Booking not found'}), 404
+        cancel_notifications([booking.id], 'booking_approval')
         db.session.commit()
+        versions.bump('bookings')
         
-        return jsonify(booking.to_dict())
+        return jsonify(booking_dict(booking))
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+# Bulk approve/reject - one UPDATE ... RETURNING for the whole list
+BULK_STATUSES = ('approved', 'rejected')
+BULK_MAX_IDS = 1000
+
+@app.route('/api/bookings/status', methods=['POST'])
+def bulk_booking_status():
+    """Approve or reject many bookings at once
+
+    Body: {"ids": [1, 2, ...], "status": "approved" | "rejected"}. Approval
+    emails for every changed booking are queued in the same commit; rejecting
+    cancels the ones not sent yet. Returns a result per ID: updated,
+    unchanged (already in that status) or not_found.
+    """
+    data = request.get_json(silent=True) or {}
+    ids, status = data.get('ids'), data.get('status')
+    if status not in BULK_STATUSES:
+        return jsonify({'error': "Invalid 'status', expected 'approved' or 'rejected'"}), 400
+    if not isinstance(ids, list) or not ids or not all(type(i) is int for i in ids):
+        return jsonify({'error': "'ids' must be a non-empty list of booking IDs"}), 400
+    if len(ids) > BULK_MAX_IDS:
+        return jsonify({'error': f'At most {BULK_MAX_IDS} bookings per request'}), 400
+    ids = list(dict.fromkeys(ids))
+
+    try:
+        changed = repo.set_bookings_status(ids, status)
+        if status == 'approved' and changed:
+            db.session.execute(insert(Notification), [
+                {'booking_id': row.id, 'notification_type': 'booking_approval',
+                 'channel': 'email', 'recipient_email': row.email}
+                for row in changed
+            ])
+        elif status == 'rejected' and changed:
+            cancel_notifications([row.id for row in changed], 'booking_approval')
+        updated = {row.id for row in changed}
+        found = repo.existing_booking_ids(set(ids) - updated) if len(updated) < len(ids) else set()
+        db.session.commit()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+    if updated:
+        versions.bump('bookings')
+        if status == 'approved':
+            outbox.wake()
+
+    results = [{'id': i, 'result': 'updated' if i in updated else 'unchanged' if i in found else 'not_found'}
+               for i in ids]
+    return jsonify({'status': status, 'updated': len(updated), 'results': results})
+
 # Email functions
 def generate_calendar_urls(booking):
     """Generate calendar URLs for booking"""
     from urllib.parse import quote
     from datetime import datetime, timedelta
     
-    # Parse date and time
+    # Combine date and time
     try:
-        event_date_parts = booking.event_date.split('-')
-        time_parts = booking.start_time.split(':')
-        start_dt = datetime(
-            int(event_date_parts[0]), 
-            int(event_date_parts[1]), 
-            int(event_date_parts[2]),
-            int(time_parts[0]), 
-            int(time_parts[1])
-        )
+        start_dt = datetime.combine(booking.event_date, booking.start_time)
         
         # Calculate end time (duration in minutes, default 4 hours)
         duration_minutes = booking.duration or 240
@@ -400,138 +617,19 @@ def generate_calendar_urls(booking):
             'office365': office365_url
         }
     except Exception as e:
-        print(f"Error generating calendar URLs: {e}")
+        log.warning('calendar urls failed', extra={'booking_id': booking.id, 'error': str(e)})
         return None
 
-def send_booking_confirmation(booking_id):
-    """Send booking confirmation email with calendar integration"""
-    print(f"🔍 [EMAIL] Starting send_booking_confirmation for booking_id: {booking_id}")
-    
-    booking = Booking.query.get(booking_id)
-    if not booking:
-        print(f"❌ [EMAIL] Booking {booking_id} not found!")
-        return
-    
-    print(f"✅ [EMAIL] Booking found: {booking.name} <{booking.email}>")
-    
+def send_booking_confirmation(booking):
+    """Send booking confirmation email with calendar integration (raises on failure)"""
     # Generate calendar URLs
-    print(f"📅 [EMAIL] Generating calendar URLs...")
     calendar_urls = generate_calendar_urls(booking)
-    print(f"✅ [EMAIL] Calendar URLs generated: {list(calendar_urls.keys()) if calendar_urls else 'None'}")
-    
-    html_template = '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    </head>
-    <body style="margin: 0; padding: 0; font-family: Arial, sans-serif; background: #0a0a0a;">
-        <div style="max-width: 600px; margin: 0 auto; background: linear-gradient(135deg, #1a0a1a 0%, #0a0a0a 100%);">
-            <div style="background: linear-gradient(135deg, #ff0080 0%, #ff0080 100%); padding: 30px; text-align: center;">
-                <h1 style="color: white; margin: 0; font-size: 32px; text-shadow: 0 0 20px rgba(255,0,255,0.5);">
-                    🎧 ARCH1TECT
-                </h1>
-            </div>
-            
-            <div style="padding: 40px 30px; color: #fff;">
-                <h2 style="color: #ff0080; margin-top: 0;">Potwierdzenie rezerwacji</h2>
-                
-                <p style="color: #ccc; line-height: 1.6;">Cześć <strong>{{ name }}</strong>!</p>
-                
-                <p style="color: #ccc; line-height: 1.6;">
-                    Dziękujemy za rezerwację. Twoje zgłoszenie zostało przyjęte i oczekuje na potwierdzenie.
-                </p>
-                
-                <div style="background: rgba(255,0,128,0.1); border-left: 4px solid #ff0080; padding: 20px; margin: 30px 0;">
-                    <h3 style="color: #ff0080; margin-top: 0;">Szczegóły rezerwacji:</h3>
-                    <table style="width: 100%; color: #ccc;">
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Data:</strong></td>
-                            <td>{{ event_date }}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Godzina:</strong></td>
-                            <td>{{ start_time }}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Miejsce:</strong></td>
-                            <td>{{ venue }}, {{ city }}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Typ:</strong></td>
-                            <td>{{ event_type }}</td>
-                        </tr>
-                        {% if duration %}
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Czas trwania:</strong></td>
-                            <td>{{ duration }} godzin</td>
-                        </tr>
-                        {% endif %}
-                    </table>
-                </div>
-                
-                <p style="color: #ccc; line-height: 1.6;">
-                    Skontaktujemy się z Tobą wkrótce, aby potwierdzić szczegóły.
-                </p>
-                
-                {% if calendar_urls %}
-                <div style="background: rgba(0,255,255,0.05); border: 2px solid rgba(0,255,255,0.3); border-radius: 10px; padding: 25px; margin: 30px 0;">
-                    <h3 style="color: #00ffff; margin-top: 0; text-align: center;">📅 Dodaj do kalendarza</h3>
-                    <p style="color: #ccc; text-align: center; font-size: 14px; margin-bottom: 20px;">
-                        Kliknij, aby dodać wydarzenie do swojego kalendarza:
-                    </p>
-                    
-                    <table style="width: 100%; border-collapse: collapse;">
-                        <tr>
-                            <td style="padding: 8px; text-align: center;">
-                                <a href="{{ calendar_urls.google }}" 
-                                   style="display: inline-block; background: linear-gradient(135deg, #4285f4, #34a853); color: white; padding: 12px 20px; text-decoration: none; border-radius: 8px; font-weight: bold; min-width: 150px;">
-                                    📱 Google Calendar
-                                </a>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px; text-align: center;">
-                                <a href="{{ calendar_urls.outlook }}" 
-                                   style="display: inline-block; background: linear-gradient(135deg, #0078d4, #106ebe); color: white; padding: 12px 20px; text-decoration: none; border-radius: 8px; font-weight: bold; min-width: 150px;">
-                                    📧 Outlook
-                                </a>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px; text-align: center;">
-                                <a href="{{ calendar_urls.office365 }}" 
-                                   style="display: inline-block; background: linear-gradient(135deg, #d83b01, #c239b3); color: white; padding: 12px 20px; text-decoration: none; border-radius: 8px; font-weight: bold; min-width: 150px;">
-                                    💼 Office 365
-                                </a>
-                            </td>
-                        </tr>
-                    </table>
-                    
-                    <p style="color: #888; text-align: center; font-size: 12px; margin-top: 15px; margin-bottom: 0;">
-                        🍎 <strong>iPhone/Mac?</strong> Otwórz link w Safari, a następnie wybierz "Dodaj do Kalendarza"
-                    </p>
-                </div>
-                {% endif %}
-                
-                <div style="margin-top: 40px; padding-top: 30px; border-top: 1px solid rgba(255,0,128,0.3); text-align: center;">
-                    <p style="color: #888; font-size: 14px;">
-                        ARCH1TECT | HAOS.fm<br>
-                        Email: arch1tect@haos.fm
-                    </p>
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>
-    '''
     
-    template = Template(html_template)
-    html_content = template.render(
+    html_content = render_email(
+        'booking_confirmation.html',
         name=booking.name,
         event_date=booking.event_date,
-        start_time=booking.start_time,
+        start_time=format_time(booking.start_time),
         venue=booking.venue,
         city=booking.city,
         event_type=booking.event_type,
@@ -539,13 +637,14 @@ def send_booking_confirmation(booking_id):
         calendar_urls=calendar_urls
     )
     
-    print(f"📧 [EMAIL] Creating email message...")
-    print(f"📧 [EMAIL] Mail server: {app.config.get('MAIL_SERVER')}")
-    print(f"📧 [EMAIL] Mail port: {app.config.get('MAIL_PORT')}")
-    print(f"📧 [EMAIL] Mail TLS: {app.config.get('MAIL_USE_TLS')}")
-    print(f"📧 [EMAIL] Mail username: {app.config.get('MAIL_USERNAME')}")
-    print(f"📧 [EMAIL] Mail password set: {bool(app.config.get('MAIL_PASSWORD'))}")
-    print(f"📧 [EMAIL] Mail sender: {app.config.get('MAIL_DEFAULT_SENDER')}")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug('sending booking confirmation', extra={
+            'booking_id': booking.id, 'calendar_links': sorted(calendar_urls or ()),
+            'mail_server': app.config.get('MAIL_SERVER'), 'mail_port': app.config.get('MAIL_PORT'),
+            'mail_tls': app.config.get('MAIL_USE_TLS'), 'mail_username': app.config.get('MAIL_USERNAME'),
+            'mail_password_set': bool(app.config.get('MAIL_PASSWORD')),
+            'mail_sender': app.config.get('MAIL_DEFAULT_SENDER'),
+        })
     
     msg = Message(
         subject='🎉 Potwierdzenie rezerwacji - ARCH1TECT',
@@ -553,42 +652,26 @@ def send_booking_confirmation(booking_id):
         html=html_content
     )
     
-    print(f"✅ [EMAIL] Message created, sending to: {booking.email}")
-    
-    try:
-        mail.send(msg)
-        print(f"✅ [EMAIL] Email sent successfully to {booking.email}!")
-        
-        # Send SMS notification if Twilio is configured
-        send_sms_confirmation(booking)
-        
-    except Exception as e:
-        print(f"❌ [EMAIL] Failed to send email: {str(e)}")
-        print(f"❌ [EMAIL] Exception type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
+    with external_call('smtp'):
+        mail_pool.send(msg)
+    log.info('booking confirmation sent', extra={'booking_id': booking.id})
 
 def send_sms_confirmation(booking):
-    """Send SMS confirmation using Twilio"""
+    """Send SMS confirmation using Twilio (raises on failure)"""
     if not twilio_client:
-        print("⚠️ [SMS] Twilio not configured, skipping SMS notification")
-        return
+        raise RuntimeError('Twilio not configured')
     
     if not booking.phone:
-        print("⚠️ [SMS] No phone number provided, skipping SMS")
-        return
+        raise ValueError('No phone number provided')
     
-    try:
-        print(f"📱 [SMS] Sending SMS to {booking.phone}...")
-        
-        # Format SMS message
-        sms_body = f"""🎉 ARCH1TECT - Potwierdzenie rezerwacji
+    # Format SMS message
+    sms_body = f"""🎉 ARCH1TECT - Potwierdzenie rezerwacji
 
 Dzień dobry {booking.name}!
 
 Potwierdzamy Twoją rezerwację:
 📅 Data: {booking.event_date}
-🕐 Godzina: {booking.start_time}
+🕐 Godzina: {format_time(booking.start_time)}
 📍 Miejsce: {booking.venue}, {booking.city}
 👥 Gości: {booking.guests}
 
@@ -596,91 +679,24 @@ Szczegóły otrzymasz na email: {booking.email}
 
 🎧 ARCH1TECT | HAOS.fm
 📞 +48 503 691 808"""
-        
+    
+    with external_call('twilio'):
         message = twilio_client.messages.create(
             body=sms_body,
             from_=TWILIO_PHONE_NUMBER,
             to=booking.phone
         )
-        
-        print(f"✅ [SMS] SMS sent successfully! SID: {message.sid}")
-        return message.sid
-        
-    except Exception as e:
-        print(f"❌ [SMS] Failed to send SMS: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return None
-
-def send_booking_approval(booking_id):
-    """Send booking approval email"""
-    booking = Booking.query.get(booking_id)
-    if not booking:
-        return
-    
-    html_template = '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    </head>
-    <body style="margin: 0; padding: 0; font-family: Arial, sans-serif; background: #0a0a0a;">
-        <div style="max-width: 600px; margin: 0 auto; background: linear-gradient(135deg, #1a0a1a 0%, #0a0a0a 100%);">
-            <div style="background: linear-gradient(135deg, #00ff88 0%, #00ccff 100%); padding: 30px; text-align: center;">
-                <h1 style="color: white; margin: 0; font-size: 32px;">
-                    ✅ ARCH1TECT
-                </h1>
-            </div>
-            
-            <div style="padding: 40px 30px; color: #fff;">
-                <h2 style="color: #00ff88; margin-top: 0;">Rezerwacja zatwierdzona!</h2>
-                
-                <p style="color: #ccc; line-height: 1.6;">Cześć <strong>{{ name }}</strong>!</p>
-                
-                <p style="color: #ccc; line-height: 1.6;">
-                    Świetne wiadomości! Twoja rezerwacja została <strong style="color: #00ff88;">zatwierdzona</strong>.
-                </p>
-                
-                <div style="background: rgba(0,255,136,0.1); border-left: 4px solid #00ff88; padding: 20px; margin: 30px 0;">
-                    <h3 style="color: #00ff88; margin-top: 0;">Potwierdzone szczegóły:</h3>
-                    <table style="width: 100%; color: #ccc;">
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Data:</strong></td>
-                            <td>{{ event_date }}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Godzina:</strong></td>
-                            <td>{{ start_time }}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0;"><strong>Miejsce:</strong></td>
-                            <td>{{ venue }}, {{ city }}</td>
-                        </tr>
-                    </table>
-                </div>
-                
-                <p style="color: #ccc; line-height: 1.6;">
-                    Do zobaczenia na evencie! 🎵
-                </p>
-                
-                <div style="margin-top: 40px; padding-top: 30px; border-top: 1px solid rgba(0,255,136,0.3); text-align: center;">
-                    <p style="color: #888; font-size: 14px;">
-                        ARCH1TECT<br>
-                        Email: booking@arch1tect.pl
-                    </p>
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>
-    '''
     
-    template = Template(html_template)
-    html_content = template.render(
+    log.info('booking sms sent', extra={'booking_id': booking.id, 'sid': message.sid})
+    return message.sid
+
+def send_booking_approval(booking):
+    """Send booking approval email (raises on failure)"""
+    html_content = render_email(
+        'booking_approval.html',
         name=booking.name,
         event_date=booking.event_date,
-        start_time=booking.start_time,
+        start_time=format_time(booking.start_time),
         venue=booking.venue,
         city=booking.city
     )
@@ -691,19 +707,60 @@ def send_booking_approval(booking_id):
         html=html_content
     )
     
-    mail.send(msg)
+    with external_call('smtp'):
+        mail_pool.send(msg)
+    log.info('booking approval sent', extra={'booking_id': booking.id})
+
+# Notification outbox - rows are written with the booking, delivery happens
+# on a background thread with retries (set OUTBOX_WORKER=off to disable it)
+def queue_notifications(booking, notification_type, sms=False):
+    """Add outbox rows for `booking` (a bookings row) to the current transaction"""
+    db.session.add(Notification(booking_id=booking.id, notification_type=notification_type,
+                                channel='email', recipient_email=booking.email))
+    if sms and twilio_client and booking.phone:
+        db.session.add(Notification(booking_id=booking.id, notification_type=notification_type,
+                                    channel='sms', recipient_phone=booking.phone))
+
+def cancel_notifications(booking_ids, notification_type):
+    """Cancel the undelivered `notification_type` rows of `booking_ids` in the current transaction"""
+    db.session.execute(
+        update(Notification)
+        .where(Notification.booking_id.in_(booking_ids),
+               Notification.notification_type == notification_type,
+               Notification.status.in_(('pending', 'sending')))
+        .values(status='cancelled')
+    )
+
+outbox = NotificationOutbox(app, db, Notification, {
+    ('booking_confirmation', 'email'): lambda n: send_booking_confirmation(n.booking),
+    ('booking_confirmation', 'sms'): lambda n: send_sms_confirmation(n.booking),
+    ('booking_approval', 'email'): lambda n: send_booking_approval(n.booking),
+}, enabled=os.environ.get('OUTBOX_WORKER', 'on').lower() not in ('off', '0', 'false'))
 
 # Health check
 @app.route('/api/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'ok', 'message': 'ARCH1TECT API is running', 'database': 'PostgreSQL'})
+    return jsonify({
+        'status': 'ok',
+        'message': 'ARCH1TECT API is running',
+        'database': 'PostgreSQL',
+        'cache': cache.stats(),
+        'db_pool': checkout_stats.stats(),
+        'queries': query_stats.stats()
+    })
 
 # Initialize database on startup
 with app.app_context():
+    instrument_engine(db.engine)
+    if SQL_PROFILE:
+        profile_app(app, db.engine)
     try:
         init_db()
     except Exception as e:
-        print(f"Database initialization error: {e}")
+        log.exception('database initialization failed')
+
+# Pick up notifications left pending by a previous process
+outbox.start()
 
 # Vercel serverless function handler
 handler = app
@@ -714,4 +771,6 @@ handler = app
 if __name__ == '__main__':
     # Railway provides PORT environment variable
     port = int(os.environ.get('PORT', 5001))
+    if not cache.shared:
+        versions.store = LocalVersionStore(single_process=True)  # one process sees every write
     app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,77 @@
+"""
+Normalized artist index - `artists` and `event_artists` built from events.artists
+
+events.artists stays the free-text line-up shown on the site ("ARCH1TECT
+b2b Hubert Kozuchowski, Guest"). Every write of it is parsed into single
+artists, each stored once in `artists` under a URL slug, and linked to
+the event in `event_artists` (in line-up order). "Events of an artist"
+is then an index lookup on event_artists (artist_id, event_id) joined to
+events by primary key instead of a LIKE '%name%' scan.
+
+Repository.create_event/update_event/delete_event and the bulk import
+keep the links current; existing rows are backfilled by the Flask-Migrate
+migration `artist_index`. Artists whose last event is gone are kept (the
+slug stays stable) but drop out of the listing.
+"""
+import re
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from event_search import fold
+
+# Line-up separators: , ; / + & | and newlines, "b2b", "vs", "feat."/"ft."
+_SEPARATORS = re.compile(r'\s*(?:[,;/+&|\n]|\bb2b\b|\bvs\b\.?|\bfeat\b\.?|\bft\b\.?)\s*', re.IGNORECASE)
+_WORD = re.compile(r'[^\W_]+')
+
+
+def slugify(name):
+    """URL slug of an artist name ('Łukasz Żółtowski' -> 'lukasz-zoltowski')"""
+    return '-'.join(_WORD.findall(fold(name)))[:255]
+
+
+def parse_artists(text):
+    """[(slug, name)] of the artists in a line-up, in order, each once"""
+    artists = {}
+    for name in _SEPARATORS.split(text or ''):
+        name = ' '.join(name.split())[:255]
+        slug = slugify(name)
+        if slug and slug not in artists:
+            artists[slug] = name
+    return list(artists.items())
+
+
+def link_artists(session, artists, event_artists, lineups):
+    """Replace the artist links of the events in `lineups` ({event id: artists text})"""
+    if not lineups:
+        return
+    parsed = {event_id: parse_artists(text) for event_id, text in lineups.items()}
+    session.execute(delete(event_artists).where(event_artists.c.event_id.in_(list(parsed))))
+
+    names = {slug: name for lineup in parsed.values() for slug, name in lineup}
+    if not names:
+        return
+    ids = _artist_ids(session, artists, names)
+    session.execute(insert(event_artists), [
+        {'event_id': event_id, 'artist_id': ids[slug], 'position': position}
+        for event_id, lineup in parsed.items() for position, (slug, _) in enumerate(lineup)
+    ])
+
+
+def _artist_ids(session, artists, names):
+    """{slug: id} for `names` ({slug: name}), inserting the artists not stored yet"""
+    slugs = list(names)
+    ids = dict(session.execute(select(artists.c.slug, artists.c.id).where(artists.c.slug.in_(slugs))).all())
+    missing = [{'slug': slug, 'name': names[slug]} for slug in slugs if slug not in ids]
+    if missing:
+        dialect = session.get_bind().dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            # A concurrent write may add the same artist - first one wins
+            dialect_insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            session.execute(dialect_insert(artists).on_conflict_do_nothing(index_elements=['slug']), missing)
+        else:
+            session.execute(insert(artists), missing)
+        ids.update(session.execute(
+            select(artists.c.slug, artists.c.id).where(artists.c.slug.in_([row['slug'] for row in missing]))
+        ).all())
+    return ids
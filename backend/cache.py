@@ -0,0 +1,194 @@
+"""
+Pluggable cache backends for encoded API responses
+
+Both backends store (body, meta) pairs per namespace: body is the encoded
+response (bytes), meta anything JSON-serializable the route needs to replay
+it (e.g. the next page cursor).
+
+- MemoryCache keeps entries in this process - tests and single-node runs.
+- RedisCache is the shared tier for several gunicorn workers / instances.
+  Every namespace has a generation counter in Redis; invalidate() bumps it,
+  which makes all old keys unreachable, and publishes the namespace so every
+  worker drops its local copies at once.
+
+cache_from_env() picks RedisCache when REDIS_URL is set.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # optional - only needed for the shared tier
+    redis = None
+
+from response_cache import ResponseCache
+
+log = logging.getLogger('arch1tect.cache')
+
+
+class MemoryCache:
+    """Per-process LRU + TTL cache, one ResponseCache per namespace"""
+
+    shared = False
+
+    def __init__(self, maxsize=256, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._namespaces = {}
+        self._lock = threading.Lock()
+
+    def _namespace(self, namespace):
+        with self._lock:
+            if namespace not in self._namespaces:
+                self._namespaces[namespace] = ResponseCache(self.maxsize, self.ttl)
+            return self._namespaces[namespace]
+
+    def get(self, namespace, key):
+        return self._namespace(namespace).get(key)
+
+    def set(self, namespace, key, body, meta=None, ttl=None):
+        self._namespace(namespace).set(key, body, meta, ttl)
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            self._namespace(namespace).clear()
+
+    def clear(self):
+        with self._lock:
+            caches = list(self._namespaces.values())
+        for cache in caches:
+            cache.clear()
+
+    def stats(self):
+        with self._lock:
+            caches = dict(self._namespaces)
+        return {'backend': 'memory', 'namespaces': {ns: c.stats() for ns, c in caches.items()}}
+
+
+class RedisCache:
+    """Redis-backed shared cache with a short-lived local copy in front of it"""
+
+    shared = True
+    CHANNEL = 'invalidate'
+
+    def __init__(self, client, prefix='arch1tect:cache', maxsize=256, ttl=60, local_ttl=5):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        # Local copies live only a few seconds, which bounds staleness if an
+        # invalidation message is ever missed
+        self.local = MemoryCache(maxsize, local_ttl)
+        self._generations = {}  # namespace -> (generation, refresh_at)
+        self._listener_pid = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _generation(self, namespace):
+        self._ensure_listener()
+        generation, refresh_at = self._generations.get(namespace, (None, 0))
+        if generation is None or refresh_at < time.monotonic():
+            generation = int(self.client.get(f'{self.prefix}:gen:{namespace}') or 0)
+            self._generations[namespace] = (generation, time.monotonic() + self.local_ttl)
+        return generation
+
+    def _key(self, namespace, key):
+        return f'{self.prefix}:{namespace}:{self._generation(namespace)}:{key}'
+
+    def get(self, namespace, key):
+        value = self.local.get(namespace, key)
+        if value is not None:
+            return value
+        try:
+            raw = self.client.get(self._key(namespace, key))
+        except redis.RedisError:
+            self.errors += 1
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        meta, _, body = raw.partition(b'\n')
+        value = (body, json.loads(meta))
+        self.local.set(namespace, key, *value)
+        return value
+
+    def set(self, namespace, key, body, meta=None, ttl=None):
+        self.local.set(namespace, key, body, meta)
+        try:
+            # meta is single-line JSON, so the first newline separates it from the body
+            self.client.set(self._key(namespace, key), json.dumps(meta).encode() + b'\n' + body,
+                            ex=ttl or self.ttl)
+        except redis.RedisError:
+            self.errors += 1
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            self.local.invalidate(namespace)
+            try:
+                generation = self.client.incr(f'{self.prefix}:gen:{namespace}')
+                self._generations[namespace] = (generation, time.monotonic() + self.local_ttl)
+                self.client.publish(f'{self.prefix}:{self.CHANNEL}', namespace)
+            except redis.RedisError:
+                self.errors += 1
+                self._generations.pop(namespace, None)
+
+    def _ensure_listener(self):
+        # Started lazily and per pid: threads do not survive gunicorn's fork
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            self._generations.clear()
+            threading.Thread(target=self._listen, name='cache-invalidation', daemon=True).start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(f'{self.prefix}:{self.CHANNEL}')
+                # Messages may have been missed while (re)connecting
+                self._generations.clear()
+                self.local.clear()
+                for message in pubsub.listen():
+                    namespace = message['data'].decode()
+                    self._generations.pop(namespace, None)
+                    self.local.invalidate(namespace)
+            except redis.RedisError:
+                time.sleep(1)
+
+    def stats(self):
+        return {
+            'backend': 'redis',
+            'shared': {'hits': self.hits, 'misses': self.misses, 'errors': self.errors},
+            'namespaces': self.local.stats()['namespaces']
+        }
+
+
+def redis_client_from_env():
+    """Redis client for REDIS_URL, or None when not configured"""
+    url = os.environ.get('REDIS_URL')
+    if not url:
+        return None
+    if redis is None:
+        log.warning('REDIS_URL is set but the redis package is not installed - using in-process cache')
+        return None
+    return redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5,
+                                health_check_interval=30)
+
+
+def cache_from_env(client=None):
+    """RedisCache when REDIS_URL is configured, MemoryCache otherwise"""
+    maxsize = int(os.environ.get('CACHE_SIZE', 256))
+    ttl = int(os.environ.get('CACHE_TTL', 60))
+    client = client or redis_client_from_env()
+    if client is not None:
+        return RedisCache(client, maxsize=maxsize, ttl=ttl)
+    return MemoryCache(maxsize, ttl)
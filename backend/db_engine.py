@@ -0,0 +1,156 @@
+"""
+Engine profiles - connection pooling for long-lived servers vs serverless functions
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url()
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options()
+
+'server' (gunicorn on Railway, local runs) keeps a pool per process and
+pings every connection before use. 'serverless' (Vercel) is built for
+dozens of short-lived instances sharing a Neon database with a small
+connection limit:
+
+- one connection per instance, kept open and reused while it stays warm
+  (pool_size=1, no overflow),
+- DATABASE_POOLER_URL, when set, is used instead of DATABASE_URL - point
+  it at the external pooler endpoint (Neon's "-pooler" host / PgBouncer),
+- no pre-ping round trip: a connection that sat idle longer than
+  `idle_timeout` is replaced at checkout without touching the network, and
+  a connection that turns out dead anyway is invalidated on the error
+  (SQLAlchemy's optimistic disconnect handling), so the next request
+  reconnects.
+
+The profile comes from DB_ENGINE_PROFILE, defaulting to 'serverless' on
+Vercel and 'server' elsewhere. Checkout latency (including connects) is
+recorded for every pool built here and reported by checkout_stats.stats().
+"""
+from collections import deque
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+PROFILES = {
+    'server': {
+        'pool_pre_ping': True,
+        'pool_recycle': 300,
+        'pool_size': 10,
+        'max_overflow': 20,
+    },
+    'serverless': {
+        'pool_pre_ping': False,
+        'pool_recycle': 1800,
+        'pool_size': 1,
+        'max_overflow': 0,
+        'pool_timeout': 10,
+    },
+}
+
+# Neon suspends idle computes after 5 minutes and poolers drop idle clients;
+# older connections are not worth trying
+SERVERLESS_IDLE_TIMEOUT = 240
+
+
+def current_profile():
+    profile = os.environ.get('DB_ENGINE_PROFILE') or ('serverless' if os.environ.get('VERCEL') else 'server')
+    if profile not in PROFILES:
+        raise ValueError(f"Invalid DB_ENGINE_PROFILE '{profile}', expected one of: {', '.join(PROFILES)}")
+    return profile
+
+
+def database_url(default=None, profile=None):
+    """Connection URL for the profile (the pooler endpoint first when serverless)"""
+    url = None
+    if (profile or current_profile()) == 'serverless':
+        url = os.environ.get('DATABASE_POOLER_URL')
+    url = url or os.environ.get('DATABASE_URL') or os.environ.get('POSTGRES_URL') or default
+    if url and url.startswith('postgres://'):
+        # Fix for SQLAlchemy 1.4+ (postgres:// -> postgresql://)
+        url = url.replace('postgres://', 'postgresql://', 1)
+    return url
+
+
+def engine_options(profile=None):
+    """create_engine() keyword arguments (SQLALCHEMY_ENGINE_OPTIONS) for the profile"""
+    profile = profile or current_profile()
+    options = dict(PROFILES[profile], poolclass=TimedQueuePool)
+    if profile == 'serverless':
+        options['poolclass'] = IdleTimeoutQueuePool
+    return options
+
+
+class CheckoutStats:
+    """Pool checkout latency, in milliseconds, over the last `window` checkouts"""
+
+    def __init__(self, window=1000):
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.idle_replaced = 0
+        self.invalidated = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self._recent.append(seconds * 1000)
+
+    def stats(self):
+        with self._lock:
+            recent = sorted(self._recent)
+        summary = {
+            'checkouts': self.checkouts,
+            'connects': self.connects,
+            'idle_replaced': self.idle_replaced,
+            'invalidated': self.invalidated,
+        }
+        if recent:
+            summary.update({
+                'checkout_ms_p50': round(recent[len(recent) // 2], 3),
+                'checkout_ms_p95': round(recent[int(len(recent) * 0.95)], 3),
+                'checkout_ms_max': round(recent[-1], 3),
+            })
+        return summary
+
+
+checkout_stats = CheckoutStats()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long every checkout took"""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            checkout_stats.record(time.perf_counter() - started)
+
+
+class IdleTimeoutQueuePool(TimedQueuePool):
+    """Replaces connections idle for longer than SERVERLESS_IDLE_TIMEOUT at checkout, without a ping"""
+
+
+@event.listens_for(TimedQueuePool, 'connect')
+def _count_connect(dbapi_connection, connection_record):
+    checkout_stats.connects += 1
+
+
+@event.listens_for(TimedQueuePool, 'invalidate')
+def _count_invalidate(dbapi_connection, connection_record, exception):
+    checkout_stats.invalidated += 1
+
+
+@event.listens_for(IdleTimeoutQueuePool, 'checkin')
+def _mark_idle(dbapi_connection, connection_record):
+    connection_record.info['checked_in_at'] = time.monotonic()
+
+
+@event.listens_for(IdleTimeoutQueuePool, 'checkout')
+def _replace_if_idle(dbapi_connection, connection_record, connection_proxy):
+    checked_in_at = connection_record.info.pop('checked_in_at', None)
+    if checked_in_at is not None and time.monotonic() - checked_in_at > SERVERLESS_IDLE_TIMEOUT:
+        checkout_stats.idle_replaced += 1
+        # The pool closes this connection and checks out a fresh one
+        raise exc.DisconnectionError('connection idle for too long')
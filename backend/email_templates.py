@@ -0,0 +1,40 @@
+"""
+Email template registry
+
+Templates live in templates/email/ and are rendered through one shared
+Jinja Environment: each template is compiled once per process and kept
+in memory (no stat() on later renders), and the compiled bytecode is
+also written to disk so the next cold start skips parsing entirely.
+
+    html = render('booking_confirmation.html', name=..., calendar_urls=...)
+
+TEMPLATE_CACHE_DIR overrides where the bytecode goes (default: a
+directory in the system temp dir, which is writable on Vercel too).
+"""
+import os
+import tempfile
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'email')
+
+
+def _bytecode_cache():
+    directory = os.environ.get('TEMPLATE_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'arch1tect-jinja')
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        return None  # read-only filesystem - compile in memory only
+    return FileSystemBytecodeCache(directory)
+
+
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(['html']),
+    auto_reload=False,
+    bytecode_cache=_bytecode_cache()
+)
+
+
+def render(template, /, **context):
+    return env.get_template(template).render(**context)
@@ -0,0 +1,268 @@
+"""
+Bulk event import - stream CSV/JSON rows, validate, deduplicate, write in batches
+
+Rows are matched to stored events on the natural key (name, date, venue).
+Each batch costs one SELECT for the keys it contains; new events then go in
+as one COPY (PostgreSQL) or one executemany INSERT (SQLite), and changed
+events as one executemany UPDATE by primary key. Rows identical to what is
+stored are skipped, so importing the same line-up twice writes nothing.
+The artist index (artist_index.py) is relinked for the inserted events and
+for the updated ones whose artists changed.
+
+With dry_run=True nothing is written and the report is the diff the import
+would apply. The whole import is one transaction.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, time
+
+from sqlalchemy import bindparam, select, tuple_
+
+from artist_index import link_artists
+
+IMPORT_FIELDS = ('name', 'date', 'time', 'venue', 'city', 'type', 'description',
+                 'artists', 'price', 'capacity', 'image_url', 'status')
+KEY_FIELDS = ('name', 'date', 'venue')
+REQUIRED_FIELDS = ('name', 'date', 'venue')
+FORMATS = ('csv', 'json', 'ndjson')
+BATCH_SIZE = 1000
+
+
+def read_rows(stream, fmt):
+    """Yield (row number, raw dict) from a binary or text stream
+
+    CSV and NDJSON are read line by line; a JSON document (a list, or an
+    object with an 'events' list) has to be parsed whole.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid format '{fmt}', expected one of: {', '.join(FORMATS)}")
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'ndjson':
+        for number, line in enumerate(stream, 1):
+            if line.strip():
+                yield number, _json_object(line)
+    else:
+        document = json.load(stream)
+        if isinstance(document, dict):
+            document = document.get('events')
+        if not isinstance(document, list):
+            raise ValueError("Expected a JSON list of events or {\"events\": [...]}")
+        yield from enumerate(document, 1)
+
+
+def _json_object(line):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return e  # reported as an invalid row
+
+
+def _parse_date(value):
+    # fromisoformat is an order of magnitude faster than strptime on big imports
+    try:
+        if len(value) == 10:
+            return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        pass
+    raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+def _parse_time(value):
+    try:
+        if len(value) in (5, 8):
+            return time.fromisoformat(value)
+    except (TypeError, ValueError):
+        pass
+    raise ValueError(f"Invalid time '{value}', expected HH:MM")
+
+
+def _parse_number(kind, field):
+    def parse(value):
+        try:
+            return kind(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {field} '{value}'")
+    return parse
+
+
+PARSERS = {
+    'date': _parse_date,
+    'time': _parse_time,
+    'price': _parse_number(float, 'price'),
+    'capacity': _parse_number(int, 'capacity'),
+}
+
+
+class EventImporter:
+    """Validate and upsert event rows into `model` (the Event model) through `session`"""
+
+    def __init__(self, session, model, batch_size=BATCH_SIZE, max_changes=100):
+        self.session = session
+        self.model = model
+        self.table = model.__table__
+        self.batch_size = batch_size
+        self.max_changes = max_changes
+        self.lengths = {field: getattr(self.table.c[field].type, 'length', None) for field in IMPORT_FIELDS}
+        self.defaults = {
+            field: column.default.arg if column.default is not None and column.default.is_scalar else None
+            for field, column in ((field, self.table.c[field]) for field in IMPORT_FIELDS)
+        }
+
+    def clean(self, raw):
+        """Validated dict of the fields present in `raw`; empty strings mean NULL"""
+        if isinstance(raw, Exception):
+            raise ValueError(f'Invalid JSON: {raw}')
+        if not isinstance(raw, dict):
+            raise ValueError('Expected an object')
+
+        row = {}
+        for field in IMPORT_FIELDS:
+            if field not in raw:
+                continue
+            value = raw[field]
+            if isinstance(value, str):
+                value = value.strip() or None
+            if value is not None and field in PARSERS:
+                value = PARSERS[field](value)
+            elif value is not None:
+                value = str(value)
+                if self.lengths[field] and len(value) > self.lengths[field]:
+                    raise ValueError(f"'{field}' is longer than {self.lengths[field]} characters")
+            row[field] = value
+
+        missing = [field for field in REQUIRED_FIELDS if row.get(field) is None]
+        if missing:
+            raise ValueError(f"Missing {', '.join(missing)}")
+        return row
+
+    def run(self, rows, dry_run=False):
+        """Import (row number, raw dict) pairs and return the report"""
+        self.report = {
+            'dry_run': dry_run,
+            'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'invalid': 0,
+            'changes': [], 'errors': [],
+        }
+        self.now = datetime.utcnow()
+        seen = {}
+        batch = []
+        try:
+            for number, raw in rows:
+                try:
+                    row = self.clean(raw)
+                except ValueError as e:
+                    self.report['invalid'] += 1
+                    self._note('errors', {'row': number, 'error': str(e)})
+                    continue
+
+                key = tuple(row[field] for field in KEY_FIELDS)
+                if key in seen:
+                    self.report['duplicates'] += 1
+                    self._note('changes', {'action': 'skip', 'row': number, 'key': _key(key),
+                                           'reason': f'duplicate of row {seen[key]}'})
+                    continue
+                seen[key] = number
+
+                batch.append((number, key, row))
+                if len(batch) >= self.batch_size:
+                    self._apply(batch, dry_run)
+                    batch = []
+            if batch:
+                self._apply(batch, dry_run)
+
+            if dry_run:
+                self.session.rollback()
+            else:
+                self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return self.report
+
+    def _note(self, kind, entry):
+        if self.max_changes is None or len(self.report[kind]) < self.max_changes:
+            self.report[kind].append(entry)
+
+    def _apply(self, batch, dry_run):
+        """Diff one batch against the stored rows and write the difference"""
+        c = self.table.c
+        key_columns = tuple_(*(c[field] for field in KEY_FIELDS))
+        existing = {}
+        query = self.table.select().where(key_columns.in_([key for _, key, _ in batch])).order_by(c.id)
+        for stored in self.session.execute(query).mappings():
+            existing.setdefault(tuple(stored[field] for field in KEY_FIELDS), stored)
+
+        inserts, updates, lineups = [], [], {}
+        for number, key, row in batch:
+            stored = existing.get(key)
+            if stored is None:
+                inserts.append(dict(self.defaults, **row, created_at=self.now, updated_at=self.now))
+                self._note('changes', {'action': 'insert', 'row': number, 'key': _key(key)})
+                continue
+
+            changed = {field: [_plain(stored[field]), _plain(value)]
+                       for field, value in row.items() if stored[field] != value}
+            if not changed:
+                self.report['unchanged'] += 1
+                continue
+            updates.append(dict({field: stored[field] for field in IMPORT_FIELDS}, **row,
+                                updated_at=self.now, _id=stored['id']))
+            if 'artists' in changed:
+                lineups[stored['id']] = row['artists']
+            self._note('changes', {'action': 'update', 'row': number, 'id': stored['id'],
+                                   'key': _key(key), 'fields': changed})
+
+        self.report['inserted'] += len(inserts)
+        self.report['updated'] += len(updates)
+        if dry_run:
+            return
+
+        if inserts:
+            if self.session.get_bind().dialect.name == 'postgresql':
+                self._copy(inserts)
+            else:
+                self.session.execute(self.table.insert(), inserts)
+        if updates:
+            self.session.execute(self.table.update().where(c.id == bindparam('_id')), updates)
+
+        # COPY/executemany return no ids - read them back by the (new) natural keys
+        new_lineups = {tuple(row[field] for field in KEY_FIELDS): row['artists']
+                       for row in inserts if row.get('artists')}
+        if new_lineups:
+            query = select(c.id, *(c[field] for field in KEY_FIELDS)).where(key_columns.in_(list(new_lineups)))
+            for event_id, *key in self.session.execute(query):
+                lineups[event_id] = new_lineups[tuple(key)]
+        tables = self.table.metadata.tables
+        link_artists(self.session, tables['artists'], tables['event_artists'], lineups)
+
+    def _copy(self, rows):
+        """COPY rows into the table over the session's own connection (psycopg2)"""
+        fields = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(['' if value is None else value for value in row.values()])
+        buffer.seek(0)
+
+        cursor = self.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {self.table.name} ({', '.join(fields)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+
+
+def _key(key):
+    return [_plain(value) for value in key]
+
+
+def _plain(value):
+    """JSON-friendly value for the diff"""
+    return value.isoformat() if hasattr(value, 'isoformat') else value
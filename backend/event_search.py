@@ -0,0 +1,167 @@
+"""
+Full-text event search - FTS5 on SQLite, a tsvector column on PostgreSQL
+
+    terms = search_terms('Łódź techno')       # ['lodz', 'techno']
+    rows = repo.search_events(terms, limit=20)
+
+Name, artists, venue, city and description are indexed by the database
+itself, so the index follows every write path (API, bulk import, psql)
+without application code:
+
+- SQLite: a contentless FTS5 table `events_fts` (unicode61 tokenizer with
+  diacritics removed) kept in sync by triggers on `events`.
+- PostgreSQL: a generated `events.search_vector` column (weight A for the
+  name, B artists, C venue and city, D description) with a GIN index.
+
+Both are created by install_search_index() hooks when `events` is created
+(create_all); existing databases get them from the Flask-Migrate
+migration `events_full_text_search`.
+
+Diacritics are folded on both sides so 'Gdansk' finds 'Gdańsk'. Neither
+unicode61 nor a plain translate() knows that 'ł' is an 'l' (it has no
+Unicode decomposition), so it is replaced explicitly. Every term is
+matched as a prefix (search-as-you-type) and all terms must match.
+Snippets are cut in Python from the matched row, identically for both
+databases.
+"""
+import html
+import re
+import unicodedata
+
+from sqlalchemy import DDL, bindparam, column, event, func, literal_column, select, table
+
+SEARCH_COLUMNS = ('name', 'artists', 'venue', 'city', 'description')
+# bm25() column weights on SQLite, tsvector weight labels on PostgreSQL
+SEARCH_WEIGHTS = (10.0, 5.0, 3.0, 3.0, 1.0)
+POSTGRESQL_WEIGHTS = 'ABCCD'
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+MAX_TERMS = 8
+SNIPPET_WORDS = 16
+
+# PostgreSQL translate() map - Polish letters first, then other common Latin accents
+_FOLD_FROM = 'ąćęłńóśźżáàâäãåéèêëíìîïòôöõúùûüýÿçčďěňřšťůž'
+_FOLD_TO = 'acelnoszzaaaaaaeeeeiiiioooouuuuyyccdenrstuz'
+FOLD_FROM, FOLD_TO = _FOLD_FROM + _FOLD_FROM.upper(), _FOLD_TO + _FOLD_TO.upper()
+
+_WORD = re.compile(r'[^\W_]+')
+
+
+def fold(text):
+    """Lower-case `text` without diacritics ('Łódź' -> 'lodz')"""
+    text = text.replace('ł', 'l').replace('Ł', 'L')
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c)).lower()
+
+
+def search_terms(query):
+    """Folded words of a search query (at most MAX_TERMS)"""
+    return _WORD.findall(fold(query or ''))[:MAX_TERMS]
+
+
+def search_args(args):
+    """Validated search_events() arguments from request args (raises ValueError)"""
+    query = (args.get('q') or '').strip()
+    if not query:
+        raise ValueError("Missing 'q'")
+    try:
+        limit = int(args.get('limit', SEARCH_LIMIT))
+    except ValueError:
+        raise ValueError("Invalid 'limit', expected an integer")
+    return {'terms': search_terms(query), 'limit': max(1, min(limit, SEARCH_MAX_LIMIT))}
+
+
+def snippet(text, terms, words=SNIPPET_WORDS):
+    """HTML excerpt of `text` around the first matching word, matches in <mark>; None if nothing matches"""
+    if not text:
+        return None
+    matches = list(_WORD.finditer(text))
+    hits = [i for i, match in enumerate(matches) if fold(match.group()).startswith(tuple(terms))]
+    if not hits:
+        return None
+
+    first = max(0, min(hits[0] - words // 4, len(matches) - words))
+    window = matches[first:first + words]
+    start = 0 if first == 0 else window[0].start()
+    end = len(text) if first + words >= len(matches) else window[-1].end()
+    parts, position = [], start
+    for i, match in enumerate(window, first):
+        if i in hits:
+            parts += [html.escape(text[position:match.start()]), f'<mark>{html.escape(match.group())}</mark>']
+            position = match.end()
+    parts.append(html.escape(text[position:end]))
+    return ('…' if start else '') + ''.join(parts).strip() + ('…' if end < len(text) else '')
+
+
+# SQLite - contentless FTS5 table, triggers on events
+def _sqlite_folded(prefix):
+    return ', '.join(f"replace(replace({prefix}.{name}, 'ł', 'l'), 'Ł', 'L')" for name in SEARCH_COLUMNS)
+
+
+_COLUMNS = ', '.join(SEARCH_COLUMNS)
+_FTS_INSERT = f'INSERT INTO events_fts(rowid, {_COLUMNS}) VALUES (new.id, {_sqlite_folded("new")});'
+_FTS_DELETE = (f"INSERT INTO events_fts(events_fts, rowid, {_COLUMNS}) "
+               f"VALUES ('delete', old.id, {_sqlite_folded('old')});")
+
+SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5({_COLUMNS}, content='', "
+    f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f'CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN {_FTS_INSERT} END',
+    f'CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN {_FTS_DELETE} END',
+    f'CREATE TRIGGER IF NOT EXISTS events_fts_update AFTER UPDATE OF {_COLUMNS} ON events '
+    f'BEGIN {_FTS_DELETE} {_FTS_INSERT} END',
+)
+SQLITE_DROP = ('DROP TRIGGER IF EXISTS events_fts_update', 'DROP TRIGGER IF EXISTS events_fts_delete',
+               'DROP TRIGGER IF EXISTS events_fts_insert', 'DROP TABLE IF EXISTS events_fts')
+
+# PostgreSQL - generated tsvector column with a GIN index
+_VECTOR = ' || '.join(
+    f"setweight(to_tsvector('simple'::regconfig, translate(coalesce({name}, ''), '{FOLD_FROM}', '{FOLD_TO}')), "
+    f"'{weight}')"
+    for name, weight in zip(SEARCH_COLUMNS, POSTGRESQL_WEIGHTS)
+)
+POSTGRESQL_DDL = (
+    f'ALTER TABLE events ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({_VECTOR}) STORED',
+    'CREATE INDEX IF NOT EXISTS ix_events_search ON events USING gin (search_vector)',
+)
+
+
+def install_search_index(events):
+    """Create/drop the search index together with the `events` table (create_all/drop_all)"""
+    for statement in SQLITE_DDL:
+        event.listen(events, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+    for statement in POSTGRESQL_DDL:
+        event.listen(events, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+    for statement in SQLITE_DROP:
+        event.listen(events, 'after_drop', DDL(statement).execute_if(dialect='sqlite'))
+
+
+def search_statement(events, columns, dialect_name):
+    """SELECT of `columns` plus `rank` for events matching :match, best first, at most :limit rows"""
+    if dialect_name == 'postgresql':
+        vector = literal_column('events.search_vector')
+        query = func.to_tsquery(literal_column("'simple'::regconfig"), bindparam('match'))
+        rank = func.ts_rank(vector, query)
+        return (select(*columns, rank.label('rank'))
+                .where(vector.op('@@')(query))
+                .order_by(rank.desc(), events.c.id.desc())
+                .limit(bindparam('limit')))
+
+    # Rank inside the FTS table first and join only the top rows - joining
+    # every match to events before sorting costs twice as much
+    fts = table('events_fts', column('rowid'))
+    bm25 = func.bm25(literal_column('events_fts'), *[literal_column(repr(w)) for w in SEARCH_WEIGHTS])
+    ranked = (select(fts.c.rowid.label('id'), (-bm25).label('rank'))
+              .where(literal_column('events_fts').op('MATCH')(bindparam('match')))
+              .order_by(bm25, fts.c.rowid.desc())
+              .limit(bindparam('limit'))
+              .subquery('ranked'))
+    return (select(*columns, ranked.c.rank)
+            .join_from(ranked, events, events.c.id == ranked.c.id)
+            .order_by(ranked.c.rank.desc(), events.c.id.desc()))
+
+
+def match_expression(terms, dialect_name):
+    """The :match parameter - every term as a prefix, all required"""
+    if dialect_name == 'postgresql':
+        return ' & '.join(f'{term}:*' for term in terms)
+    return ' '.join(f'"{term}"*' for term in terms)
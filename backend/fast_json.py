@@ -0,0 +1,54 @@
+"""
+JSON encoding for list endpoints straight from result tuples
+
+encode_rows() turns column tuples from a select() into a JSON array of
+objects without instantiating mapped objects or calling to_dict();
+encode_ndjson() does the same for streamed exports, one object per line. Uses
+orjson when it is installed and falls back to the standard library.
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+import json
+
+try:
+    import orjson
+except ImportError:  # optional fast encoder
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(obj):
+    """Encode to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def rows_to_dicts(fields, rows, formatters=None):
+    """Turn `rows` (tuples in `fields` order) into dicts
+
+    `formatters` maps a field name to a function applied to its values,
+    for fields whose API representation differs from the column value.
+    """
+    items = [dict(zip(fields, row)) for row in rows]
+    for field, formatter in (formatters or {}).items():
+        for item in items:
+            item[field] = formatter(item[field])
+    return items
+
+
+def encode_rows(fields, rows, formatters=None):
+    """Encode `rows` as a JSON array of objects"""
+    return dumps(rows_to_dicts(fields, rows, formatters))
+
+
+def encode_ndjson(fields, rows, formatters=None):
+    """Encode `rows` as newline-delimited JSON, one object per line"""
+    return b''.join(dumps(item) + b'\n' for item in rows_to_dicts(fields, rows, formatters))
@@ -0,0 +1,24 @@
+"""
+Gunicorn settings - read automatically by `cd backend && gunicorn app:app`
+
+Sets up prometheus_client's multiprocess mode so /metrics sums over all
+workers (see metrics.py): every worker writes its samples to
+PROMETHEUS_MULTIPROC_DIR, which is emptied when the master starts, and a
+worker's live gauges are dropped when it exits.
+"""
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'arch1tect-prometheus'))
+
+
+def on_starting(server):
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
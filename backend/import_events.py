@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Import events from a CSV, JSON or NDJSON file
+
+    python import_events.py lineup.csv [--dry-run] [--format csv|json|ndjson] [--batch-size 1000]
+
+Events are matched on (name, date, venue): new ones are inserted, changed
+ones updated, identical ones skipped. --dry-run prints the diff without
+writing anything.
+"""
+import argparse
+import json
+import os
+import sys
+from dotenv import load_dotenv
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Load environment variables
+load_dotenv()
+
+from app import app, db, Event, versions, cache
+from event_import import EventImporter, read_rows, BATCH_SIZE, FORMATS
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import events')
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=FORMATS, help='default: taken from the file extension')
+    parser.add_argument('--dry-run', action='store_true', help='report the diff, write nothing')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--show', type=int, default=20, help='changes/errors to print (-1 = all)')
+    args = parser.parse_args()
+
+    import_format = args.format or os.path.splitext(args.path)[1].lstrip('.').lower()
+    if import_format not in FORMATS:
+        parser.error(f"can't tell the format of {args.path}, use --format")
+
+    with app.app_context():
+        db.create_all()
+        importer = EventImporter(db.session, Event, batch_size=args.batch_size,
+                                 max_changes=None if args.show < 0 else args.show)
+        print(f"🚀 Importing {args.path}{' (dry run)' if args.dry_run else ''}...\n")
+        with open(args.path, 'rb') as stream:
+            report = importer.run(read_rows(stream, import_format), dry_run=args.dry_run)
+
+        if not args.dry_run and (report['inserted'] or report['updated']):
+            versions.bump('events')
+            cache.invalidate('events', 'event')
+
+    for change in report['changes']:
+        print(f"   {change['action']:<6} row {change['row']}: {json.dumps(change, ensure_ascii=False)}")
+    for error in report['errors']:
+        print(f"   ❌ row {error['row']}: {error['error']}")
+
+    print(f"\n{'='*60}")
+    print(f"✅ {'Would import' if args.dry_run else 'Imported'} {args.path}")
+    print(f"   📊 Inserted: {report['inserted']}")
+    print(f"   🔄 Updated: {report['updated']}")
+    print(f"   ⏭️  Unchanged: {report['unchanged']}")
+    print(f"   ♻️  Duplicates in file: {report['duplicates']}")
+    print(f"   ⚠️  Invalid: {report['invalid']}")
+    print(f"{'='*60}\n")
+    return 1 if report['invalid'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
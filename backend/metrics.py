@@ -0,0 +1,122 @@
+"""
+Prometheus metrics - GET /metrics
+
+    instrument_app(app)             # request metrics + the /metrics route
+    instrument_engine(db.engine)    # connection pool gauges
+
+Exported:
+- http_request_duration_seconds{method, endpoint} - latency histogram per route
+- http_requests_total{method, endpoint, status}
+- http_requests_in_progress
+- db_pool_connections{state=size|checked_out|overflow}
+- db_query_duration_seconds{operation} - every repository.py operation
+- external_call_duration_seconds{service=smtp|twilio, outcome=ok|error}
+
+Under gunicorn every worker is its own process, so the metrics are kept in
+prometheus_client's multiprocess mode: set PROMETHEUS_MULTIPROC_DIR (done by
+gunicorn.conf.py) and /metrics in any worker reports the sum over all of
+them. Without it (local runs, tests) the per-process registry is served.
+"""
+from contextlib import contextmanager
+import os
+import time
+
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+
+from repository import on_query
+
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Request latency by route',
+    ['method', 'endpoint'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+REQUESTS = Counter('http_requests_total', 'Requests by route and status', ['method', 'endpoint', 'status'])
+IN_PROGRESS = Gauge('http_requests_in_progress', 'Requests being served', multiprocess_mode='livesum')
+POOL_CONNECTIONS = Gauge('db_pool_connections', 'Connection pool state', ['state'], multiprocess_mode='livesum')
+QUERY_SECONDS = Histogram(
+    'db_query_duration_seconds', 'Repository operation latency', ['operation'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+)
+EXTERNAL_SECONDS = Histogram(
+    'external_call_duration_seconds', 'SMTP/Twilio call latency', ['service', 'outcome'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+on_query(lambda operation, seconds: QUERY_SECONDS.labels(operation).observe(seconds))
+
+
+def instrument_app(app):
+    """Time every request of `app` and serve GET /metrics"""
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+        g.metrics_in_flight = True
+        IN_PROGRESS.inc()
+
+    @app.after_request
+    def _record(response):
+        _observe(response.status_code)
+        return response
+
+    @app.teardown_request
+    def _finish(exception=None):
+        if 'metrics_started' in g:
+            _observe(500)  # after_request never ran - unhandled error
+        if g.pop('metrics_in_flight', False):
+            IN_PROGRESS.dec()
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return app.response_class(render(), mimetype=CONTENT_TYPE_LATEST)
+
+
+def _observe(status):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return
+    endpoint = request.endpoint or 'unmatched'
+    REQUEST_SECONDS.labels(request.method, endpoint).observe(time.perf_counter() - started)
+    REQUESTS.labels(request.method, endpoint, str(status)).inc()
+
+
+def instrument_engine(engine):
+    """Keep the pool gauges of `engine` current on every checkout/checkin"""
+    pool = engine.pool
+
+    checked_out = POOL_CONNECTIONS.labels('checked_out')
+
+    def update(*args):
+        POOL_CONNECTIONS.labels('size').set(pool.size())
+        POOL_CONNECTIONS.labels('overflow').set(max(pool.overflow(), 0))  # negative until the pool is full
+
+    # Counted here rather than read from the pool: checkin fires before the pool's own count drops
+    event.listen(pool, 'checkout', lambda *args: (checked_out.inc(), update()))
+    event.listen(pool, 'checkin', lambda *args: (checked_out.dec(), update()))
+    event.listen(pool, 'connect', update)
+    update()
+
+
+@contextmanager
+def external_call(service):
+    """Time a call to an outside service (smtp, twilio)"""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        EXTERNAL_SECONDS.labels(service, outcome).observe(time.perf_counter() - started)
+
+
+def render():
+    """The exposition text - summed over all workers in multiprocess mode"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
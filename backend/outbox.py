@@ -0,0 +1,131 @@
+"""
+Notification outbox - email/SMS delivery outside the request
+
+Routes write pending notification rows in the same transaction as the
+booking and call wake(); a background thread in every worker process
+drains due rows, retries failures with exponential backoff and records
+sent/failed status on the row. Rows set to 'cancelled' (e.g. the approval
+email of a booking rejected before it went out) are never claimed again.
+
+Rows are claimed with a conditional UPDATE on the attempt counter, so
+several gunicorn workers (or instances) can drain the same table without
+sending anything twice. A claim is a lease: if the process dies mid-send
+the row becomes due again once the lease expires.
+"""
+from datetime import datetime, timedelta
+import logging
+import os
+import threading
+
+from sqlalchemy import select, update
+
+log = logging.getLogger('arch1tect.outbox')
+
+
+class NotificationOutbox:
+    def __init__(self, app, db, model, senders, poll_interval=5, batch_size=20,
+                 max_attempts=5, backoff=30, lease=300, enabled=True):
+        self.app = app
+        self.db = db
+        self.model = model
+        self.senders = senders  # (notification_type, channel) -> callable(notification)
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+        self.enabled = enabled
+        self._wake = threading.Event()
+        self._worker_pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the drain thread for this process (threads do not survive a fork)"""
+        if not self.enabled or self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            threading.Thread(target=self._run, name='notification-outbox', daemon=True).start()
+
+    def wake(self):
+        """Called after a commit that added notifications - drain without waiting for the poll"""
+        self.start()
+        self._wake.set()
+
+    def retry_delay(self, attempts):
+        return timedelta(seconds=self.backoff * 2 ** (attempts - 1))
+
+    def drain(self):
+        """Send every notification that is due now; returns how many were attempted"""
+        model, session = self.model, self.db.session
+        now = datetime.utcnow()
+        due = session.execute(
+            select(model.id, model.attempts)
+            .where(model.status.in_(('pending', 'sending')), model.next_attempt_at <= now)
+            .order_by(model.next_attempt_at, model.id)
+            .limit(self.batch_size)
+        ).all()
+        session.commit()
+
+        attempted = 0
+        for notification_id, attempts in due:
+            claim = update(model).where(model.id == notification_id, model.attempts == attempts,
+                                        model.status.in_(('pending', 'sending')))
+            if attempts >= self.max_attempts:
+                # Lease of a final attempt ran out without a result
+                session.execute(claim.values(status='failed'))
+                session.commit()
+                continue
+
+            claimed = session.execute(claim.values(
+                status='sending', attempts=attempts + 1,
+                next_attempt_at=now + timedelta(seconds=self.lease)
+            )).rowcount
+            session.commit()
+            if not claimed:
+                continue  # taken by another worker
+
+            attempted += 1
+            notification = session.get(model, notification_id)
+            sender = self.senders.get((notification.notification_type, notification.channel))
+            try:
+                if sender is None:
+                    raise LookupError(f'No sender for {notification.notification_type}/{notification.channel}')
+                sender(notification)
+            except Exception as e:
+                session.rollback()
+                notification = session.get(model, notification_id)
+                notification.error_message = f'{type(e).__name__}: {e}'
+                if notification.status == 'cancelled':
+                    pass  # cancelled while sending - no retry
+                elif notification.attempts >= self.max_attempts or sender is None:
+                    notification.status = 'failed'
+                    log.error('notification failed for good', extra={
+                        'notification_id': notification_id, 'attempts': notification.attempts,
+                        'error': notification.error_message})
+                else:
+                    notification.status = 'pending'
+                    notification.next_attempt_at = datetime.utcnow() + self.retry_delay(notification.attempts)
+                    log.warning('notification failed, will retry', extra={
+                        'notification_id': notification_id, 'attempts': notification.attempts,
+                        'retry_at': notification.next_attempt_at.isoformat(),
+                        'error': notification.error_message})
+            else:
+                notification.status = 'sent'
+                notification.sent_at = datetime.utcnow()
+                notification.error_message = None
+            session.commit()
+        return attempted
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                with self.app.app_context():
+                    while self.drain():
+                        pass
+            except Exception:
+                log.exception('outbox drain failed')
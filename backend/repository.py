@@ -0,0 +1,526 @@
+"""
+Shared data access for events and bookings
+
+Every API entry point - backend/app.py (Railway), api/events_api_postgres.py
+(Vercel), railway-backend/app.py and the plain-SQLite api/events_api.py -
+defines its tables with define_tables() and runs its event and booking
+queries through a Repository, so a fix or an optimisation lands once.
+
+Statements for the fixed-shape hot paths (single event/booking, booking
+list, status changes) are built once per repository with bind parameters;
+SQLAlchemy's compiled cache then serves them without re-compiling. Writes
+use INSERT/UPDATE ... RETURNING where the database supports it, so a
+write is one round trip. Repository methods never commit - the caller
+owns the transaction (e.g. to queue outbox rows with a booking).
+
+Artists parsed from events.artists are kept in their own tables, linked
+on every event write - see artist_index.py.
+
+Full-text search (search_events) uses a database-side index kept in sync
+by the database itself - see event_search.py.
+
+Every operation is timed: query_stats.stats() gives per-operation counts
+and latencies, and on_query(callback) registers a hook called with
+(operation, seconds) after each one.
+"""
+from collections import namedtuple
+from datetime import datetime
+import base64
+import binascii
+import functools
+import json
+import threading
+import time
+
+from sqlalchemy import (
+    Boolean, Column, Date, DateTime, Float, ForeignKey, Index, Integer, String, Table, Text, Time,
+    bindparam, delete, func, insert, select, tuple_, update,
+)
+
+from artist_index import link_artists
+
+from event_search import install_search_index, match_expression, search_args, search_statement, snippet  # noqa: F401
+
+Tables = namedtuple('Tables', ['events', 'bookings', 'artists', 'event_artists'])
+
+
+def define_tables(metadata):
+    """The events, bookings and artist index tables, declared on `metadata` (e.g. db.metadata)"""
+    events = Table(
+        'events', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('name', String(255), nullable=False),
+        Column('date', Date, nullable=False),
+        Column('time', Time),
+        Column('venue', String(255), nullable=False),
+        Column('city', String(100)),
+        Column('type', String(50), default='club'),
+        Column('description', Text),
+        Column('artists', Text),
+        Column('price', Float),
+        Column('capacity', Integer),
+        Column('image_url', Text),
+        Column('status', String(50), default='upcoming'),
+        Column('created_at', DateTime, default=datetime.utcnow),
+        Column('updated_at', DateTime, default=datetime.utcnow, onupdate=datetime.utcnow),
+        Index('ix_events_date_id', 'date', 'id'),
+        Index('ix_events_status_date_id', 'status', 'date', 'id'),
+        Index('ix_events_name_date_venue', 'name', 'date', 'venue'),  # bulk import natural key
+    )
+    install_search_index(events)
+    bookings = Table(
+        'bookings', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('event_id', Integer, ForeignKey('events.id')),
+        Column('name', String(255), nullable=False),
+        Column('email', String(255), nullable=False),
+        Column('phone', String(50)),
+        Column('event_date', Date),
+        Column('event_type', String(50)),
+        Column('start_time', Time),
+        Column('duration', Integer),  # minutes
+        Column('venue', String(255)),
+        Column('city', String(100)),
+        Column('guests', Integer),
+        Column('message', Text),
+        Column('status', String(50), default='pending'),
+        Column('created_at', DateTime, default=datetime.utcnow),
+        # Calendar integration fields
+        Column('calendar_event_sent', Boolean, default=False),
+        Column('calendar_platforms', String(255)),  # "Google,Apple,Outlook,Office365"
+        Column('event_title', String(255)),
+        Column('event_location', String(500)),
+        Index('ix_bookings_event_date_status', 'event_date', 'status'),
+        Index('ix_bookings_created_at', 'created_at'),
+    )
+    artists = Table(
+        'artists', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('name', String(255), nullable=False),
+        Column('slug', String(255), nullable=False),
+        Index('ux_artists_slug', 'slug', unique=True),
+    )
+    event_artists = Table(
+        'event_artists', metadata,
+        Column('event_id', Integer, ForeignKey('events.id', ondelete='CASCADE'), primary_key=True),
+        Column('artist_id', Integer, ForeignKey('artists.id', ondelete='CASCADE'), primary_key=True),
+        Column('position', Integer, nullable=False, default=0),  # order in the line-up
+        Index('ix_event_artists_artist_event', 'artist_id', 'event_id'),
+    )
+    return Tables(events, bookings, artists, event_artists)
+
+
+# Date/time helpers - the API speaks YYYY-MM-DD and HH:MM
+def parse_date(value):
+    if value in (None, ''):
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+def parse_time(value):
+    if value in (None, ''):
+        return None
+    for fmt in ('%H:%M', '%H:%M:%S'):
+        try:
+            return datetime.strptime(value, fmt).time()
+        except (TypeError, ValueError):
+            continue
+    raise ValueError(f"Invalid time '{value}', expected HH:MM")
+
+
+def format_time(value):
+    return value.strftime('%H:%M') if value else None
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+EVENT_WRITE_FIELDS = ('name', 'date', 'time', 'venue', 'city', 'type', 'description',
+                      'artists', 'price', 'capacity', 'image_url', 'status')
+EVENT_FIELDS = ('id',) + EVENT_WRITE_FIELDS + ('created_at', 'updated_at')
+BOOKING_FIELDS = ('id', 'event_id', 'name', 'email', 'phone', 'event_date', 'event_type', 'start_time',
+                  'duration', 'venue', 'city', 'guests', 'message', 'status', 'created_at',
+                  'calendar_event_sent', 'calendar_platforms', 'event_title', 'event_location')
+
+ARTIST_FIELDS = ('name', 'slug', 'events')
+
+# List endpoints encode column tuples directly (fast_json.encode_rows), which
+# writes dates as ISO strings itself; only times need formatting
+EVENT_FORMATTERS = {'time': format_time}
+BOOKING_FORMATTERS = {'start_time': format_time}
+_EVENT_DICT_FORMATTERS = dict(EVENT_FORMATTERS, date=_isoformat, created_at=_isoformat, updated_at=_isoformat)
+_BOOKING_DICT_FORMATTERS = dict(BOOKING_FORMATTERS, event_date=_isoformat, created_at=_isoformat)
+
+DEFAULT_BOOKING_DURATION = 240  # minutes - 4 hours for club events
+CALENDAR_PLATFORMS = 'Google Calendar,Apple Calendar,Outlook,Office 365'
+
+
+def _as_dict(fields, formatters, item):
+    data = {field: getattr(item, field) for field in fields}
+    for field, formatter in formatters.items():
+        data[field] = formatter(data[field])
+    return data
+
+
+def event_dict(event):
+    """API dict for an event row or Event instance"""
+    return _as_dict(EVENT_FIELDS, _EVENT_DICT_FORMATTERS, event)
+
+
+def artist_dict(artist):
+    """API dict for a list_artists() row"""
+    return _as_dict(ARTIST_FIELDS, {}, artist)
+
+
+def booking_dict(booking):
+    """API dict for a booking row or Booking instance"""
+    return _as_dict(BOOKING_FIELDS, _BOOKING_DICT_FORMATTERS, booking)
+
+
+def event_values(data, partial=False):
+    """Column values for an event from request JSON; `partial` keeps only the keys sent"""
+    values = {}
+    for field in EVENT_WRITE_FIELDS:
+        if partial and field not in data:
+            continue
+        value = data.get(field)
+        if field == 'date':
+            value = parse_date(value)
+        elif field == 'time':
+            value = parse_time(value)
+        values[field] = value
+    if not partial:
+        values['type'] = values['type'] or 'club'
+        values['status'] = values['status'] or 'upcoming'
+    return values
+
+
+def search_results(rows, terms):
+    """API dicts for search_events() rows - the event plus `rank` and an HTML `snippet`"""
+    results = []
+    for row in rows:
+        result = event_dict(row)
+        result['rank'] = round(row.rank, 6)
+        result['snippet'] = next(filter(None, (snippet(getattr(row, field), terms)
+                                               for field in ('description', 'artists', 'name', 'venue', 'city'))), None)
+        results.append(result)
+    return results
+
+
+def booking_values(data):
+    """Column values for a new (pending) booking from request JSON"""
+    venue = data.get('venue', 'Club HAOS')
+    return {
+        'event_id': data.get('event_id'),
+        'name': data.get('name'),
+        'email': data.get('email'),
+        'phone': data.get('phone'),
+        'event_date': parse_date(data.get('event_date')),
+        'event_type': data.get('event_type'),
+        'start_time': parse_time(data.get('start_time')),
+        'duration': data.get('duration') or DEFAULT_BOOKING_DURATION,
+        'venue': data.get('venue'),
+        'city': data.get('city'),
+        'guests': data.get('guests'),
+        'message': data.get('message'),
+        'status': 'pending',
+        'calendar_event_sent': True,  # We provide calendar integration
+        'calendar_platforms': CALENDAR_PLATFORMS,
+        'event_title': f"ARCH1TECT @ {venue}",
+        'event_location': f"{venue}, {data.get('city', 'Gdańsk')}",
+    }
+
+
+# Events listing - keyset pagination on (date, id)
+EVENTS_PAGE_SIZE = 50
+EVENTS_MAX_PAGE_SIZE = 200
+EVENT_FILTERS = ('city', 'type', 'status')
+
+
+def parse_date_param(value, name):
+    """Validate a YYYY-MM-DD query parameter"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid '{name}' date, expected YYYY-MM-DD")
+
+
+def encode_cursor(date, event_id):
+    """Opaque cursor pointing at the last row of a page"""
+    raw = json.dumps([date.isoformat(), event_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date, event_id = json.loads(base64.urlsafe_b64decode(padded))
+        return parse_date_param(date, 'after'), int(event_id)
+    except (TypeError, ValueError, binascii.Error):
+        raise ValueError("Invalid 'after' cursor")
+
+
+def events_page_args(args):
+    """Validated events_page() arguments from request args (raises ValueError)"""
+    try:
+        limit = int(args.get('limit', EVENTS_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("Invalid 'limit', expected an integer")
+
+    order = args.get('order', 'desc')
+    if order not in ('asc', 'desc'):
+        raise ValueError("Invalid 'order', expected 'asc' or 'desc'")
+
+    return {
+        'limit': max(1, min(limit, EVENTS_MAX_PAGE_SIZE)),
+        'order': order,
+        'filters': {field: args[field] for field in EVENT_FILTERS if args.get(field)},
+        'date_from': parse_date_param(args['from'], 'from') if args.get('from') else None,
+        'date_to': parse_date_param(args['to'], 'to') if args.get('to') else None,
+        'after': decode_cursor(args['after']) if args.get('after') else None,
+    }
+
+
+class QueryStats:
+    """Per-operation call counts and latencies, plus hooks called after each operation"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.hooks = []
+
+    def record(self, operation, seconds):
+        with self._lock:
+            stats = self._stats.setdefault(operation, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+        for hook in self.hooks:
+            hook(operation, seconds)
+
+    def stats(self):
+        with self._lock:
+            return {
+                operation: {'calls': calls, 'avg_ms': round(total / calls * 1000, 3),
+                            'max_ms': round(slowest * 1000, 3)}
+                for operation, (calls, total, slowest) in sorted(self._stats.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+query_stats = QueryStats()
+
+
+def on_query(callback):
+    """Register callback(operation, seconds), called after every repository operation"""
+    query_stats.hooks.append(callback)
+    return callback
+
+
+def timed(operation):
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                query_stats.record(operation, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+class Repository:
+    """Event and booking queries on `session` (a Session or scoped_session)"""
+
+    def __init__(self, session, tables):
+        self.session = session
+        self.events, self.bookings = events, bookings = tables.events, tables.bookings
+        self.artists, self.event_artists = artists, event_artists = tables.artists, tables.event_artists
+        self.event_columns = [events.c[field] for field in EVENT_FIELDS]
+        self.booking_columns = [bookings.c[field] for field in BOOKING_FIELDS]
+
+        # Fixed-shape statements, built once
+        self._get_event = select(*self.event_columns).where(events.c.id == bindparam('id'))
+        self._delete_event = delete(events).where(events.c.id == bindparam('id'))
+        self._get_booking = select(*self.booking_columns).where(bookings.c.id == bindparam('id'))
+        self._get_booking_with_event = (
+            select(*self.booking_columns, events.c.name.label('event_name'))
+            .outerjoin(events, bookings.c.event_id == events.c.id)
+            .where(bookings.c.id == bindparam('id'))
+        )
+        self._search = {}  # dialect name -> statement
+        self._artist_by_slug = select(artists.c.id, artists.c.name, artists.c.slug).where(
+            artists.c.slug == bindparam('slug'))
+        self._artist_events = (
+            select(*self.event_columns)
+            .join_from(event_artists, events, events.c.id == event_artists.c.event_id)
+            .where(event_artists.c.artist_id == bindparam('artist_id'))
+            .order_by(events.c.date.desc(), events.c.id.desc())
+        )
+        event_count = func.count(event_artists.c.event_id)
+        self._list_artists = (
+            select(artists.c.name, artists.c.slug, event_count.label('events'))
+            .join_from(artists, event_artists, event_artists.c.artist_id == artists.c.id)
+            .group_by(artists.c.id, artists.c.name, artists.c.slug)
+            .order_by(event_count.desc(), artists.c.name)
+        )
+        self._list_bookings = select(*self.booking_columns).order_by(bookings.c.created_at.desc())
+        self._list_bookings_with_event = (
+            select(*self.booking_columns, events.c.name.label('event_name'))
+            .outerjoin(events, bookings.c.event_id == events.c.id)
+            .order_by(bookings.c.created_at.desc())
+        )
+
+    @property
+    def _returning(self):
+        return self.session.get_bind().dialect.insert_returning
+
+    # Events
+    @timed('events.page')
+    def events_page(self, limit=None, order='desc', filters=None, date_from=None, date_to=None, after=None):
+        """One page of events as (rows, next cursor); limit=None returns every match"""
+        events = self.events
+        query = select(*self.event_columns)
+        for field, value in (filters or {}).items():
+            query = query.where(events.c[field] == value)
+        if date_from:
+            query = query.where(events.c.date >= date_from)
+        if date_to:
+            query = query.where(events.c.date <= date_to)
+
+        key = tuple_(events.c.date, events.c.id)
+        if after:
+            query = query.where(key < after if order == 'desc' else key > after)
+        if order == 'desc':
+            query = query.order_by(events.c.date.desc(), events.c.id.desc())
+        else:
+            query = query.order_by(events.c.date.asc(), events.c.id.asc())
+
+        if limit is None:
+            return self.session.execute(query).all(), None
+        rows = self.session.execute(query.limit(limit + 1)).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, encode_cursor(rows[-1].date, rows[-1].id)
+        return rows, None
+
+    @timed('events.get')
+    def get_event(self, event_id):
+        return self.session.execute(self._get_event, {'id': event_id}).first()
+
+    @timed('events.create')
+    def create_event(self, values):
+        now = datetime.utcnow()
+        values = dict(values, created_at=now, updated_at=now)
+        if self._returning:
+            event = self.session.execute(insert(self.events).returning(*self.event_columns), values).one()
+        else:
+            result = self.session.execute(insert(self.events), values)
+            event = self.get_event(result.inserted_primary_key[0])
+        self._link_artists({event.id: event.artists})
+        return event
+
+    @timed('events.update')
+    def update_event(self, event_id, values):
+        """Update the given columns; None if there is no such event"""
+        query = (update(self.events).where(self.events.c.id == event_id)
+                 .values(dict(values, updated_at=datetime.utcnow())))
+        if self._returning:
+            event = self.session.execute(query.returning(*self.event_columns)).first()
+        elif self.session.execute(query).rowcount == 0:
+            event = None
+        else:
+            event = self.get_event(event_id)
+        if event is not None and 'artists' in values:
+            self._link_artists({event.id: event.artists})
+        return event
+
+    @timed('events.delete')
+    def delete_event(self, event_id):
+        # Links first - SQLite only cascades with PRAGMA foreign_keys on
+        self.session.execute(delete(self.event_artists).where(self.event_artists.c.event_id == event_id))
+        return self.session.execute(self._delete_event, {'id': event_id}).rowcount > 0
+
+    def _link_artists(self, lineups):
+        link_artists(self.session, self.artists, self.event_artists, lineups)
+
+    @timed('events.search')
+    def search_events(self, terms, limit):
+        """Events matching every term (as a prefix), best first, each row with a `rank` column"""
+        if not terms:
+            return []
+        dialect = self.session.get_bind().dialect.name
+        if dialect not in self._search:
+            self._search[dialect] = search_statement(self.events, self.event_columns, dialect)
+        return self.session.execute(self._search[dialect],
+                                    {'match': match_expression(terms, dialect), 'limit': limit}).all()
+
+    # Artists
+    @timed('artists.list')
+    def list_artists(self):
+        """(name, slug, events) of every artist with at least one event, busiest first"""
+        return self.session.execute(self._list_artists).all()
+
+    @timed('artists.events')
+    def artist_events(self, slug):
+        """(artist, its events newest first); (None, []) if there is no such artist"""
+        artist = self.session.execute(self._artist_by_slug, {'slug': slug}).first()
+        if artist is None:
+            return None, []
+        return artist, self.session.execute(self._artist_events, {'artist_id': artist.id}).all()
+
+    # Bookings
+    @timed('bookings.list')
+    def list_bookings(self, with_event_name=False):
+        """Every booking, newest first (optionally with the linked event's name)"""
+        query = self._list_bookings_with_event if with_event_name else self._list_bookings
+        return self.session.execute(query).all()
+
+    @timed('bookings.get')
+    def get_booking(self, booking_id, with_event_name=False):
+        query = self._get_booking_with_event if with_event_name else self._get_booking
+        return self.session.execute(query, {'id': booking_id}).first()
+
+    @timed('bookings.create')
+    def create_booking(self, values):
+        values = dict(values, created_at=datetime.utcnow())
+        if self._returning:
+            return self.session.execute(insert(self.bookings).returning(*self.booking_columns), values).one()
+        result = self.session.execute(insert(self.bookings), values)
+        return self.get_booking(result.inserted_primary_key[0])
+
+    @timed('bookings.set_status')
+    def set_booking_status(self, booking_id, status):
+        """Set one booking's status; the updated row, or None if there is no such booking"""
+        query = update(self.bookings).where(self.bookings.c.id == booking_id).values(status=status)
+        if self._returning:
+            return self.session.execute(query.returning(*self.booking_columns)).first()
+        if self.session.execute(query).rowcount == 0:
+            return None
+        return self.get_booking(booking_id)
+
+    @timed('bookings.set_status_bulk')
+    def set_bookings_status(self, ids, status):
+        """Move bookings in `ids` to `status`; (id, email) of the rows that changed"""
+        bookings = self.bookings
+        query = update(bookings).where(bookings.c.id.in_(ids), bookings.c.status != status).values(status=status)
+        if self.session.get_bind().dialect.update_returning:
+            return self.session.execute(query.returning(bookings.c.id, bookings.c.email)).all()
+        # No RETURNING (SQLite < 3.35) - read the matching rows first, then update them
+        changed = self.session.execute(
+            select(bookings.c.id, bookings.c.email).where(bookings.c.id.in_(ids), bookings.c.status != status)
+        ).all()
+        self.session.execute(query.where(bookings.c.id.in_([row.id for row in changed])))
+        return changed
+
+    @timed('bookings.existing_ids')
+    def existing_booking_ids(self, ids):
+        return set(self.session.execute(select(self.bookings.c.id).where(self.bookings.c.id.in_(ids))).scalars())
@@ -0,0 +1,124 @@
+"""
+Pooled, persistent SMTP connections for Flask-Mail
+
+Mail.send() opens a fresh session for every message: TCP connect, EHLO,
+STARTTLS, AUTH, then QUIT - several round trips to the provider before
+the message itself goes out. SMTPPool keeps a few authenticated sessions
+open per process and sends any number of messages through one of them:
+
+    mail_pool = SMTPPool()
+    mail_pool.send(customer_msg, admin_msg)   # one session, two messages
+
+Sessions idle for longer than `max_idle` seconds are closed instead of
+reused (providers drop idle clients), and a session the server has closed
+anyway is replaced transparently and the message resent once.
+
+Uses the Flask-Mail settings of the current app and honours
+MAIL_SUPPRESS_SEND, so tests behave exactly like with mail.send().
+"""
+import os
+import smtplib
+import threading
+import time
+
+from flask import current_app
+
+# Errors that mean the session is gone rather than the message was refused
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class SMTPPool:
+    def __init__(self, size=2, max_idle=60, timeout=10):
+        self.size = size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._idle = []  # (host, last_used)
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.reconnects = 0
+        self.sent = 0
+
+    def _connect(self, state):
+        if state.use_ssl:
+            host = smtplib.SMTP_SSL(state.server, state.port, timeout=self.timeout)
+        else:
+            host = smtplib.SMTP(state.server, state.port, timeout=self.timeout)
+        host.set_debuglevel(int(state.debug))
+        if state.use_tls:
+            host.starttls()
+        if state.username and state.password:
+            host.login(state.username, state.password)
+        self.connects += 1
+        return host
+
+    def _acquire(self, state):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Sockets inherited through fork belong to the parent
+                self._idle, self._pid = [], os.getpid()
+            stale = []
+            host = None
+            while self._idle:
+                candidate, last_used = self._idle.pop()
+                if time.monotonic() - last_used < self.max_idle:
+                    host = candidate
+                    break
+                stale.append(candidate)
+        for candidate in stale:
+            self._close(candidate)
+        return host or self._connect(state)
+
+    def _release(self, host):
+        with self._lock:
+            if len(self._idle) < self.size and self._pid == os.getpid():
+                self._idle.append((host, time.monotonic()))
+                return
+        self._close(host)
+
+    @staticmethod
+    def _close(host):
+        try:
+            host.quit()
+        except Exception:
+            host.close()
+
+    def send(self, *messages):
+        """Send `messages` through one pooled session"""
+        from flask_mail import Connection  # imported on first send, keeps cold starts light
+
+        state = current_app.extensions['mail']
+        connection = Connection(state)
+        connection.num_emails = 0
+        if state.suppress:
+            connection.host = None
+            for message in messages:
+                connection.send(message)
+            return
+
+        connection.host = self._acquire(state)
+        try:
+            for message in messages:
+                try:
+                    connection.send(message)
+                except RECONNECT_ERRORS:
+                    # Dropped by the server - replace the session and resend once
+                    connection.host.close()
+                    connection.host = self._connect(state)
+                    self.reconnects += 1
+                    connection.send(message)
+                self.sent += 1
+        except Exception:
+            connection.host.close()
+            raise
+        self._release(connection.host)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for host, _ in idle:
+            self._close(host)
+
+    def stats(self):
+        return {'idle': len(self._idle), 'connects': self.connects,
+                'reconnects': self.reconnects, 'sent': self.sent}
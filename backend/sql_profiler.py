@@ -0,0 +1,114 @@
+"""
+Per-request SQL profiler - statement counts, DB time and N+1 detection
+
+    if SQL_PROFILE:
+        profile_app(app, db.engine)
+
+Every statement a request runs is counted and timed through SQLAlchemy's
+before/after_cursor_execute events. The response gets a Server-Timing
+header (shown in the browser's network panel):
+
+    Server-Timing: db;dur=4.21;desc="3 queries"
+
+Statements are grouped by shape - the SQL text with IN-lists collapsed,
+parameters are bound separately anyway. A shape repeated `threshold` or
+more times in one request is almost always a lazy load inside a loop
+(N+1): it is added to the header as `db-repeated` and logged.
+
+Opt-in (SQL_PROFILE=on) - the events fire for every statement. For tests,
+max_queries() puts a budget on a block of code regardless of the switch.
+"""
+from collections import Counter
+from contextlib import contextmanager
+import logging
+import re
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+N_PLUS_ONE_THRESHOLD = 5
+
+log = logging.getLogger('arch1tect.sql')
+
+_IN_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """`statement` with whitespace normalized and IN-lists collapsed to one placeholder"""
+    return _IN_LIST.sub('(?)', _WHITESPACE.sub(' ', statement).strip())
+
+
+class RequestProfile:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold):
+        """(shape, count) of the statements run at least `threshold` times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def server_timing(self, threshold):
+        entries = [f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"']
+        for shape, count in self.repeated(threshold)[:3]:
+            summary = shape[:80].replace('"', "'").encode('ascii', 'replace').decode()
+            entries.append(f'db-repeated;desc="{count}x {summary}"')
+        return ', '.join(entries)
+
+
+def profile_app(app, engine, threshold=N_PLUS_ONE_THRESHOLD):
+    """Profile the statements every request of `app` runs on `engine`"""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'sql_profile' in g:
+            conn.info.setdefault('sql_profile_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('sql_profile_started')
+        if started and has_request_context() and 'sql_profile' in g:
+            g.sql_profile.record(statement, time.perf_counter() - started.pop())
+
+    @app.before_request
+    def _begin():
+        g.sql_profile = RequestProfile()
+
+    @app.after_request
+    def _report(response):
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+        response.headers.add('Server-Timing', profile.server_timing(threshold))
+        for shape, count in profile.repeated(threshold):
+            log.warning('probable N+1', extra={'method': request.method, 'path': request.path,
+                                               'count': count, 'statement': shape[:200]})
+        return response
+
+
+@contextmanager
+def max_queries(engine, limit):
+    """Fail the test if the block runs more than `limit` statements on `engine`
+
+        with max_queries(engine, 2) as statements:
+            client.post('/api/bookings', json=...)
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert len(statements) <= limit, \
+        f'{len(statements)} queries, expected at most {limit}:\n' + '\n'.join(statements)
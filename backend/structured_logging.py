@@ -0,0 +1,152 @@
+"""
+Structured logging - JSON lines, formatted and written by a background thread
+
+    configure_logging(app)
+    log = logging.getLogger('arch1tect.bookings')
+    log.info('booking created', extra={'booking_id': booking.id})
+
+A request thread only merges the message and puts the record on an
+in-process queue. A QueueListener thread does the JSON formatting, the
+traceback rendering and the stdout write, so a slow or blocked stdout
+never holds up a request. Each record is one line:
+
+    {"ts": "...", "level": "INFO", "logger": "arch1tect.bookings",
+     "message": "booking created", "request_id": "9f3c...", "booking_id": 7}
+
+Every request gets an ID - the incoming X-Request-ID header when it looks
+sane, a fresh one otherwise. It is attached to every record logged while
+the request runs and sent back as X-Request-ID.
+
+LOG_LEVEL sets the level (default INFO). LOG_DEBUG_SAMPLE keeps only that
+fraction of DEBUG records (e.g. 0.05), for when DEBUG is needed in
+production. The listener thread is started in the process that calls
+configure_logging(), so call it after gunicorn forks (no --preload).
+"""
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+
+from flask import g, request
+
+LOGGER_NAME = 'arch1tect'
+REQUEST_ID_HEADER = 'X-Request-ID'
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+request_id_var = ContextVar('request_id', default=None)
+listener = None
+
+# LogRecord attributes - anything else on a record came in through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'request_id'}
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps the current request ID on the record - runs in the calling thread, before the queue"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Lets through only `rate` of the DEBUG records; other levels always pass"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread"""
+
+    def prepare(self, record):
+        # The message is merged here because args may be objects that change
+        # (or lazy-load) later; everything else is left for the listener
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(app=None, stream=None, level=None, debug_sample_rate=None):
+    """Route the 'arch1tect' loggers through the background writer; with `app`, add request IDs"""
+    global listener
+    level = level or os.environ.get('LOG_LEVEL', 'INFO').upper()
+    if debug_sample_rate is None:
+        debug_sample_rate = float(os.environ.get('LOG_DEBUG_SAMPLE', 1))
+
+    if listener is None:
+        records = queue.SimpleQueue()
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JSONFormatter())
+        listener = QueueListener(records, output)
+        listener.start()
+        atexit.register(listener.stop)
+
+        handler = BackgroundQueueHandler(records)
+        handler.addFilter(SamplingFilter(debug_sample_rate))
+        handler.addFilter(RequestIdFilter())
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.addHandler(handler)
+        logger.propagate = False
+    logging.getLogger(LOGGER_NAME).setLevel(level)
+
+    if app is not None:
+        app.before_request(_start_request)
+        app.after_request(_tag_response)
+        app.teardown_request(_end_request)
+    return listener
+
+
+def flush():
+    """Wait until every queued record has been written"""
+    if listener is not None and listener._thread is not None:
+        listener.stop()
+        listener.start()
+
+
+def _start_request():
+    incoming = request.headers.get(REQUEST_ID_HEADER, '')
+    request_id = incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+    g.request_id_token = request_id_var.set(request_id)
+
+
+def _tag_response(response):
+    request_id = request_id_var.get()
+    if request_id:
+        response.headers[REQUEST_ID_HEADER] = request_id
+    return response
+
+
+def _end_request(exception=None):
+    token = g.pop('request_id_token', None)
+    if token is not None:
+        request_id_var.reset(token)
@@ -0,0 +1,93 @@
+"""
+Per-table write versions for conditional GETs (ETag / If-None-Match)
+
+Every route that writes a table bumps its version after the commit; read
+routes derive a strong ETag from the versions they depend on, so a matching
+If-None-Match can be answered with 304 before any query runs.
+
+LocalVersionStore is per process; RedisVersionStore shares the counters
+between workers when REDIS_URL is configured. ETags are only issued when
+the store sees every write (sees_all_writes): Redis, or a local store in
+a process that serves alone. With several workers and local counters a
+worker that missed a write would keep confirming its old tags, and
+unlike the response cache a 304 has no TTL.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger('arch1tect.cache')
+
+
+class LocalVersionStore:
+    """In-process counters.
+
+    Only writes handled by this process are seen, so ETags are issued only
+    with single_process=True (app.run(), tests). The epoch (pid + start
+    time) is part of every ETag, so tags from before a restart never match.
+    """
+
+    def __init__(self, single_process=False):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self.epoch = f'{os.getpid():x}{int(time.time()):x}'
+        self.sees_all_writes = single_process
+
+    def get(self, table):
+        return self._versions.get(table, 0)
+
+    def bump(self, table):
+        with self._lock:
+            self._versions[table] = self._versions.get(table, 0) + 1
+            return self._versions[table]
+
+
+class RedisVersionStore:
+    """Counters shared by every worker and instance through Redis"""
+
+    epoch = 'shared'
+    sees_all_writes = True
+
+    def __init__(self, client, prefix='arch1tect:version'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, table):
+        try:
+            return int(self.client.get(f'{self.prefix}:{table}') or 0)
+        except Exception:
+            # Unknown version: return something no ETag or cache key can match
+            return f'unavailable-{time.time_ns()}'
+
+    def bump(self, table):
+        try:
+            return self.client.incr(f'{self.prefix}:{table}')
+        except Exception as e:
+            log.warning('could not bump table version', extra={'table': table, 'error': str(e)})
+
+
+class TableVersions:
+    def __init__(self, store=None):
+        self.store = store or LocalVersionStore()
+
+    def get(self, table):
+        return self.store.get(table)
+
+    def bump(self, *tables):
+        for table in tables:
+            self.store.bump(table)
+
+    def etag(self, tables, *parts):
+        """Strong ETag for a response built from `tables` (plus request-specific parts)
+
+        None when the store can't see writes made by other processes.
+        """
+        if not self.store.sees_all_writes:
+            return None
+        key = '|'.join([self.store.epoch] + [f'{t}:{self.get(t)}' for t in tables] + [str(p) for p in parts])
+        return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+versions = TableVersions()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk event import vs the row-at-a-time ORM loop of add_life_events.py
+
+    python benchmarks/bulk_import.py [--rows 100000] [--baseline-rows 2000]
+
+Generates a CSV line-up and imports it into a scratch SQLite database
+(set DATABASE_URL to a PostgreSQL database to measure the COPY path):
+first into an empty table, then again (everything unchanged), then as a dry
+run with every row changed. The ORM baseline runs on --baseline-rows.
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+DB_PATH = os.path.join(tempfile.gettempdir(), 'arch1tect_bench_import.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{DB_PATH}')
+
+from app import app, db, Event, parse_date, parse_time  # noqa: E402
+from event_import import EventImporter, read_rows  # noqa: E402
+
+
+def lineup(count, city='Gdańsk'):
+    start = date(2026, 1, 1)
+    lines = ['name,date,time,venue,city,type,artists,price,capacity,status']
+    for i in range(count):
+        lines.append(f'Club Night {i},{start + timedelta(days=i % 3650)},22:00,HAOS,{city},club,'
+                     f'"ARCH1TECT, Guest",60,300,upcoming')
+    return '\n'.join(lines).encode()
+
+
+def orm_loop(data):
+    """What add_life_events.py did: one lookup and one ORM add per row"""
+    for _, row in read_rows(io.BytesIO(data), 'csv'):
+        row = dict(row, date=parse_date(row['date']), time=parse_time(row['time']),
+                   price=float(row['price']), capacity=int(row['capacity']))
+        existing = Event.query.filter_by(name=row['name'], date=row['date']).first()
+        if existing:
+            for key, value in row.items():
+                setattr(existing, key, value)
+        else:
+            db.session.add(Event(**row))
+    db.session.commit()
+
+
+def timed(label, count, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<34} {elapsed:>7.2f} s  {count / elapsed:>10,.0f} rows/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--baseline-rows', type=int, default=2_000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        print(f"\n{app.config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0]}")
+        db.drop_all()
+        db.create_all()
+        data = lineup(args.baseline_rows)
+        timed(f'ORM loop ({args.baseline_rows:,} rows)', args.baseline_rows, lambda: orm_loop(data))
+
+        db.drop_all()
+        db.create_all()
+        data = lineup(args.rows)
+
+        def run(source, dry_run=False):
+            return EventImporter(db.session, Event).run(read_rows(io.BytesIO(source), 'csv'), dry_run=dry_run)
+
+        report = timed(f'import, empty table ({args.rows:,})', args.rows, lambda: run(data))
+        assert report['inserted'] == args.rows
+        report = timed('re-import, all unchanged', args.rows, lambda: run(data))
+        assert report['unchanged'] == args.rows
+        changed = lineup(args.rows, city='Sopot')
+        report = timed('dry run, all changed', args.rows, lambda: run(changed, dry_run=True))
+        assert report['updated'] == args.rows
+        report = timed('import, all changed', args.rows, lambda: run(changed))
+        assert report['updated'] == args.rows
+        db.drop_all()
+
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold start of each API entry point
+
+    python benchmarks/cold_start.py [--runs 5] [--module events_api_postgres ...]
+
+Every run is a fresh interpreter that imports the module and then serves
+its first GET /api/health through the test client. Reports the median
+import time and time-to-first-response (import + first request), once
+with the local defaults and once as on Vercel (VERCEL=1: no schema
+creation at startup). Uses a scratch SQLite database unless DATABASE_URL
+is set.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# name -> (directory put on sys.path, code that leaves the Flask app in `app`)
+MODULES = {
+    'events_api_postgres': ('api', 'from events_api_postgres import app'),
+    'index': ('api', 'from index import app'),
+    'backend': ('backend', 'from app import app'),
+    'api_factory': ('.', "from api import create_app; app = create_app('production')"),
+}
+
+CHILD = '''
+import sys, time, json
+started = time.perf_counter()
+sys.path.insert(0, {path!r})
+{setup}
+imported = time.perf_counter()
+response = app.test_client().get('/api/health')
+served = time.perf_counter()
+print(json.dumps({{'import': imported - started, 'first_response': served - started,
+                  'status': response.status_code, 'modules': len(sys.modules)}}))
+'''
+
+
+def run_once(name, env):
+    path, setup = MODULES[name]
+    code = CHILD.format(path=os.path.join(ROOT, path), setup=setup)
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--module', nargs='+', choices=MODULES, default=list(MODULES))
+    args = parser.parse_args()
+
+    scratch = os.path.join(tempfile.gettempdir(), 'arch1tect_bench_cold_start.db')
+    base_env = dict(os.environ, OUTBOX_WORKER='off')
+    base_env.setdefault('DATABASE_URL', f'sqlite:///{scratch}')
+
+    print(f"{'module':<22} {'mode':<8} {'import':>10} {'first response':>15} {'modules':>8}")
+    for name in args.module:
+        for mode, extra in (('local', {}), ('vercel', {'VERCEL': '1'})):
+            env = dict(base_env, **extra)
+            env.pop('VERCEL', None) if not extra else None
+            runs = [run_once(name, env) for _ in range(args.runs)]
+            assert all(run['status'] == 200 for run in runs), runs
+            imported = statistics.median(run['import'] for run in runs) * 1000
+            first = statistics.median(run['first_response'] for run in runs) * 1000
+            print(f"{name:<22} {mode:<8} {imported:>8.0f} ms {first:>12.0f} ms {runs[0]['modules']:>8}")
+
+    if os.path.exists(scratch):
+        os.remove(scratch)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: GET /api/events/search queries on a large events table
+
+    python benchmarks/event_search.py [--rows 100000] [--repeat 50]
+
+Fills a scratch SQLite database (set DATABASE_URL to a scratch PostgreSQL
+database for the tsvector/GIN path - its tables are dropped) with
+generated events and times Repository.search_events() for common, rare,
+prefix and multi-word queries. Reports p50/p95 in milliseconds.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from sqlalchemy import MetaData, create_engine, insert  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from event_search import search_terms  # noqa: E402
+from repository import Repository, define_tables, search_results  # noqa: E402
+
+DB_PATH = os.path.join(tempfile.gettempdir(), 'arch1tect_bench_search.db')
+
+NAMES = ['Club Night', 'Techno Marathon', 'Noc Muzeów', 'Deep House Session', 'Sunset Rave', 'Open Air',
+         'Warehouse Party', 'Ambient Brunch', 'Drum and Bass Invasion', 'Letnia Scena']
+ARTISTS = ['ARCH1TECT', 'Świętokrzyska Ekipa', 'Łukasz Żółtowski', 'Nina Kraviz', 'Ben Klock', 'Amelie Lens',
+           'Bartek Ślązak', 'Kasia Wrona', 'DJ Gość', 'Marcin Czubala']
+VENUES = [('HAOS', 'Gdańsk'), ('Klub Żak', 'Gdańsk'), ('Smolna', 'Warszawa'), ('Prozak 2.0', 'Kraków'),
+          ('Tama', 'Poznań'), ('Łódź Kaliska', 'Łódź'), ('Schron', 'Wrocław'), ('Protokultura', 'Gdynia')]
+WORDS = ('noc muzyka taniec światła bas scena goście wejściówki bar taras rano plaża miasto dźwięk '
+         'winyle klimat energia zabawa lato zima').split()
+
+QUERIES = {
+    'common term': 'club',
+    'rare term': 'kraviz smolna',
+    'two-letter prefix': 'te',
+    'polish, no diacritics': 'lodz zoltowski',
+    'three terms': 'techno gdansk haos',
+    'one event': 'club night 42424',
+}
+
+
+def fill(session, tables, count):
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    start = date(2020, 1, 1)
+    rows = []
+    for i in range(count):
+        venue, city = rng.choice(VENUES)
+        rows.append({
+            'name': f'{rng.choice(NAMES)} {i}', 'date': start + timedelta(days=i % 3650), 'venue': venue,
+            'city': city, 'type': 'club', 'status': 'upcoming', 'created_at': now, 'updated_at': now,
+            'artists': ', '.join(rng.sample(ARTISTS, 3)),
+            'description': ' '.join(rng.choices(WORDS, k=30)),
+        })
+        if len(rows) == 10000:
+            session.execute(insert(tables.events), rows)
+            rows = []
+    if rows:
+        session.execute(insert(tables.events), rows)
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    url = os.environ.get('DATABASE_URL', f'sqlite:///{DB_PATH}')
+    engine = create_engine(url)
+    metadata = MetaData()
+    tables = define_tables(metadata)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    session = Session(engine)
+    started = time.perf_counter()
+    fill(session, tables, args.rows)
+    print(f'{args.rows} events indexed in {time.perf_counter() - started:.1f}s ({engine.dialect.name})\n')
+
+    repo = Repository(session, tables)
+    for label, query in QUERIES.items():
+        terms = search_terms(query)
+        timings = []
+        for _ in range(args.repeat):
+            t = time.perf_counter()
+            results = search_results(repo.search_events(terms, args.limit), terms)
+            timings.append(time.perf_counter() - t)
+        timings.sort()
+        print(f'  {label:<24} {query!r:<22} {len(results):>3} hits   '
+              f'p50 {statistics.median(timings) * 1000:>6.2f} ms   '
+              f'p95 {timings[int(len(timings) * 0.95) - 1] * 1000:>6.2f} ms')
+    session.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Load test: scripted traffic against the booking APIs over real HTTP
+
+    pip install aiosmtpd gunicorn
+    python benchmarks/load_test.py [--target backend api] [--mix browse book mixed]
+                                   [--concurrency 4 16] [--duration 20]
+                                   [--database sqlite postgresql://localhost/arch1tect_load]
+                                   [--output load-test.json]
+
+Every run starts from an empty database: the app is served by gunicorn in
+a subprocess (backend: `app:app` with backend/gunicorn.conf.py, api: the
+`create_app()` factory), seeded, and driven by --concurrency virtual users
+in a closed loop for --duration seconds after a short warm-up. Nothing
+leaves the machine - SMTP goes to an in-process aiosmtpd sink (STARTTLS +
+AUTH like the provider) and Twilio to a local stub HTTP server; --rtt adds
+a simulated round trip to both.
+
+Traffic mixes are weighted steps (browse events, check availability, book,
+approve); a step a target has no endpoint for is left out of its mix. With
+--seed the request sequence of every virtual user is the same from run to
+run. Throughput and p50/p95/p99 per endpoint go to --output as JSON, so
+two commits can be compared with the same arguments.
+
+The PostgreSQL URL must point at a scratch database - all its tables are
+dropped before every run.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, ROOT)
+
+import requests  # noqa: E402
+from aiosmtpd.controller import Controller  # noqa: E402
+from sqlalchemy import MetaData, create_engine  # noqa: E402
+
+from smtp_throughput import Sink, authenticate, free_port, start_latency_proxy, tls_context  # noqa: E402
+
+TWILIO_SID = 'AC' + '0' * 32
+SEED_EVENTS = 200
+FIRST_BOOKING_DAY = date.today() + timedelta(days=30)
+
+# Weighted steps - see STEPS for what each one requests on each target
+MIXES = {
+    'browse': {'events': 60, 'event': 30, 'availability': 10},
+    'book': {'availability': 30, 'book': 50, 'approve': 20},
+    'mixed': {'events': 45, 'event': 25, 'availability': 15, 'book': 10, 'approve': 5},
+}
+
+
+class TwilioStub(ThreadingHTTPServer):
+    """Answers Messages.json like the Twilio REST API and counts the messages"""
+    daemon_threads = True
+
+    def __init__(self, rtt=0.0):
+        super().__init__(('127.0.0.1', 0), TwilioHandler)
+        self.rtt = rtt
+        self.received = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class TwilioHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.server.rtt:
+            time.sleep(self.server.rtt)
+        with self.server.lock:
+            self.server.received += 1
+            sid = f'SM{self.server.received:032x}'
+        body = json.dumps({'sid': sid, 'status': 'queued', 'account_sid': TWILIO_SID}).encode()
+        self.send_response(201)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandIns:
+    """SMTP sink and Twilio stub shared by all runs"""
+
+    def __init__(self, rtt):
+        logging.getLogger('mail.log').setLevel(logging.ERROR)
+        self.smtp = Sink()
+        self.smtp_port = free_port()
+        self.controller = Controller(self.smtp, hostname='127.0.0.1', port=self.smtp_port,
+                                     tls_context=tls_context(tempfile.mkdtemp()), require_starttls=True,
+                                     authenticator=authenticate, auth_require_tls=True)
+        self.controller.start()
+        if rtt:
+            self.smtp_port = start_latency_proxy(self.smtp_port, rtt)
+        self.twilio = TwilioStub(rtt)
+        threading.Thread(target=self.twilio.serve_forever, daemon=True).start()
+
+    def env(self):
+        return {
+            'MAIL_SERVER': '127.0.0.1', 'MAIL_PORT': str(self.smtp_port), 'MAIL_USE_TLS': 'True',
+            'MAIL_USERNAME': 'resend', 'MAIL_PASSWORD': 'load-test',
+            'TWILIO_ACCOUNT_SID': TWILIO_SID, 'TWILIO_AUTH_TOKEN': 'load-test',
+            'TWILIO_PHONE_NUMBER': '+48500000000', 'TWILIO_API_URL': self.twilio.url,
+        }
+
+    def counts(self):
+        return {'smtp_messages': self.smtp.received, 'sms_messages': self.twilio.received}
+
+    def stop(self):
+        self.controller.stop()
+        self.twilio.shutdown()
+
+
+def reset_database(url):
+    """Empty scratch database at `url`"""
+    if url.startswith('sqlite:///'):
+        path = url[len('sqlite:///'):]
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    engine = create_engine(url)
+    metadata = MetaData()
+    metadata.reflect(engine)
+    metadata.drop_all(engine)
+    engine.dispose()
+
+
+def seed_api_database(url):
+    """Tables and the service catalog for the api package (it does not create them itself)"""
+    database_url = os.environ.get('DATABASE_URL')
+    os.environ['DATABASE_URL'] = url
+    try:
+        from api import create_app, db
+        from api.models import EventService
+        app = create_app('development')
+    finally:
+        if database_url is None:
+            del os.environ['DATABASE_URL']
+        else:
+            os.environ['DATABASE_URL'] = database_url
+    with app.app_context():
+        db.create_all()
+        db.session.add(EventService(name='DJ Set - Club', service_type='dj_set_club', base_price=1500))
+        db.session.commit()
+        db.engine.dispose()
+
+
+def seed_backend_events(base_url):
+    """Events to browse and book, created through the API like the admin panel does"""
+    with requests.Session() as session:
+        for i in range(SEED_EVENTS):
+            response = session.post(f'{base_url}/api/events', json={
+                'name': f'Club Night {i}', 'date': (date.today() + timedelta(days=i)).isoformat(),
+                'time': '22:00', 'venue': 'HAOS', 'city': 'Gdańsk', 'type': 'club',
+                'artists': 'ARCH1TECT', 'price': 60, 'capacity': 300,
+            })
+            response.raise_for_status()
+
+
+class Server:
+    """A target app served by gunicorn in a subprocess"""
+
+    COMMANDS = {
+        'backend': (os.path.join(ROOT, 'backend'), 'app:app', '/api/health'),
+        'api': (ROOT, 'api:create_app()', '/health'),
+    }
+
+    def __init__(self, target, database_url, env, workers, threads, log_path):
+        cwd, app, self.health = self.COMMANDS[target]
+        self.port = free_port()
+        self.base_url = f'http://127.0.0.1:{self.port}'
+        self.metrics_dir = tempfile.mkdtemp(prefix='arch1tect-load-metrics-')
+        self.log = open(log_path, 'a')
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', app, '--bind', f'127.0.0.1:{self.port}',
+             '--workers', str(workers), '--threads', str(threads), '--timeout', '120'],
+            cwd=cwd, stdout=self.log, stderr=subprocess.STDOUT,
+            env=dict(os.environ, **env, DATABASE_URL=database_url, LOG_LEVEL='WARNING',
+                     PROMETHEUS_MULTIPROC_DIR=self.metrics_dir),
+        )
+
+    def wait_ready(self, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f'server exited with {self.process.returncode}, see {self.log.name}')
+            try:
+                if requests.get(self.base_url + self.health, timeout=5).ok:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f'server not ready after {timeout}s, see {self.log.name}')
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+        shutil.rmtree(self.metrics_dir, ignore_errors=True)
+
+
+class Traffic:
+    """State shared by the virtual users of one run"""
+
+    def __init__(self, target, base_url):
+        self.target = target
+        self.base_url = base_url
+        self.event_ids = list(range(1, SEED_EVENTS + 1))
+        self.pending = deque()  # bookings waiting for approval
+        self.days = itertools.count()  # every booking gets its own date
+
+    def next_day(self):
+        return (FIRST_BOOKING_DAY + timedelta(days=next(self.days))).isoformat()
+
+
+def backend_events(session, traffic, rng):
+    return 'GET /api/events', session.get(f'{traffic.base_url}/api/events')
+
+
+def backend_event(session, traffic, rng):
+    event_id = rng.choice(traffic.event_ids)
+    return 'GET /api/events/{id}', session.get(f'{traffic.base_url}/api/events/{event_id}')
+
+
+def events_on(session, traffic, day):
+    return session.get(f'{traffic.base_url}/api/events', params={'from': day, 'to': day})
+
+
+def backend_availability(session, traffic, rng):
+    day = (date.today() + timedelta(days=rng.randrange(SEED_EVENTS))).isoformat()
+    return 'GET /api/events?from=&to=', events_on(session, traffic, day)
+
+
+def check_backend_filters(traffic):
+    """Stop before the run if the availability step would not be a one-day query"""
+    day = date.today().isoformat()
+    with requests.Session() as session:
+        response = events_on(session, traffic, day)
+    response.raise_for_status()
+    dates = [event['date'] for event in response.json()]
+    if dates != [day]:
+        raise RuntimeError(f'GET /api/events?from={day}&to={day} returned dates {dates[:5]}, expected [{day!r}]')
+
+
+def backend_book(session, traffic, rng):
+    event_id = rng.choice(traffic.event_ids)
+    response = session.post(f'{traffic.base_url}/api/bookings', json={
+        'event_id': event_id, 'name': 'Load Test', 'email': f'guest{rng.randrange(10**6)}@example.com',
+        'phone': '+48500100200', 'event_date': traffic.next_day(), 'start_time': '22:00',
+        'venue': 'HAOS', 'city': 'Gdańsk', 'guests': 2,
+    })
+    if response.status_code == 201:
+        traffic.pending.append(response.json()['id'])
+    return 'POST /api/bookings', response
+
+
+def backend_approve(session, traffic, rng):
+    try:
+        booking_id = traffic.pending.popleft()
+    except IndexError:
+        return backend_book(session, traffic, rng)
+    return 'POST /api/bookings/{id}/approve', session.post(f'{traffic.base_url}/api/bookings/{booking_id}/approve')
+
+
+def api_events(session, traffic, rng):
+    return 'GET /api/services', session.get(f'{traffic.base_url}/api/services')
+
+
+def api_event(session, traffic, rng):
+    return 'GET /api/bookings?datesOnly=true', \
+        session.get(f'{traffic.base_url}/api/bookings', params={'datesOnly': 'true'})
+
+
+def api_availability(session, traffic, rng):
+    day = FIRST_BOOKING_DAY + timedelta(days=rng.randrange(365))
+    if rng.random() < 0.5:
+        return 'GET /api/availability', session.get(f'{traffic.base_url}/api/availability',
+                                                    params={'year': day.year, 'month': day.month})
+    return 'POST /api/check-availability', \
+        session.post(f'{traffic.base_url}/api/check-availability', json={'date': day.isoformat()})
+
+
+def api_book(session, traffic, rng):
+    return 'POST /api/book-event', session.post(f'{traffic.base_url}/api/book-event', json={
+        'name': 'Load Test', 'email': f'guest{rng.randrange(10**6)}@example.com', 'phone': '+48500100200',
+        'event_type': 'club', 'event_date': traffic.next_day(), 'event_time': '22:00',
+        'venue_name': 'HAOS', 'service': 'DJ Set - Club',
+    })
+
+
+# step -> target -> request; the api package has no events or approval endpoints,
+# its 'events'/'event' steps browse the service catalog and the public calendar
+STEPS = {
+    'events': {'backend': backend_events, 'api': api_events},
+    'event': {'backend': backend_event, 'api': api_event},
+    'availability': {'backend': backend_availability, 'api': api_availability},
+    'book': {'backend': backend_book, 'api': api_book},
+    'approve': {'backend': backend_approve},
+}
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(seconds for seconds, ok in samples)
+    errors = sum(1 for seconds, ok in samples if not ok)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'throughput': round(len(samples) / elapsed, 2),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+        **{f'p{q}_ms': round(percentile(latencies, q) * 1000, 2) for q in (50, 95, 99)},
+        'max_ms': round(latencies[-1] * 1000, 2),
+    }
+
+
+def drive(traffic, mix, concurrency, duration, warmup, seed):
+    """Run the virtual users; returns {endpoint: [(seconds, ok)]} for the measured window"""
+    steps = [(STEPS[step][traffic.target], weight) for step, weight in MIXES[mix].items()
+             if traffic.target in STEPS[step]]
+    requests_, weights = zip(*steps)
+    started = time.monotonic()
+    measure_from, stop_at = started + warmup, started + warmup + duration
+    results = defaultdict(list)
+    lock = threading.Lock()
+
+    def user(index):
+        rng = random.Random(seed * 1000 + index)
+        samples = []
+        with requests.Session() as session:
+            while True:
+                now = time.monotonic()
+                if now >= stop_at:
+                    break
+                step = rng.choices(requests_, weights)[0]
+                t = time.perf_counter()
+                try:
+                    endpoint, response = step(session, traffic, rng)
+                    ok = response.status_code < 400
+                except requests.RequestException:
+                    endpoint, ok = step.__name__, False
+                if now >= measure_from:
+                    samples.append((endpoint, time.perf_counter() - t, ok))
+        with lock:
+            for endpoint, seconds, ok in samples:
+                results[endpoint].append((seconds, ok))
+
+    users = [threading.Thread(target=user, args=(i,)) for i in range(concurrency)]
+    for thread in users:
+        thread.start()
+    for thread in users:
+        thread.join()
+    return results
+
+
+def run(target, database, mix, concurrency, args, stand_ins, log_path):
+    url = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'arch1tect_load_test.db')}" \
+        if database == 'sqlite' else database
+    reset_database(url)
+    if target == 'api':
+        seed_api_database(url)
+    server = Server(target, url, stand_ins.env(), args.workers, args.threads, log_path)
+    try:
+        server.wait_ready()
+        traffic = Traffic(target, server.base_url)
+        if target == 'backend':
+            seed_backend_events(server.base_url)
+            check_backend_filters(traffic)
+        before = stand_ins.counts()
+        results = drive(traffic, mix, concurrency, args.duration, args.warmup, args.seed)
+        time.sleep(args.drain)  # let the outbox worker hand the last notifications to the stand-ins
+        after = stand_ins.counts()
+    finally:
+        server.stop()
+
+    everything = [sample for samples in results.values() for sample in samples]
+    return {
+        'target': target,
+        'database': 'sqlite' if database == 'sqlite' else url.split('://', 1)[0],
+        'mix': mix,
+        'concurrency': concurrency,
+        'duration_s': args.duration,
+        'total': summarize(everything, args.duration) if everything else None,
+        'endpoints': {endpoint: summarize(samples, args.duration) for endpoint, samples in sorted(results.items())},
+        **{key: after[key] - before[key] for key in after},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_run(result):
+    print(f"\n{result['target']} / {result['database']} / {result['mix']} / {result['concurrency']} users"
+          f"  (smtp {result['smtp_messages']}, sms {result['sms_messages']})")
+    rows = list(result['endpoints'].items()) + ([('total', result['total'])] if result['total'] else [])
+    for endpoint, stats in rows:
+        print(f"  {endpoint:<38} {stats['throughput']:>8.1f} /s  p50 {stats['p50_ms']:>7.1f}  "
+              f"p95 {stats['p95_ms']:>7.1f}  p99 {stats['p99_ms']:>7.1f} ms  errors {stats['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--target', nargs='+', choices=['backend', 'api'], default=['backend', 'api'])
+    parser.add_argument('--database', nargs='+', default=['sqlite'],
+                        help="'sqlite' or a PostgreSQL URL of a scratch database")
+    parser.add_argument('--mix', nargs='+', choices=sorted(MIXES), default=['mixed'])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8])
+    parser.add_argument('--duration', type=float, default=20, help='measured seconds per run')
+    parser.add_argument('--warmup', type=float, default=3, help='unmeasured seconds before each run')
+    parser.add_argument('--drain', type=float, default=2, help='seconds to wait for queued notifications')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers (as in the Procfile)')
+    parser.add_argument('--threads', type=int, default=1, help='gunicorn threads per worker')
+    parser.add_argument('--rtt', type=float, default=0.0, help='simulated SMTP/Twilio round trip in seconds')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='load-test.json')
+    args = parser.parse_args()
+
+    stand_ins = StandIns(args.rtt)
+    log_path = os.path.splitext(args.output)[0] + '.server.log'
+    report = {
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'settings': {key: value for key, value in vars(args).items()
+                     if key not in ('database', 'output')},
+        'runs': [],
+    }
+    try:
+        for target, database, mix, concurrency in itertools.product(
+                args.target, args.database, args.mix, args.concurrency):
+            result = run(target, database, mix, concurrency, args, stand_ins, log_path)
+            report['runs'].append(result)
+            print_run(result)
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+    finally:
+        stand_ins.stop()
+    print(f'\nresults: {args.output}, server output: {log_path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: what a log line costs the request thread
+
+    python benchmarks/logging_overhead.py [--lines 20000] [--write-delay-us 0 200]
+
+Compares print(), a synchronous JSON StreamHandler and the queue-based
+handler from structured_logging.py. --write-delay-us makes every write to
+the output stall (a slow log collector / full pipe); only the time spent
+in the calling thread is measured.
+"""
+import argparse
+import contextlib
+import logging
+import os
+import queue
+import sys
+import time
+from logging.handlers import QueueListener
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from structured_logging import BackgroundQueueHandler, JSONFormatter, RequestIdFilter  # noqa: E402
+
+
+class SlowSink:
+    """File-like object whose writes take `delay` seconds"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def write(self, text):
+        if self.delay:
+            time.sleep(self.delay)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def logger_with(handler):
+    logger = logging.getLogger(f'bench.{id(handler)}')
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def run_print(sink, lines):
+    started = time.perf_counter()
+    for i in range(lines):
+        print(f'booking created: id={i} email=anna@example.com', file=sink)
+    return time.perf_counter() - started
+
+
+def run_sync(sink, lines):
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(JSONFormatter())
+    handler.addFilter(RequestIdFilter())
+    log = logger_with(handler)
+    started = time.perf_counter()
+    for i in range(lines):
+        log.info('booking created', extra={'booking_id': i, 'email': 'anna@example.com'})
+    return time.perf_counter() - started
+
+
+def run_queued(sink, lines):
+    records = queue.SimpleQueue()
+    output = logging.StreamHandler(sink)
+    output.setFormatter(JSONFormatter())
+    listener = QueueListener(records, output)
+    handler = BackgroundQueueHandler(records)
+    handler.addFilter(RequestIdFilter())
+    log = logger_with(handler)
+    listener.start()
+    try:
+        started = time.perf_counter()
+        for i in range(lines):
+            log.info('booking created', extra={'booking_id': i, 'email': 'anna@example.com'})
+        return time.perf_counter() - started
+    finally:
+        with contextlib.suppress(Exception):
+            listener.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=20000)
+    parser.add_argument('--write-delay-us', type=int, nargs='+', default=[0, 200])
+    args = parser.parse_args()
+
+    print(f'{"write delay":>12} {"print":>12} {"sync JSON":>12} {"queued JSON":>12}   (µs per line, calling thread)')
+    for delay in args.write_delay_us:
+        lines = args.lines if not delay else min(args.lines, 2000)
+        sink = SlowSink(delay / 1e6)
+        timings = [runner(sink, lines) / lines * 1e6 for runner in (run_print, run_sync, run_queued)]
+        print(f'{delay:>10}µs ' + ' '.join(f'{t:>12.2f}' for t in timings))
+
+
+if __name__ == '__main__':
+    main()
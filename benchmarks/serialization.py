@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: events list serialization, ORM to_dict() vs column projection
+
+    python benchmarks/serialization.py [--rows 10000 100000] [--repeat 3]
+
+Fills a scratch SQLite database and reports rows/sec for encoding the whole
+table with each path (best of --repeat runs).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+DB_PATH = os.path.join(tempfile.gettempdir(), 'arch1tect_bench_serialization.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+
+from sqlalchemy import insert, select  # noqa: E402
+from flask import jsonify  # noqa: E402
+import fast_json  # noqa: E402
+from app import app, db, Event, EVENT_FIELDS, EVENT_FORMATTERS, columns  # noqa: E402
+
+
+def fill(count):
+    db.drop_all()
+    db.create_all()
+    start = date(2026, 1, 1)
+    now = datetime.utcnow()
+    rows = [{
+        'name': f'Club Night {i}',
+        'date': start + timedelta(days=i % 365),
+        'time': dtime(22, 0),
+        'venue': 'HAOS',
+        'city': 'Gdańsk',
+        'type': 'club',
+        'description': 'Techno all night long',
+        'artists': 'ARCH1TECT, Guest',
+        'price': 60.0,
+        'capacity': 300,
+        'status': 'upcoming',
+        'created_at': now,
+        'updated_at': now,
+    } for i in range(count)]
+    db.session.execute(insert(Event), rows)
+    db.session.commit()
+
+
+def orm_path():
+    events = Event.query.order_by(Event.date.desc(), Event.id.desc()).all()
+    return jsonify([event.to_dict() for event in events]).get_data()
+
+
+def projected_path():
+    rows = db.session.execute(
+        select(*columns(Event, EVENT_FIELDS)).order_by(Event.date.desc(), Event.id.desc())
+    ).all()
+    return fast_json.encode_rows(EVENT_FIELDS, rows, EVENT_FORMATTERS)
+
+
+def measure(fn, count, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    orjson = fast_json.orjson
+    paths = [('orm + to_dict + jsonify', orm_path, orjson)]
+    if orjson is not None:
+        paths.append(('projection + orjson', projected_path, orjson))
+    paths.append(('projection + json', projected_path, None))
+
+    with app.app_context():
+        for count in args.rows:
+            fill(count)
+            print(f"\n{count:,} rows")
+            baseline = None
+            for label, fn, encoder in paths:
+                fast_json.orjson = encoder
+                rate = measure(fn, count, args.repeat)
+                baseline = baseline or rate
+                print(f"  {label:<26} {rate:>12,.0f} rows/s  ({rate / baseline:.1f}x)")
+            fast_json.orjson = orjson
+
+    os.remove(DB_PATH)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Flask-Mail mail.send() vs the pooled SMTP transport (smtp_pool)
+
+    pip install aiosmtpd
+    python benchmarks/smtp_throughput.py [--messages 200] [--rtt 0.02] [--plain]
+
+Runs an in-process aiosmtpd sink that requires STARTTLS and AUTH like the
+real provider (throwaway certificate made with the openssl CLI; --plain
+skips both) and, with --rtt, a proxy in front of it that delays every
+packet by half the round-trip time to approximate the distance to the
+provider. Reports messages/sec for single messages and latency per
+booking (customer + admin email, as in api/config/email.py).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from aiosmtpd.controller import Controller  # noqa: E402
+from aiosmtpd.smtp import AuthResult  # noqa: E402
+from flask import Flask  # noqa: E402
+from flask_mail import Mail, Message  # noqa: E402
+from smtp_pool import SMTPPool  # noqa: E402
+
+
+class Sink:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return '250 OK'
+
+
+def authenticate(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=True)
+
+
+def tls_context(directory):
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-subj', '/CN=localhost',
+                    '-days', '1', '-keyout', key, '-out', cert], check=True, capture_output=True)
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def start_latency_proxy(upstream_port, rtt):
+    """TCP proxy delaying each chunk by rtt/2 in each direction; returns its port"""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    port = []
+
+    async def pipe(reader, writer):
+        try:
+            while data := await reader.read(65536):
+                await asyncio.sleep(rtt / 2)
+                writer.write(data)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle(client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection('127.0.0.1', upstream_port)
+        await asyncio.gather(pipe(client_reader, upstream_writer), pipe(upstream_reader, client_writer),
+                             return_exceptions=True)
+
+    async def serve():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port.append(server.sockets[0].getsockname()[1])
+        ready.set()
+        await server.serve_forever()
+
+    threading.Thread(target=lambda: loop.run_until_complete(serve()), daemon=True).start()
+    ready.wait()
+    return port[0]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def message(i):
+    return Message(subject=f'Potwierdzenie rezerwacji #{i}', recipients=[f'guest{i}@example.com'],
+                   html='\n'.join(['<p>ARCH1TECT | HAOS.fm - szczegóły rezerwacji</p>'] * 80))
+
+
+def run(label, count, fn):
+    latencies = []
+    started = time.perf_counter()
+    for i in range(count):
+        t = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<34} {count / elapsed:>8.1f} /s   "
+          f"p50 {statistics.median(latencies) * 1000:>7.1f} ms")
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--rtt', type=float, default=0.0, help='simulated round trip in seconds')
+    parser.add_argument('--plain', action='store_true', help='no STARTTLS/AUTH')
+    args = parser.parse_args()
+
+    logging.getLogger('mail.log').setLevel(logging.ERROR)  # aiosmtpd's per-login deprecation notice
+    sink = Sink()
+    port = free_port()
+    secure = {}
+    if not args.plain:
+        secure = dict(tls_context=tls_context(tempfile.mkdtemp()), require_starttls=True,
+                      authenticator=authenticate, auth_require_tls=True)
+    controller = Controller(sink, hostname='127.0.0.1', port=port, **secure)
+    controller.start()
+    if args.rtt:
+        port = start_latency_proxy(port, args.rtt)
+
+    app = Flask(__name__)
+    app.config.update(MAIL_SERVER='127.0.0.1', MAIL_PORT=port, MAIL_USE_TLS=not args.plain,
+                      MAIL_USERNAME='resend', MAIL_PASSWORD='benchmark' if not args.plain else None,
+                      MAIL_DEFAULT_SENDER='booking@arch1tect.pl')
+    mail = Mail(app)
+    pool = SMTPPool()
+
+    print(f"\n{args.messages} messages, simulated RTT {args.rtt * 1000:.0f} ms, "
+          f"{'plain' if args.plain else 'STARTTLS + AUTH'}")
+    with app.app_context():
+        run('mail.send()', args.messages, lambda i: mail.send(message(i)))
+        run('SMTPPool.send()', args.messages, lambda i: pool.send(message(i)))
+
+        bookings = max(1, args.messages // 2)
+        print(f"\n{bookings} bookings (customer + admin email)")
+        before = run('mail.send() x2', bookings, lambda i: (mail.send(message(i)), mail.send(message(i))))
+        after = run('SMTPPool.send(customer, admin)', bookings, lambda i: pool.send(message(i), message(i)))
+        print(f"\n  per-booking latency: {before * 1000:.1f} ms -> {after * 1000:.1f} ms "
+              f"({before / after:.1f}x), pool {pool.stats()}")
+        pool.close()
+
+    controller.stop()
+    print(f"  sink received {sink.received} messages")
+
+
+if __name__ == '__main__':
+    main()
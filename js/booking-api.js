@@ -50,15 +50,10 @@ document.getElementById('bookingForm')?.addEventListener('submit', async functio
 // Load upcoming events for the schedule section
 async function loadUpcomingEvents() {
     try {
-        const response = await fetch(`${API_URL}/events`);
-        const events = await response.json();
-        
-        // Filter upcoming events
-        const now = new Date();
-        const upcomingEvents = events
-            .filter(event => new Date(event.date) >= now && event.status === 'upcoming')
-            .sort((a, b) => new Date(a.date) - new Date(b.date))
-            .slice(0, 5); // Get next 5 events
+        // Next 5 upcoming events - filtered and sorted by the API
+        const today = new Date().toISOString().slice(0, 10);
+        const response = await fetch(`${API_URL}/events?status=upcoming&from=${today}&order=asc&limit=5`);
+        const upcomingEvents = await response.json();
         
         // Render events in the schedule section if it exists
         const scheduleContainer = document.querySelector('.timeline');
@@ -1,16 +1,30 @@
 """
 Events API with PostgreSQL/SQLAlchemy
 Supports both local development and Vercel deployment
+
+Tables and queries come from backend/repository.py, shared with the other
+entry points, so this service has to be deployed from the repository root
+(railway.json / nixpacks.toml here are written for that).
 """
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_mail import Mail, Message
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
 import os
+import sys
 from jinja2 import Template
 from dotenv import load_dotenv
 
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+if not os.path.exists(os.path.join(BACKEND_DIR, 'repository.py')):
+    raise RuntimeError(f'Shared modules not found in {BACKEND_DIR} - deploy railway-backend with the '
+                       'repository root as the service root (see backend/README.md, Railway Deployment)')
+sys.path.insert(0, BACKEND_DIR)
+from repository import (
+    Repository, define_tables, event_dict, booking_dict, event_values, booking_values, format_time,
+    search_args, search_results, artist_dict,
+)
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -42,94 +56,19 @@ app.config['MAIL_DEFAULT_SENDER'] = ('ARCH1TECT | HAOS.fm', sender_email)
 db = SQLAlchemy(app)
 mail = Mail(app)
 
-# Models
+# Models - the tables are shared with the other entry points (repository.py)
+tables = define_tables(db.metadata)
+
 class Event(db.Model):
-    __tablename__ = 'events'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(255), nullable=False)
-    date = db.Column(db.String(50), nullable=False)
-    time = db.Column(db.String(50))
-    venue = db.Column(db.String(255), nullable=False)
-    city = db.Column(db.String(100))
-    type = db.Column(db.String(50), default='club')
-    description = db.Column(db.Text)
-    artists = db.Column(db.Text)
-    price = db.Column(db.Float)
-    capacity = db.Column(db.Integer)
-    image_url = db.Column(db.Text)
-    status = db.Column(db.String(50), default='upcoming')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'date': self.date,
-            'time': self.time,
-            'venue': self.venue,
-            'city': self.city,
-            'type': self.type,
-            'description': self.description,
-            'artists': self.artists,
-            'price': self.price,
-            'capacity': self.capacity,
-            'image_url': self.image_url,
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    __table__ = tables.events
+    to_dict = event_dict
 
 class Booking(db.Model):
-    __tablename__ = 'bookings'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    event_id = db.Column(db.Integer, db.ForeignKey('events.id'))
-    name = db.Column(db.String(255), nullable=False)
-    email = db.Column(db.String(255), nullable=False)
-    phone = db.Column(db.String(50))
-    event_date = db.Column(db.String(50))
-    event_type = db.Column(db.String(50))
-    start_time = db.Column(db.String(50))
-    duration = db.Column(db.Integer)
-    venue = db.Column(db.String(255))
-    city = db.Column(db.String(100))
-    guests = db.Column(db.Integer)
-    message = db.Column(db.Text)
-    status = db.Column(db.String(50), default='pending')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    # Calendar integration fields (like san-bud)
-    calendar_event_sent = db.Column(db.Boolean, default=False)
-    calendar_platforms = db.Column(db.String(255))  # "Google,Apple,Outlook,Office365"
-    event_title = db.Column(db.String(255))
-    event_location = db.Column(db.String(500))
-    
+    __table__ = tables.bookings
     event = db.relationship('Event', backref='bookings')
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'event_id': self.event_id,
-            'name': self.name,
-            'email': self.email,
-            'phone': self.phone,
-            'event_date': self.event_date,
-            'event_type': self.event_type,
-            'start_time': self.start_time,
-            'duration': self.duration,
-            'venue': self.venue,
-            'city': self.city,
-            'guests': self.guests,
-            'message': self.message,
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'calendar_event_sent': self.calendar_event_sent,
-            'calendar_platforms': self.calendar_platforms,
-            'event_title': self.event_title,
-            'event_location': self.event_location
-        }
+    to_dict = booking_dict
+
+repo = Repository(db.session, tables)
 
 # Initialize database
 def init_db():
@@ -142,8 +81,21 @@ def init_db():
 def get_events():
     """Get all events"""
     try:
-        events = Event.query.order_by(Event.date.desc()).all()
-        return jsonify([event.to_dict() for event in events])
+        events, _ = repo.events_page()
+        return jsonify([event_dict(event) for event in events])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/events/search', methods=['GET'])
+def search_events():
+    """Full-text search over event name, artists, venue, city and description (q, limit)"""
+    try:
+        args = search_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        return jsonify(search_results(repo.search_events(**args), args['terms']))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -151,36 +103,44 @@ def get_events():
 def get_event(event_id):
     """Get single event"""
     try:
-        event = Event.query.get_or_404(event_id)
-        return jsonify(event.to_dict())
+        event = repo.get_event(event_id)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    if event is None:
+        return jsonify({'error': 'Event not found'}), 404
+    return jsonify(event_dict(event))
+
+@app.route('/api/artists', methods=['GET'])
+def get_artists():
+    """Artists with their number of events, busiest first"""
+    try:
+        return jsonify([artist_dict(artist) for artist in repo.list_artists()])
     except Exception as e:
-        return jsonify({'error': str(e)}), 404
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/artists/<slug>/events', methods=['GET'])
+def get_artist_events(slug):
+    """An artist and their events, newest first"""
+    try:
+        artist, events = repo.artist_events(slug)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    if artist is None:
+        return jsonify({'error': 'Artist not found'}), 404
+    return jsonify({'artist': {'name': artist.name, 'slug': artist.slug},
+                    'events': [event_dict(event) for event in events]})
 
 @app.route('/api/events', methods=['POST'])
 def create_event():
     """Create new event"""
     try:
-        data = request.get_json()
-        
-        event = Event(
-            name=data.get('name'),
-            date=data.get('date'),
-            time=data.get('time'),
-            venue=data.get('venue'),
-            city=data.get('city'),
-            type=data.get('type', 'club'),
-            description=data.get('description'),
-            artists=data.get('artists'),
-            price=data.get('price'),
-            capacity=data.get('capacity'),
-            image_url=data.get('image_url'),
-            status=data.get('status', 'upcoming')
-        )
-        
-        db.session.add(event)
+        event = repo.create_event(event_values(request.get_json()))
         db.session.commit()
         
-        return jsonify(event.to_dict()), 201
+        return jsonify(event_dict(event)), 201
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -189,19 +149,16 @@ def create_event():
 def update_event(event_id):
     """Update event"""
     try:
-        event = Event.query.get_or_404(event_id)
-        data = request.get_json()
-        
-        # Update fields
-        for key in ['name', 'date', 'time', 'venue', 'city', 'type', 'description', 
-                    'artists', 'price', 'capacity', 'image_url', 'status']:
-            if key in data:
-                setattr(event, key, data[key])
-        
-        event.updated_at = datetime.utcnow()
+        event = repo.update_event(event_id, event_values(request.get_json(), partial=True))
+        if event is None:
+            db.session.rollback()
+            return jsonify({'error': 'Event not found'}), 404
         db.session.commit()
         
-        return jsonify(event.to_dict())
+        return jsonify(event_dict(event))
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -210,8 +167,8 @@ def update_event(event_id):
 def delete_event(event_id):
     """Delete event"""
     try:
-        event = Event.query.get_or_404(event_id)
-        db.session.delete(event)
+        if not repo.delete_event(event_id):
+            return jsonify({'error': 'Event not found'}), 404
         db.session.commit()
         
         return jsonify({'message': 'Event deleted successfully'})
@@ -224,8 +181,7 @@ def delete_event(event_id):
 def get_bookings():
     """Get all bookings"""
     try:
-        bookings = Booking.query.order_by(Booking.created_at.desc()).all()
-        return jsonify([booking.to_dict() for booking in bookings])
+        return jsonify([booking_dict(booking) for booking in repo.list_bookings()])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -233,34 +189,7 @@ def get_bookings():
 def create_booking():
     """Create new booking"""
     try:
-        data = request.get_json()
-        
-        # Generate calendar event data
-        event_title = f"ARCH1TECT @ {data.get('venue', 'Club HAOS')}"
-        event_location = f"{data.get('venue', 'Club HAOS')}, {data.get('city', 'Gdańsk')}"
-        calendar_platforms = "Google Calendar,Apple Calendar,Outlook,Office 365"
-        
-        booking = Booking(
-            event_id=data.get('event_id'),
-            name=data.get('name'),
-            email=data.get('email'),
-            phone=data.get('phone'),
-            event_date=data.get('event_date'),
-            event_type=data.get('event_type'),
-            start_time=data.get('start_time'),
-            duration=data.get('duration', 240),  # Default 4 hours for club events
-            venue=data.get('venue'),
-            city=data.get('city'),
-            guests=data.get('guests'),
-            message=data.get('message'),
-            status='pending',
-            calendar_event_sent=True,  # We provide calendar integration
-            calendar_platforms=calendar_platforms,
-            event_title=event_title,
-            event_location=event_location
-        )
-        
-        db.session.add(booking)
+        booking = repo.create_booking(booking_values(request.get_json()))
         db.session.commit()
         
         print(f"🚀 [BOOKING] Booking created with ID: {booking.id}")
@@ -275,7 +204,10 @@ def create_booking():
             import traceback
             traceback.print_exc()
         
-        return jsonify(booking.to_dict()), 201
+        return jsonify(booking_dict(booking)), 201
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -284,8 +216,9 @@ def create_booking():
 def approve_booking(booking_id):
     """Approve booking"""
     try:
-        booking = Booking.query.get_or_404(booking_id)
-        booking.status = 'approved'
+        booking = repo.set_booking_status(booking_id, 'approved')
+        if booking is None:
+            return jsonify({'error': 'Booking not found'}), 404
         db.session.commit()
         
         # Send approval email
@@ -294,7 +227,7 @@ def approve_booking(booking_id):
         except Exception as email_error:
             print(f"Email error: {email_error}")
         
-        return jsonify(booking.to_dict())
+        return jsonify(booking_dict(booking))
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -303,11 +236,12 @@ def approve_booking(booking_id):
 def reject_booking(booking_id):
     """Reject booking"""
     try:
-        booking = Booking.query.get_or_404(booking_id)
-        booking.status = 'rejected'
+        booking = repo.set_booking_status(booking_id, 'rejected')
+        if booking is None:
+            return jsonify({'error': 'Booking not found'}), 404
         db.session.commit()
         
-        return jsonify(booking.to_dict())
+        return jsonify(booking_dict(booking))
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -318,17 +252,9 @@ def generate_calendar_urls(booking):
     from urllib.parse import quote
     from datetime import datetime, timedelta
     
-    # Parse date and time
+    # Combine date and time
     try:
-        event_date_parts = booking.event_date.split('-')
-        time_parts = booking.start_time.split(':')
-        start_dt = datetime(
-            int(event_date_parts[0]), 
-            int(event_date_parts[1]), 
-            int(event_date_parts[2]),
-            int(time_parts[0]), 
-            int(time_parts[1])
-        )
+        start_dt = datetime.combine(booking.event_date, booking.start_time)
         
         # Calculate end time (duration in minutes, default 4 hours)
         duration_minutes = booking.duration or 240
@@ -384,7 +310,7 @@ def send_booking_confirmation(booking_id):
     """Send booking confirmation email with calendar integration"""
     print(f"🔍 [EMAIL] Starting send_booking_confirmation for booking_id: {booking_id}")
     
-    booking = Booking.query.get(booking_id)
+    booking = repo.get_booking(booking_id)
     if not booking:
         print(f"❌ [EMAIL] Booking {booking_id} not found!")
         return
@@ -442,7 +368,7 @@ def send_booking_confirmation(booking_id):
                         {% if duration %}
                         <tr>
                             <td style="padding: 8px 0;"><strong>Czas trwania:</strong></td>
-                            <td>{{ duration }} godzin</td>
+                            <td>{{ '%g'|format(duration / 60) }} godz.</td>
                         </tr>
                         {% endif %}
                     </table>
@@ -508,7 +434,7 @@ def send_booking_confirmation(booking_id):
     html_content = template.render(
         name=booking.name,
         event_date=booking.event_date,
-        start_time=booking.start_time,
+        start_time=format_time(booking.start_time),
         venue=booking.venue,
         city=booking.city,
         event_type=booking.event_type,
@@ -543,7 +469,7 @@ def send_booking_confirmation(booking_id):
 
 def send_booking_approval(booking_id):
     """Send booking approval email"""
-    booking = Booking.query.get(booking_id)
+    booking = repo.get_booking(booking_id)
     if not booking:
         return
     
@@ -609,7 +535,7 @@ def send_booking_approval(booking_id):
     html_content = template.render(
         name=booking.name,
         event_date=booking.event_date,
-        start_time=booking.start_time,
+        start_time=format_time(booking.start_time),
         venue=booking.venue,
         city=booking.city
     )
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Tests for the normalized artist index (backend/artist_index.py, Repository.artist_events)"""
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.orm import Session
+
+from artist_index import parse_artists, slugify
+from event_import import EventImporter
+from repository import Repository, artist_dict, define_tables, event_values
+
+
+def make_repo():
+    engine = create_engine('sqlite://')
+    metadata = MetaData()
+    tables = define_tables(metadata)
+    metadata.create_all(engine)
+    return Repository(Session(engine), tables)
+
+
+def add(repo, name, artists, date='2026-05-01'):
+    return repo.create_event(event_values({'name': name, 'date': date, 'venue': 'HAOS', 'artists': artists})).id
+
+
+def lineup(repo, slug):
+    artist, rows = repo.artist_events(slug)
+    return artist and [row.name for row in rows]
+
+
+def query_plan(repo, statement, *params):
+    sql = str(statement.compile(repo.session.get_bind()))
+    return ' | '.join(row[-1] for row in repo.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}', params))
+
+
+def test_parse_artists():
+    """Line-ups split on the usual separators, Polish names get ASCII slugs"""
+    assert slugify('Łukasz Żółtowski') == 'lukasz-zoltowski'
+    assert slugify('  DJ  Gość!! ') == 'dj-gosc'
+    assert parse_artists('ARCH1TECT b2b Łukasz Żółtowski, Kasia Wrona & Ben Klock / Guest') == [
+        ('arch1tect', 'ARCH1TECT'), ('lukasz-zoltowski', 'Łukasz Żółtowski'),
+        ('kasia-wrona', 'Kasia Wrona'), ('ben-klock', 'Ben Klock'), ('guest', 'Guest'),
+    ]
+    assert parse_artists('Nina Kraviz feat. Amelie Lens vs NINA KRAVIZ\n+ Bartek Ślązak') == [
+        ('nina-kraviz', 'Nina Kraviz'), ('amelie-lens', 'Amelie Lens'), ('bartek-slazak', 'Bartek Ślązak'),
+    ]
+    assert parse_artists('Blawan') == [('blawan', 'Blawan')]  # 'b2b' only as a whole word
+    assert parse_artists(None) == parse_artists(' , ; ') == []
+
+
+def test_links_follow_writes():
+    """Create, update and delete keep event_artists current; slugs are shared"""
+    repo = make_repo()
+    first = add(repo, 'Techno Night', 'ARCH1TECT b2b Łukasz Żółtowski', '2026-03-14')
+    second = add(repo, 'Day Rave', 'arch1tect', '2026-04-01')
+    assert lineup(repo, 'arch1tect') == ['Day Rave', 'Techno Night']
+    assert lineup(repo, 'lukasz-zoltowski') == ['Techno Night']
+
+    repo.update_event(first, {'name': 'Techno Night XL'})  # line-up untouched
+    assert lineup(repo, 'lukasz-zoltowski') == ['Techno Night XL']
+    repo.update_event(first, {'artists': 'Kasia Wrona'})
+    assert lineup(repo, 'lukasz-zoltowski') == []
+    assert lineup(repo, 'arch1tect') == ['Day Rave']
+    assert lineup(repo, 'kasia-wrona') == ['Techno Night XL']
+
+    assert repo.delete_event(second)
+    assert lineup(repo, 'arch1tect') == []
+    assert repo.artist_events('nobody') == (None, [])
+    assert [artist_dict(row) for row in repo.list_artists()] == [
+        {'name': 'Kasia Wrona', 'slug': 'kasia-wrona', 'events': 1},
+    ]
+
+
+def test_bulk_import_links():
+    """The importer links inserted events and relinks updated ones only when artists change"""
+    repo = make_repo()
+    importer = EventImporter(repo.session, SimpleNamespace(__table__=repo.events), batch_size=2)
+    rows = [
+        {'name': f'Club Night {i}', 'date': f'2026-06-0{i}', 'venue': 'HAOS', 'artists': f'ARCH1TECT, Guest {i}'}
+        for i in range(1, 6)
+    ]
+    report = importer.run(enumerate(rows, 1))
+    assert report['inserted'] == 5
+    assert len(lineup(repo, 'arch1tect')) == 5
+    assert lineup(repo, 'guest-3') == ['Club Night 3']
+
+    rows[0]['artists'] = 'Ben Klock'
+    rows[1]['description'] = 'Nowy opis'
+    report = importer.run(enumerate(rows, 1))
+    assert (report['updated'], report['unchanged']) == (2, 3)
+    assert lineup(repo, 'ben-klock') == ['Club Night 1']
+    assert len(lineup(repo, 'arch1tect')) == 4
+    assert lineup(repo, 'guest-2') == ['Club Night 2']
+
+    listing = [artist_dict(row) for row in repo.list_artists()]
+    assert listing[0] == {'name': 'ARCH1TECT', 'slug': 'arch1tect', 'events': 4}
+    assert {artist['slug'] for artist in listing} == {'arch1tect', 'ben-klock', 'guest-2', 'guest-3', 'guest-4',
+                                                      'guest-5'}
+
+
+def test_artist_events_uses_index():
+    """Events of an artist are an index lookup, not a scan of events"""
+    repo = make_repo()
+    add(repo, 'Techno Night', 'ARCH1TECT')
+    artist, _ = repo.artist_events('arch1tect')
+    plan = query_plan(repo, repo._artist_events, artist.id)
+    assert 'ix_event_artists_artist_event' in plan, plan
+    assert 'SCAN events' not in plan, plan
+    assert 'ux_artists_slug' in query_plan(repo, repo._artist_by_slug, 'arch1tect')
+
+if __name__ == '__main__':
+    test_parse_artists()
+    test_links_follow_writes()
+    test_bulk_import_links()
+    test_artist_events_uses_index()
+    print("✅ Artist index tests passed")
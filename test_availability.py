@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Tests for the availability endpoints of the booking API (api/routes/api.py)"""
+import base64
+import os
+import sys
+import tempfile
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api import create_app, db
+from api.models import Customer, DJBooking, EventService
+
+
+def make_app():
+    """App on a scratch database, without touching DATABASE_URL for other tests"""
+    database_url = os.environ.get('DATABASE_URL')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'arch1tect_api_test.db')}"
+    try:
+        app = create_app('development')
+    finally:
+        if database_url is None:
+            del os.environ['DATABASE_URL']
+        else:
+            os.environ['DATABASE_URL'] = database_url
+    app.extensions['mail'].suppress = True
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        customer = Customer(first_name='Jan', last_name='Kowalski', email='jan@example.com', phone='+48123456789')
+        service = EventService(name='DJ Set - Club', service_type='dj_set_club', base_price=1500)
+        db.session.add_all([customer, service])
+        db.session.flush()
+        for day, status in [(date(2028, 2, 29), 'pending'), (date(2028, 3, 4), 'confirmed'),
+                            (date(2028, 3, 4), 'completed'), (date(2028, 3, 10), 'cancelled'),
+                            (date.today() + timedelta(days=7), 'confirmed')]:
+            db.session.add(DJBooking(customer_id=customer.id, service_id=service.id, event_date=day,
+                                     event_time=time(20, 0), event_type='club', venue_name='HAOS',
+                                     status=status))
+        db.session.commit()
+    return app
+
+
+def test_availability_month_and_year():
+    """A month lists booked dates; a year comes back as a per-day bitmap"""
+    app = make_app()
+
+    with app.test_client() as client:
+        data = client.get('/api/availability?year=2028&month=3').get_json()
+        assert data['success'] and data['dates'] == ['2028-03-04']
+
+        data = client.get('/api/availability?year=2028').get_json()
+        assert data['days'] == 366
+        bits = base64.b64decode(data['bitmap'])
+        booked = [n for n in range(data['days']) if bits[n // 8] >> (n % 8) & 1]
+        assert booked == [date(2028, 2, 29).timetuple().tm_yday - 1, date(2028, 3, 4).timetuple().tm_yday - 1]
+
+        assert client.get('/api/availability?year=2028&month=13').status_code == 400
+
+        response = client.post('/api/check-availability', json={'date': '2028-03-10'})
+        assert response.get_json()['available'] is True
+        response = client.post('/api/check-availability', json={'date': '2028-03-04'})
+        assert response.get_json()['available'] is False
+
+
+def test_booked_dates_only():
+    """/api/bookings?datesOnly=true returns upcoming booked dates and nothing else"""
+    app = make_app()
+
+    with app.test_client() as client:
+        data = client.get('/api/bookings?datesOnly=true').get_json()
+        assert data == {'success': True, 'dates': sorted([
+            (date.today() + timedelta(days=7)).isoformat(), '2028-02-29', '2028-03-04'
+        ])}
+        assert client.get('/api/bookings').status_code == 400
+
+
+def test_availability_invalidated_by_booking():
+    """A new booking is visible immediately despite the cache"""
+    app = make_app()
+    day = date.today() + timedelta(days=30)
+
+    with app.test_client() as client:
+        month = f'/api/availability?year={day.year}&month={day.month}'
+        assert day.isoformat() not in client.get(month).get_json()['dates']
+
+        response = client.post('/api/book-event', json={
+            'name': 'Anna Nowak', 'email': 'anna@example.com', 'phone': '+48111222333',
+            'event_type': 'private', 'event_date': day.isoformat(), 'event_time': '21:00',
+            'venue_name': 'HAOS'
+        })
+        assert response.status_code == 201
+        assert day.isoformat() in client.get(month).get_json()['dates']
+
+
+def test_availability_invalidated_by_status_change():
+    """Cancelling, confirming or rejecting a booking is visible immediately despite the cache"""
+    app = make_app()
+    day = (date.today() + timedelta(days=7)).isoformat()
+
+    def set_status(status):
+        with app.app_context():
+            booking = DJBooking.query.filter_by(event_date=date.fromisoformat(day)).one()
+            booking.status = status
+            db.session.commit()
+
+    with app.test_client() as client:
+        month = f'/api/availability?year={day[:4]}&month={int(day[5:7])}'
+        assert day in client.get(month).get_json()['dates']
+        assert day in client.get('/api/bookings?datesOnly=true').get_json()['dates']
+
+        set_status('cancelled')
+        assert day not in client.get(month).get_json()['dates']
+        assert day not in client.get('/api/bookings?datesOnly=true').get_json()['dates']
+
+        set_status('confirmed')
+        assert day in client.get(month).get_json()['dates']
+        set_status('rejected')
+        assert day not in client.get('/api/bookings?datesOnly=true').get_json()['dates']
+
+
+if __name__ == '__main__':
+    test_availability_month_and_year()
+    test_booked_dates_only()
+    test_availability_invalidated_by_booking()
+    test_availability_invalidated_by_status_change()
+    print("✅ Availability tests passed")
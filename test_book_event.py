@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Tests for the booking write path, POST /api/book-event (api/routes/api.py)"""
+import os
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api import db
+from api.models import Customer, DJBooking
+from test_booking_concurrency import make_app
+
+
+def book(client, email, name, days_ahead):
+    return client.post('/api/book-event', json={
+        'name': name, 'email': email, 'phone': '+48123456789', 'event_type': 'club',
+        'event_date': (date.today() + timedelta(days=days_ahead)).isoformat(),
+        'event_time': '22:00', 'venue_name': 'HAOS'
+    })
+
+
+def test_book_event_round_trips():
+    """A booking is one customer upsert plus one insert; returning customers are updated in place"""
+    app = make_app()
+    statements = []
+    with app.app_context():
+        engine = db.engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split(None, 1)[0])
+    event.listen(engine, 'before_cursor_execute', record)
+
+    try:
+        with app.test_client() as client:
+            book(client, 'jan@example.com', 'Jan Kowalski', 10).close()  # warms the service cache
+
+            statements.clear()
+            response = book(client, 'jan@example.com', 'Janusz Kowalski', 11)
+            assert response.status_code == 201
+            assert statements == ['INSERT', 'INSERT']
+            response.close()  # confirmation flag is written after the response
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    with app.app_context():
+        customers = Customer.query.all()
+        assert [(c.email, c.first_name) for c in customers] == [('jan@example.com', 'Janusz')]
+        bookings = DJBooking.query.order_by(DJBooking.id).all()
+        assert [b.customer_id for b in bookings] == [customers[0].id] * 2
+        assert all(b.confirmation_sent for b in bookings)
+
+
+if __name__ == '__main__':
+    test_book_event_round_trips()
+    print("✅ Book event tests passed")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Concurrent bookings for the same date - exactly one may win (api/routes/api.py)
+
+Runs on a scratch SQLite database by default; set TEST_DATABASE_URL to run
+the same race against PostgreSQL.
+"""
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api import create_app, db
+from api.models import DJBooking, EventService
+
+ATTEMPTS = 200
+WORKERS = 32
+
+
+def make_app():
+    """App on a scratch database, without touching DATABASE_URL for other tests"""
+    database_url = os.environ.get('DATABASE_URL')
+    os.environ['DATABASE_URL'] = os.environ.get('TEST_DATABASE_URL') or \
+        f"sqlite:///{os.path.join(tempfile.gettempdir(), 'arch1tect_concurrency_test.db')}"
+    try:
+        app = create_app('development')
+    finally:
+        if database_url is None:
+            del os.environ['DATABASE_URL']
+        else:
+            os.environ['DATABASE_URL'] = database_url
+    app.extensions['mail'].suppress = True
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(EventService(name='DJ Set - Club', service_type='dj_set_club', base_price=1500))
+        db.session.commit()
+    return app
+
+
+def test_concurrent_bookings_same_date():
+    """Hundreds of parallel bookings for one date: one 201, every other request the 'taken' error"""
+    app = make_app()
+    day = (date.today() + timedelta(days=60)).isoformat()
+
+    def book(i):
+        with app.test_client() as client:
+            response = client.post('/api/book-event', json={
+                'name': f'Gość {i}', 'email': f'guest{i}@example.com', 'phone': '+48123456789',
+                'event_type': 'club', 'event_date': day, 'event_time': '22:00',
+                'venue_name': 'HAOS', 'service': 'DJ Set - Club'
+            })
+            return response.status_code, response.get_json()
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(book, range(ATTEMPTS)))
+
+    winners = [body for status, body in results if status == 201]
+    losers = [body for status, body in results if status == 400]
+    assert len(winners) == 1, f'{len(winners)} bookings won'
+    assert len(losers) == ATTEMPTS - 1, {status for status, _ in results}
+    assert all(body['error'].startswith('Ten termin jest już zarezerwowany') for body in losers)
+
+    with app.app_context():
+        assert DJBooking.query.filter_by(event_date=date.fromisoformat(day)).count() == 1
+
+
+if __name__ == '__main__':
+    test_concurrent_bookings_same_date()
+    print("✅ Concurrency test passed")
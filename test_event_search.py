@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Tests for the full-text event search (backend/event_search.py, Repository.search_events)"""
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from sqlalchemy import MetaData, create_engine, insert
+from sqlalchemy.orm import Session
+
+from event_search import fold, search_args, search_terms, snippet
+from repository import Repository, define_tables, event_values, search_results
+
+
+def make_repo():
+    engine = create_engine('sqlite://')
+    metadata = MetaData()
+    tables = define_tables(metadata)
+    metadata.create_all(engine)
+    return Repository(Session(engine), tables), metadata, engine
+
+
+def add(repo, name, **fields):
+    values = event_values(dict({'name': name, 'date': '2026-05-01', 'venue': 'HAOS'}, **fields))
+    return repo.create_event(values).id
+
+
+def names(repo, query, limit=20):
+    return [row.name for row in repo.search_events(search_terms(query), limit)]
+
+
+def test_polish_diacritics():
+    """Queries match with or without Polish letters, 'ł' included"""
+    repo, _, _ = make_repo()
+    add(repo, 'Noc w Łodzi', venue='Klub Żak', city='Gdańsk', artists='Świętokrzyska Ekipa')
+    add(repo, 'Day Rave', venue='Plac', city='Warszawa')
+
+    for query in ('lodz', 'ŁÓDŹ', 'GDANSK', 'gdańsk', 'swietokrz', 'zak', 'noc lodzi'):
+        assert names(repo, query) == ['Noc w Łodzi'], query
+    assert names(repo, 'noc warszawa') == []  # every term must match
+    assert fold('Zażółć gęślą jaźń') == 'zazolc gesla jazn'
+
+
+def test_index_follows_writes():
+    """Inserts (single and bulk), updates and deletes are reflected immediately"""
+    repo, _, _ = make_repo()
+    event_id = add(repo, 'Techno Night')
+    assert names(repo, 'techno') == ['Techno Night']
+
+    repo.update_event(event_id, {'name': 'House Night'})
+    assert names(repo, 'techno') == []
+    assert names(repo, 'house') == ['House Night']
+    repo.update_event(event_id, {'status': 'past'})  # not an indexed column
+    assert names(repo, 'house') == ['House Night']
+
+    repo.session.execute(insert(repo.events), [
+        {'name': f'Club Night {i}', 'date': date(2026, 6, i + 1), 'venue': 'HAOS'} for i in range(3)
+    ])
+    assert len(names(repo, 'club')) == 3
+
+    assert repo.delete_event(event_id)
+    assert names(repo, 'house') == []
+
+
+def test_ranking_and_snippets():
+    """Name matches rank above description matches; snippets mark the matches, escaped"""
+    repo, _, _ = make_repo()
+    add(repo, 'Sunday Chill', description='Ambient i <b>deep</b> house przy Motławie do rana')
+    add(repo, 'Deep House Session', description='Cała noc w klubie')
+
+    rows = repo.search_events(search_terms('deep'), 20)
+    assert [row.name for row in rows] == ['Deep House Session', 'Sunday Chill']
+    results = search_results(rows, search_terms('deep'))
+    assert results[0]['rank'] > results[1]['rank']
+    assert results[0]['snippet'] == '<mark>Deep</mark> House Session'
+    assert results[1]['snippet'] == 'Ambient i &lt;b&gt;<mark>deep</mark>&lt;/b&gt; house przy Motławie do rana'
+
+    text = ' '.join(f'word{i}' for i in range(40)) + ' Motława ' + ' '.join(f'tail{i}' for i in range(40))
+    cut = snippet(text, search_terms('motlawa'))
+    assert cut.startswith('…') and cut.endswith('…') and '<mark>Motława</mark>' in cut
+
+
+def test_search_args_and_recreate():
+    try:
+        search_args({'q': '   '})
+    except ValueError as e:
+        assert "'q'" in str(e)
+    else:
+        raise AssertionError('empty query accepted')
+    assert search_args({'q': 'techno', 'limit': '500'}) == {'terms': ['techno'], 'limit': 50}
+
+    repo, metadata, engine = make_repo()
+    add(repo, 'Techno Night')
+    assert repo.search_events(search_terms('!!! ...'), 20) == []
+    repo.session.commit()
+    repo.session.close()
+    metadata.drop_all(engine)  # the FTS table goes with the events table
+    metadata.create_all(engine)
+    assert names(repo, 'techno') == []
+
+
+if __name__ == '__main__':
+    test_polish_diacritics()
+    test_index_follows_writes()
+    test_ranking_and_snippets()
+    test_search_args_and_recreate()
+    print("✅ Event search tests passed")
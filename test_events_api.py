@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""Tests for the Railway backend events API (backend/app.py)"""
+import os
+import sys
+import tempfile
+from datetime import date, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+# The backend reads DATABASE_URL at import time - point it at a scratch
+# database without leaking the setting into the other test modules
+_database_url = os.environ.get('DATABASE_URL')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'arch1tect_backend_test.db')}"
+os.environ.setdefault('OUTBOX_WORKER', 'off')  # tests drain the outbox themselves
+from app import app, db, Event, Booking, Notification, outbox
+from table_versions import LocalVersionStore, versions
+if _database_url is None:
+    del os.environ['DATABASE_URL']
+else:
+    os.environ['DATABASE_URL'] = _database_url
+
+# The test client is the only process serving the app, so ETags are safe
+versions.store = LocalVersionStore(single_process=True)
+
+
+def reset_events(count):
+    """Recreate the events table with `count` events, two per day"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        for i in range(count):
+            db.session.add(Event(
+                name=f'Club Night {i}',
+                date=date(2026, 1, i // 2 + 1),
+                time=time(22, 0),
+                venue='HAOS',
+                city='Gdańsk' if i % 3 else 'Warszawa',
+                type='club',
+                status='upcoming' if i % 2 else 'completed'
+            ))
+        db.session.commit()
+
+
+def test_events_keyset_pagination():
+    """Walking the cursor returns every event exactly once, newest first"""
+    reset_events(25)
+
+    with app.test_client() as client:
+        seen = []
+        url = '/api/events?limit=10'
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            seen.extend(response.get_json())
+            cursor = response.headers.get('X-Next-Cursor')
+            url = f'/api/events?limit=10&after={cursor}' if cursor else None
+
+        assert len(seen) == 25
+        assert len({event['id'] for event in seen}) == 25
+        keys = [(event['date'], event['id']) for event in seen]
+        assert keys == sorted(keys, reverse=True)
+
+
+def test_events_filters():
+    """Filters and date range are applied by the query"""
+    reset_events(25)
+
+    with app.test_client() as client:
+        response = client.get('/api/events?status=upcoming&city=Gdańsk&from=2026-01-03&to=2026-01-08&order=asc')
+        events = response.get_json()
+        assert events
+        assert all(e['status'] == 'upcoming' and e['city'] == 'Gdańsk' for e in events)
+        assert all('2026-01-03' <= e['date'] <= '2026-01-08' for e in events)
+        assert [e['date'] for e in events] == sorted(e['date'] for e in events)
+
+        assert client.get('/api/events?after=not-a-cursor').status_code == 400
+        assert client.get('/api/events?from=01.01.2026').status_code == 400
+        assert client.get('/api/events?limit=abc').status_code == 400
+
+
+def test_events_conditional_get():
+    """A matching If-None-Match is answered with 304 until the table changes"""
+    reset_events(3)
+
+    with app.test_client() as client:
+        response = client.get('/api/events')
+        etag = response.headers['ETag']
+
+        response = client.get('/api/events', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+        client.post('/api/events', json={'name': 'New Night', 'date': '2026-02-01', 'venue': 'HAOS'})
+        response = client.get('/api/events', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+
+def test_etags_across_workers():
+    """A write through one worker is never hidden by a 304 from another with its own counters"""
+    reset_events(0)
+    saved = versions.store
+    worker_a, worker_b = LocalVersionStore(), LocalVersionStore()  # two gunicorn workers, no Redis
+    try:
+        with app.test_client() as client:
+            versions.store = worker_a
+            response = client.get('/api/bookings')
+            assert response.get_json() == [] and 'ETag' not in response.headers
+            worker_a.sees_all_writes = True  # a tag worker A issued as if it served alone
+            held = client.get('/api/bookings').headers['ETag']
+            worker_a.sees_all_writes = False
+
+            versions.store = worker_b
+            assert client.post('/api/bookings', json={
+                'name': 'Jan Kowalski', 'email': 'jan@example.com', 'event_date': '2026-05-01', 'venue': 'HAOS'
+            }).status_code == 201
+
+            versions.store = worker_a
+            response = client.get('/api/bookings', headers={'If-None-Match': held})
+            assert response.status_code == 200 and len(response.get_json()) == 1
+    finally:
+        versions.store = saved
+
+
+def test_events_response_cache():
+    """Warm reads are served from the cache and event writes invalidate it"""
+    reset_events(3)
+
+    with app.test_client() as client:
+        stats = client.get('/api/health').get_json()['cache']['namespaces'].get('events', {'hits': 0})
+        first = client.get('/api/events?order=asc')
+        second = client.get('/api/events?order=asc')
+        assert first.data == second.data
+
+        after = client.get('/api/health').get_json()['cache']['namespaces']['events']
+        assert after['hits'] == stats['hits'] + 1
+
+        event_id = first.get_json()[0]['id']
+        client.put(f'/api/events/{event_id}', json={'name': 'Renamed Night'})
+        response = client.get('/api/events?order=asc')
+        assert response.get_json()[0]['name'] == 'Renamed Night'
+
+
+def test_events_projection_matches_to_dict():
+    """The column-projected list payload is identical to to_dict(), with either encoder"""
+    import fast_json
+    reset_events(4)
+
+    with app.app_context():
+        expected = [event.to_dict() for event in Event.query.order_by(Event.date.desc(), Event.id.desc())]
+
+    orjson = fast_json.orjson
+    try:
+        for encoder in {orjson, None}:
+            fast_json.orjson = encoder
+            with app.test_client() as client:
+                # distinct query string per pass so neither is served from the cache
+                assert client.get(f'/api/events?encoder={encoder}').get_json() == expected
+    finally:
+        fast_json.orjson = orjson
+
+
+def test_bookings_export_streams():
+    """The export streams every matching booking as NDJSON or CSV"""
+    import csv
+    import io
+    import json
+    reset_events(0)
+    with app.app_context():
+        for i in range(2500):
+            db.session.add(Booking(name=f'Guest {i}', email=f'guest{i}@example.com',
+                                   event_date=date(2026, 3, i % 28 + 1), start_time=time(20, 0),
+                                   status='approved' if i % 2 else 'pending'))
+        db.session.commit()
+
+    with app.test_client() as client:
+        response = client.get('/api/bookings/export?status=approved&from=2026-03-01&to=2026-03-14')
+        assert response.is_streamed
+        assert response.mimetype == 'application/x-ndjson'
+        rows = [json.loads(line) for line in response.get_data().splitlines()]
+        assert rows and all(r['status'] == 'approved' and r['event_date'] <= '2026-03-14' for r in rows)
+        assert rows[0]['start_time'] == '20:00'
+        assert [r['id'] for r in rows] == sorted(r['id'] for r in rows)
+
+        response = client.get('/api/bookings/export?format=csv&status=approved&from=2026-03-01&to=2026-03-14')
+        assert response.mimetype == 'text/csv'
+        assert len(list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))) == len(rows)
+
+        assert client.get('/api/bookings/export?format=xml').status_code == 400
+        assert client.get('/api/bookings/export?from=14.03.2026').status_code == 400
+
+
+def test_booking_notification_outbox():
+    """Bookings queue their confirmation in the same commit; the outbox retries until sent"""
+    from datetime import datetime
+    reset_events(0)
+
+    with app.test_client() as client:
+        response = client.post('/api/bookings', json={
+            'name': 'Jan Kowalski', 'email': 'jan@example.com', 'event_date': '2026-05-01',
+            'start_time': '20:00', 'venue': 'HAOS', 'city': 'Gdańsk', 'event_type': 'club'
+        })
+        assert response.status_code == 201
+        booking_id = response.get_json()['id']
+
+    sent = []
+    def flaky_sender(notification):
+        if not sent:
+            sent.append(None)
+            raise ConnectionError('SMTP down')
+        sent.append(notification.booking.email)
+
+    senders = outbox.senders
+    outbox.senders = {('booking_confirmation', 'email'): flaky_sender}
+    try:
+        with app.app_context():
+            notification = Notification.query.filter_by(booking_id=booking_id).one()
+            assert (notification.status, notification.channel) == ('pending', 'email')
+
+            assert outbox.drain() == 1
+            db.session.refresh(notification)
+            assert (notification.status, notification.attempts) == ('pending', 1)
+            assert 'SMTP down' in notification.error_message
+            assert notification.next_attempt_at > datetime.utcnow()
+            assert outbox.drain() == 0  # backing off
+
+            notification.next_attempt_at = datetime.utcnow()
+            db.session.commit()
+            assert outbox.drain() == 1
+            db.session.refresh(notification)
+            assert (notification.status, notification.attempts) == ('sent', 2)
+            assert notification.sent_at and sent[-1] == 'jan@example.com'
+
+            failing = Notification(booking_id=booking_id, notification_type='booking_confirmation',
+                                   channel='email', attempts=outbox.max_attempts - 1)
+            db.session.add(failing)
+            db.session.commit()
+            outbox.senders = {}
+            assert outbox.drain() == 1
+            db.session.refresh(failing)
+            assert failing.status == 'failed'
+    finally:
+        outbox.senders = senders
+
+
+def test_email_templates_render():
+    """Email templates come from the shared registry, compiled once and autoescaped"""
+    import email_templates
+    context = dict(name='Jan <Kowalski>', event_date=date(2026, 5, 1), start_time='20:00', venue='HAOS',
+                   city='Gdańsk', event_type='club', duration=4,
+                   calendar_urls={'google': 'https://calendar.google.com/?a=1&b=2', 'outlook': '', 'office365': ''})
+    html = email_templates.render('booking_confirmation.html', **context)
+    assert 'Jan &lt;Kowalski&gt;' in html and '2026-05-01' in html
+    assert 'https://calendar.google.com/?a=1&amp;b=2' in html
+    template = email_templates.env.get_template('booking_approval.html')
+    assert email_templates.env.get_template('booking_approval.html') is template
+
+
+def test_events_bulk_import():
+    """Import dedupes on (name, date, venue), dry run reports the diff, re-import is a no-op"""
+    reset_events(2)  # Club Night 0 / 1 on 2026-01-01 at HAOS
+    lineup = (
+        'name,date,time,venue,city,price,capacity\n'
+        'Club Night 0,2026-01-01,22:00,HAOS,Warszawa,,\n'          # unchanged
+        'Club Night 1,2026-01-01,23:00,HAOS,Sopot,40,300\n'     # update
+        'Season Opening,2026-05-01,21:00,HAOS,Gdańsk,50,500\n'  # insert
+        'Season Opening,2026-05-01,21:00,HAOS,Gdańsk,50,500\n'  # duplicate
+        'No Date,,21:00,HAOS,Gdańsk,,\n'                        # invalid
+        'Bad Price,2026-05-02,21:00,HAOS,Gdańsk,free,\n'        # invalid
+    ).encode()
+
+    with app.test_client() as client:
+        def post(body, query='', content_type='text/csv'):
+            return client.post(f'/api/events/import{query}', data=body, content_type=content_type)
+
+        report = post(lineup, '?dry_run=true').get_json()
+        assert (report['inserted'], report['updated'], report['unchanged'],
+                report['duplicates'], report['invalid']) == (1, 1, 1, 1, 2)
+        update = next(c for c in report['changes'] if c['action'] == 'update')
+        assert update['fields']['city'] == ['Gdańsk', 'Sopot']
+        assert update['fields']['time'] == ['22:00:00', '23:00:00']
+        assert [e['row'] for e in report['errors']] == [6, 7]
+        assert len(client.get('/api/events').get_json()) == 2
+
+        etag = client.get('/api/events').headers['ETag']
+        report = post(lineup).get_json()
+        assert (report['inserted'], report['updated']) == (1, 1)
+        response = client.get('/api/events', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        events = {e['name']: e for e in response.get_json()}
+        assert len(events) == 3
+        assert (events['Club Night 1']['city'], events['Club Night 1']['capacity']) == ('Sopot', 300)
+        assert events['Season Opening']['type'] == 'club'  # column default
+
+        report = post(lineup).get_json()
+        assert (report['inserted'], report['updated'], report['unchanged']) == (0, 0, 3)
+
+        ndjson = b'{"name": "Afterparty", "date": "2026-05-02", "venue": "HAOS", "price": 30}\n{"name": "x"'
+        report = post(ndjson, '?format=ndjson').get_json()
+        assert (report['inserted'], report['invalid']) == (1, 1)
+        assert post(b'[]', '?format=xml').status_code == 400
+
+
+def test_bookings_bulk_status():
+    """One request approves many bookings, queues their emails and reports per ID; rejecting cancels them"""
+    reset_events(0)
+    with app.app_context():
+        bookings = [Booking(name=f'Gość {i}', email=f'guest{i}@example.com', event_date=date(2026, 6, i + 1),
+                            status='approved' if i == 2 else 'pending') for i in range(4)]
+        db.session.add_all(bookings)
+        db.session.commit()
+        ids = [booking.id for booking in bookings]
+
+    with app.test_client() as client:
+        etag = client.get('/api/bookings').headers['ETag']
+        response = client.post('/api/bookings/status', json={'ids': ids[:3] + [999, ids[0]], 'status': 'approved'})
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['updated'] == 2
+        assert [(r['id'], r['result']) for r in data['results']] == [
+            (ids[0], 'updated'), (ids[1], 'updated'), (ids[2], 'unchanged'), (999, 'not_found')
+        ]
+        assert client.get('/api/bookings', headers={'If-None-Match': etag}).status_code == 200
+
+        data = client.post('/api/bookings/status', json={'ids': ids, 'status': 'rejected'}).get_json()
+        assert data['updated'] == 4
+        assert client.post('/api/bookings/status', json={'ids': ids, 'status': 'cancelled'}).status_code == 400
+        assert client.post('/api/bookings/status', json={'ids': [], 'status': 'approved'}).status_code == 400
+
+        # The single routes behave the same
+        assert client.post(f'/api/bookings/{ids[3]}/approve').status_code == 200
+        assert client.post(f'/api/bookings/{ids[3]}/reject').status_code == 200
+
+    with app.app_context():
+        assert {b.status for b in Booking.query.all()} == {'rejected'}
+        notifications = Notification.query.order_by(Notification.booking_id).all()
+        assert [(n.booking_id, n.notification_type, n.recipient_email, n.status) for n in notifications] == [
+            (ids[0], 'booking_approval', 'guest0@example.com', 'cancelled'),
+            (ids[1], 'booking_approval', 'guest1@example.com', 'cancelled'),
+            (ids[3], 'booking_approval', 'guest3@example.com', 'cancelled'),
+        ]
+        assert outbox.drain() == 0  # nothing left to send to rejected customers
+
+
+if __name__ == '__main__':
+    test_events_keyset_pagination()
+    test_events_filters()
+    test_events_conditional_get()
+    test_etags_across_workers()
+    test_events_response_cache()
+    test_events_projection_matches_to_dict()
+    test_bookings_export_streams()
+    test_booking_notification_outbox()
+    test_email_templates_render()
+    test_events_bulk_import()
+    test_bookings_bulk_status()
+    print("✅ Events API tests passed")
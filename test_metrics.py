@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Tests for the Prometheus metrics (backend/metrics.py)"""
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+sys.path.insert(0, BACKEND)
+
+# The backend reads DATABASE_URL at import time - point it at a scratch
+# database without leaking the setting into the other test modules
+_database_url = os.environ.get('DATABASE_URL')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'arch1tect_backend_test.db')}"
+os.environ.setdefault('OUTBOX_WORKER', 'off')
+from app import app, db
+if _database_url is None:
+    del os.environ['DATABASE_URL']
+else:
+    os.environ['DATABASE_URL'] = _database_url
+
+from metrics import external_call
+
+# A worker process: serves two requests and exits, leaving its samples in PROMETHEUS_MULTIPROC_DIR
+WORKER = '''
+import sys
+sys.path.insert(0, {backend!r})
+from flask import Flask
+from metrics import instrument_app
+app = Flask('worker')
+instrument_app(app)
+app.add_url_rule('/ping', 'ping', lambda: 'pong')
+client = app.test_client()
+client.get('/ping')
+client.get('/missing')
+if {scrape!r}:
+    sys.stdout.write(client.get('/metrics').get_data(as_text=True))
+'''
+
+
+def sample(text, name, **labels):
+    """Value of the sample `name` with exactly `labels` in the exposition text"""
+    wanted = '{' + ','.join(f'{key}="{value}"' for key, value in sorted(labels.items())) + '}'
+    for line in text.splitlines():
+        metric, _, value = line.rpartition(' ')
+        if metric == name and not labels:
+            return float(value)
+        if metric.startswith(name + '{'):
+            got = metric[len(name) + 1:-1]
+            if '{' + ','.join(sorted(got.split(','))) + '}' == wanted:
+                return float(value)
+    return None
+
+
+def test_metrics_endpoint():
+    """Requests, repository queries, the pool and outside calls all show up"""
+    with app.app_context():
+        db.create_all()
+
+    with app.test_client() as client:
+        before = client.get('/metrics').get_data(as_text=True)
+        assert client.get('/api/events').status_code == 200
+        assert client.get('/api/events/999999').status_code == 404
+        try:
+            with external_call('smtp'):
+                raise ConnectionError('smtp down')
+        except ConnectionError:
+            pass
+        response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+
+    count = lambda body, *args, **labels: sample(body, *args, **labels) or 0
+    assert count(text, 'http_requests_total', method='GET', endpoint='get_events', status='200') == \
+        count(before, 'http_requests_total', method='GET', endpoint='get_events', status='200') + 1
+    assert count(text, 'http_requests_total', method='GET', endpoint='get_event', status='404') >= 1
+    assert count(text, 'http_request_duration_seconds_count', method='GET', endpoint='get_events') >= 1
+    assert count(text, 'db_query_duration_seconds_count', operation='events.page') >= 1
+    assert count(text, 'external_call_duration_seconds_count', service='smtp', outcome='error') >= 1
+    assert sample(text, 'db_pool_connections', state='size') is not None
+    assert sample(text, 'http_requests_in_progress') == 1  # the /metrics request itself
+
+
+def test_metrics_summed_across_workers():
+    """With PROMETHEUS_MULTIPROC_DIR every process reports the total of all workers"""
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=directory)
+        for _ in range(2):
+            subprocess.run([sys.executable, '-c', WORKER.format(backend=BACKEND, scrape=False)],
+                           env=env, check=True, capture_output=True)
+        text = subprocess.run([sys.executable, '-c', WORKER.format(backend=BACKEND, scrape=True)],
+                              env=env, check=True, capture_output=True, text=True).stdout
+
+    assert sample(text, 'http_requests_total', method='GET', endpoint='ping', status='200') == 3
+    assert sample(text, 'http_requests_total', method='GET', endpoint='unmatched', status='404') == 3
+    assert sample(text, 'http_request_duration_seconds_count', method='GET', endpoint='ping') == 3
+
+
+if __name__ == '__main__':
+    test_metrics_endpoint()
+    test_metrics_summed_across_workers()
+    print("✅ Metrics tests passed")
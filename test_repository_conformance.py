@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Conformance tests - every events/bookings entry point behaves the same
+
+Loads backend/app.py, api/events_api_postgres.py, railway-backend/app.py
+and api/events_api.py side by side, each on its own scratch SQLite
+database, runs one scenario through each and compares the responses.
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from repository import BOOKING_FIELDS, EVENT_FIELDS, on_query, query_stats
+
+ENTRY_POINTS = {
+    'backend': 'backend/app.py',
+    'events_api_postgres': 'api/events_api_postgres.py',
+    'railway_backend': 'railway-backend/app.py',
+    'events_api': 'api/events_api.py',
+}
+VOLATILE_FIELDS = ('created_at', 'updated_at')
+
+_apps = {}
+
+
+def load(name):
+    """The Flask app of an entry point, imported once on its own scratch database"""
+    if name in _apps:
+        return _apps[name]
+
+    path = os.path.join(tempfile.gettempdir(), f'arch1tect_conformance_{name}.db')
+    if os.path.exists(path):
+        os.remove(path)
+    saved = {key: os.environ.get(key) for key in ('DATABASE_URL', 'VERCEL')}
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ.pop('VERCEL', None)
+    os.environ.setdefault('OUTBOX_WORKER', 'off')
+    try:
+        spec = importlib.util.spec_from_file_location(f'conformance_{name}', os.path.join(ROOT, ENTRY_POINTS[name]))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        for key, value in saved.items():
+            os.environ.pop(key, None)
+            if value is not None:
+                os.environ[key] = value
+
+    app = module.app
+    app.config['MAIL_SUPPRESS_SEND'] = True
+    if 'mail' in app.extensions:
+        app.extensions['mail'].suppress = True
+    _apps[name] = app
+    return app
+
+
+def normalized(item, fields):
+    return {field: item[field] for field in fields if field not in VOLATILE_FIELDS}
+
+
+def run_scenario(app):
+    """Responses of one create/read/update/book/approve/delete round, normalized"""
+    results = {}
+    with app.test_client() as client:
+        response = client.post('/api/events', json={
+            'name': 'Techno Night', 'date': '2026-03-14', 'time': '22:00',
+            'venue': 'HAOS', 'city': 'Gdańsk', 'price': 50.0, 'capacity': 300,
+            'artists': 'ARCH1TECT b2b Łukasz Żółtowski',
+        })
+        assert response.status_code == 201
+        event = response.get_json()
+        other = client.post('/api/events', json={'name': 'Day Rave', 'date': '2026-04-01', 'venue': 'Plac',
+                                                 'artists': 'ARCH1TECT'})
+        assert other.status_code == 201
+
+        assert client.post('/api/events', json={'name': 'Bad', 'date': '14.03.2026', 'venue': 'X'}).status_code == 400
+        results['created'] = normalized(event, EVENT_FIELDS)
+        results['fetched'] = normalized(client.get(f"/api/events/{event['id']}").get_json(), EVENT_FIELDS)
+
+        response = client.put(f"/api/events/{event['id']}", json={'name': 'Techno Night XL', 'time': '23:30'})
+        assert response.status_code == 200
+        results['updated'] = normalized(response.get_json(), EVENT_FIELDS)
+        assert client.put('/api/events/999', json={'name': 'Nope'}).status_code == 404
+
+        results['events'] = [normalized(e, EVENT_FIELDS) for e in client.get('/api/events').get_json()]
+        results['search'] = [normalized(e, EVENT_FIELDS + ('rank', 'snippet'))
+                             for e in client.get('/api/events/search?q=gdansk techno').get_json()]
+        assert client.get('/api/events/search').status_code == 400
+        results['artists'] = client.get('/api/artists').get_json()
+        response = client.get('/api/artists/arch1tect/events').get_json()
+        results['artist_events'] = {'artist': response['artist'],
+                                    'events': [normalized(e, EVENT_FIELDS) for e in response['events']]}
+        assert client.get('/api/artists/nobody/events').status_code == 404
+
+        response = client.post('/api/bookings', json={
+            'event_id': event['id'], 'name': 'Jan Kowalski', 'email': 'jan@example.com',
+            'event_date': '2026-03-14', 'start_time': '22:00', 'venue': 'HAOS', 'city': 'Gdańsk', 'guests': 4,
+        })
+        assert response.status_code == 201
+        booking = response.get_json()
+        results['booking'] = normalized(booking, BOOKING_FIELDS)
+
+        response = client.post(f"/api/bookings/{booking['id']}/approve")
+        assert response.status_code == 200
+        results['approved'] = normalized(response.get_json(), BOOKING_FIELDS)
+        assert client.post('/api/bookings/999/approve').status_code == 404
+
+        results['bookings'] = [normalized(b, BOOKING_FIELDS) for b in client.get('/api/bookings').get_json()]
+
+        other_id = other.get_json()['id']
+        assert len(client.get('/api/events/search?q=rave').get_json()) == 1
+        assert client.delete(f'/api/events/{other_id}').status_code == 200
+        assert client.get('/api/events/search?q=rave').get_json() == []
+        assert len(client.get('/api/artists/arch1tect/events').get_json()['events']) == 1
+        assert client.get(f'/api/events/{other_id}').status_code == 404
+        assert client.delete(f'/api/events/{other_id}').status_code == 404
+    return results
+
+
+def test_entry_points_agree():
+    """All entry points return the same data for the same requests"""
+    results = {name: run_scenario(load(name)) for name in ENTRY_POINTS}
+
+    expected = results.pop('backend')
+    assert expected['updated']['name'] == 'Techno Night XL'
+    assert expected['updated']['time'] == '23:30'
+    assert expected['booking']['duration'] == 240  # minutes everywhere
+    assert expected['approved']['status'] == 'approved'
+    assert [e['name'] for e in expected['events']] == ['Day Rave', 'Techno Night XL']
+    assert [e['name'] for e in expected['search']] == ['Techno Night XL']
+    assert expected['artists'] == [{'name': 'ARCH1TECT', 'slug': 'arch1tect', 'events': 2},
+                                   {'name': 'Łukasz Żółtowski', 'slug': 'lukasz-zoltowski', 'events': 1}]
+    assert [e['name'] for e in expected['artist_events']['events']] == ['Day Rave', 'Techno Night XL']
+    for name, result in results.items():
+        for step, value in expected.items():
+            assert result[step] == value, f'{name} differs from backend at {step}: {result[step]} != {value}'
+
+
+def test_query_hooks():
+    """Every repository operation is timed and reported to the hooks"""
+    app = load('events_api')
+    calls = []
+    hook = on_query(lambda operation, seconds: calls.append(operation))
+    try:
+        with app.test_client() as client:
+            client.get('/api/events')
+            client.get('/api/events/1')
+    finally:
+        query_stats.hooks.remove(hook)
+
+    assert calls == ['events.page', 'events.get']
+    stats = query_stats.stats()
+    assert stats['events.page']['calls'] >= 1 and stats['events.page']['max_ms'] >= 0
+
+
+if __name__ == '__main__':
+    test_entry_points_agree()
+    test_query_hooks()
+    print("✅ Repository conformance tests passed")
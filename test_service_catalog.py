@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Tests for the cached service catalog (api/catalog.py)"""
+import os
+import sys
+
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api import db
+from api.models import EventService
+from test_booking_concurrency import make_app
+
+
+def test_catalog_served_from_snapshot():
+    """Warm reads never query event_services; a committed change reloads the snapshot"""
+    app = make_app()
+    catalog = app.extensions['catalog']
+    statements = []
+    with app.app_context():
+        engine = db.engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if 'event_services' in statement:
+            statements.append(statement.split(None, 1)[0])
+    event.listen(engine, 'before_cursor_execute', record)
+
+    try:
+        with app.test_client() as client:
+            assert [s['name'] for s in client.get('/api/services').get_json()['services']] == ['DJ Set - Club']
+            statements.clear()
+            for _ in range(5):
+                assert client.get('/api/services').status_code == 200
+            assert statements == []
+
+            with app.app_context():
+                snapshot = catalog.snapshot()
+                assert snapshot.by_name['DJ Set - Club']['base_price'] == 1500
+                service = EventService.query.filter_by(name='DJ Set - Club').one()
+                service.base_price = 1800
+                db.session.add(EventService(name='DJ Set - Wesele', service_type='dj_set_wedding', base_price=3000))
+                db.session.commit()
+
+            data = client.get('/api/services').get_json()
+            assert [(s['name'], s['base_price']) for s in data['services']] == [
+                ('DJ Set - Club', 1800), ('DJ Set - Wesele', 3000)
+            ]
+
+            with app.app_context():
+                loads = catalog.loads
+                db.session.add(EventService(name='Oświetlenie', service_type='lighting', base_price=500))
+                db.session.rollback()
+                catalog.snapshot()
+                assert catalog.loads == loads
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+if __name__ == '__main__':
+    test_catalog_served_from_snapshot()
+    print("✅ Service catalog tests passed")
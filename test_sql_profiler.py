@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Tests for the SQL profiler (backend/sql_profiler.py) and the per-endpoint query budgets"""
+import os
+import sys
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+# The backend reads DATABASE_URL at import time - point it at a scratch
+# database without leaking the setting into the other test modules
+_database_url = os.environ.get('DATABASE_URL')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'arch1tect_backend_test.db')}"
+os.environ.setdefault('OUTBOX_WORKER', 'off')
+from app import app, db, Event
+if _database_url is None:
+    del os.environ['DATABASE_URL']
+else:
+    os.environ['DATABASE_URL'] = _database_url
+
+from flask import Flask, jsonify
+from flask_sqlalchemy import SQLAlchemy
+from repository import define_tables
+from sql_profiler import max_queries, profile_app, statement_shape
+
+# Most statements each endpoint may run - raise deliberately, never by accident
+QUERY_BUDGETS = {
+    ('GET', '/api/events?order=asc'): 1,
+    ('GET', '/api/events/{event}'): 1,
+    ('GET', '/api/bookings'): 1,
+    ('POST', '/api/bookings'): 2,  # booking + its outbox row
+    ('POST', '/api/bookings/{booking}/approve'): 2,
+    ('POST', '/api/bookings/{booking}/reject'): 2,  # booking + cancelling its queued approval email
+}
+
+
+def test_endpoint_query_budgets():
+    """Hot endpoints stay within their query budget"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        event = Event(name='Club Night', date=date(2026, 3, 14), venue='HAOS')
+        db.session.add(event)
+        db.session.commit()
+        ids = {'event': event.id}
+        engine = db.engine
+
+    booking = {'event_id': ids['event'], 'name': 'Anna', 'email': 'anna@example.com',
+               'event_date': '2026-03-14', 'start_time': '22:00', 'venue': 'HAOS', 'city': 'Gdańsk'}
+    with app.test_client() as client:
+        with max_queries(engine, QUERY_BUDGETS[('POST', '/api/bookings')]):
+            ids['booking'] = client.post('/api/bookings', json=booking).get_json()['id']
+
+        for (method, url), limit in QUERY_BUDGETS.items():
+            if (method, url) == ('POST', '/api/bookings'):
+                continue
+            with max_queries(engine, limit):
+                response = client.open(url.format(**ids), method=method)
+            assert response.status_code == 200, (method, url, response.status_code)
+
+
+def test_max_queries_fails_over_budget():
+    with app.app_context():
+        engine = db.engine
+    try:
+        with max_queries(engine, 0):
+            with app.test_client() as client:
+                client.get('/api/bookings')
+    except AssertionError as e:
+        assert 'expected at most 0' in str(e)
+    else:
+        raise AssertionError('max_queries did not fail')
+
+
+def test_profiler_flags_n_plus_one():
+    """A lazy load per row shows up in Server-Timing as a repeated statement"""
+    profiled = Flask('profiled')
+    profiled.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    store = SQLAlchemy(profiled)
+    tables = define_tables(store.metadata)
+
+    class Event(store.Model):
+        __table__ = tables.events
+
+    class Booking(store.Model):
+        __table__ = tables.bookings
+        event = store.relationship('Event')
+
+    @profiled.route('/bookings')
+    def bookings():
+        return jsonify([booking.event.name for booking in Booking.query.all()])  # N+1
+
+    with profiled.app_context():
+        store.create_all()
+        for i in range(6):
+            event = Event(name=f'Night {i}', date=date(2026, 1, i + 1), venue='HAOS')
+            store.session.add(Booking(name='Anna', email='anna@example.com', event=event))
+        store.session.commit()
+        profile_app(profiled, store.engine, threshold=5)
+
+    response = profiled.test_client().get('/bookings')
+    assert response.status_code == 200
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('db;dur=')
+    assert 'desc="7 queries"' in timing
+    assert 'db-repeated;desc="6x SELECT' in timing
+
+
+def test_statement_shape():
+    assert statement_shape('SELECT id FROM bookings\n WHERE id IN (?, ?, ?)') == \
+        statement_shape('SELECT id FROM bookings WHERE id IN (?, ?)')
+
+
+if __name__ == '__main__':
+    test_endpoint_query_budgets()
+    test_max_queries_fails_over_budget()
+    test_profiler_flags_n_plus_one()
+    test_statement_shape()
+    print("✅ SQL profiler tests passed")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Tests for the structured, queue-based logging (backend/structured_logging.py)"""
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+# The backend reads DATABASE_URL at import time - point it at a scratch
+# database without leaking the setting into the other test modules
+_database_url = os.environ.get('DATABASE_URL')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'arch1tect_backend_test.db')}"
+os.environ.setdefault('OUTBOX_WORKER', 'off')
+from app import app, db
+if _database_url is None:
+    del os.environ['DATABASE_URL']
+else:
+    os.environ['DATABASE_URL'] = _database_url
+
+import structured_logging
+from structured_logging import SamplingFilter, flush
+
+
+def captured_lines(action):
+    """JSON records written while `action` runs"""
+    output = structured_logging.listener.handlers[0]
+    buffer = io.StringIO()
+    flush()
+    previous = output.setStream(buffer)
+    try:
+        action()
+        flush()
+    finally:
+        output.setStream(previous)
+    return [json.loads(line) for line in buffer.getvalue().splitlines()]
+
+
+def test_booking_logged_with_request_id():
+    """Records carry the request ID, which is echoed back in X-Request-ID"""
+    with app.app_context():
+        db.create_all()
+    responses = []
+
+    def book():
+        with app.test_client() as client:
+            responses.append(client.post('/api/bookings', headers={'X-Request-ID': 'req-42'}, json={
+                'name': 'Ola', 'email': 'ola@example.com', 'event_date': '2026-05-01', 'start_time': '21:00',
+            }))
+            responses.append(client.get('/api/health', headers={'X-Request-ID': 'bad id with spaces'}))
+
+    records = captured_lines(book)
+    booking, health = responses
+    assert booking.status_code == 201
+    assert booking.headers['X-Request-ID'] == 'req-42'
+    assert len(health.headers['X-Request-ID']) == 32  # invalid IDs are replaced
+
+    created = [r for r in records if r['message'] == 'booking created']
+    assert len(created) == 1
+    assert created[0]['request_id'] == 'req-42'
+    assert created[0]['booking_id'] == booking.get_json()['id']
+    assert created[0]['level'] == 'INFO' and created[0]['logger'] == 'arch1tect.bookings'
+
+
+def test_exceptions_rendered_by_listener():
+    def fail():
+        try:
+            raise RuntimeError('smtp down')
+        except RuntimeError:
+            logging.getLogger('arch1tect.outbox').exception('outbox drain failed')
+
+    record, = captured_lines(fail)
+    assert record['level'] == 'ERROR'
+    assert 'RuntimeError: smtp down' in record['exc']
+    assert 'request_id' not in record  # logged outside a request
+
+
+def test_debug_sampling():
+    sampler = SamplingFilter(0.0)
+    debug = logging.LogRecord('arch1tect', logging.DEBUG, __file__, 1, 'noisy', None, None)
+    info = logging.LogRecord('arch1tect', logging.INFO, __file__, 1, 'useful', None, None)
+    assert not sampler.filter(debug)
+    assert sampler.filter(info)
+    assert SamplingFilter(1).filter(debug)
+    kept = sum(SamplingFilter(0.25).filter(debug) for _ in range(4000))
+    assert 700 < kept < 1300
+
+
+if __name__ == '__main__':
+    test_booking_logged_with_request_id()
+    test_exceptions_rendered_by_listener()
+    test_debug_sampling()
+    print("✅ Structured logging tests passed")